@@ -1,14 +1,19 @@
+import json
 import tempfile
 import re
 import wave
 
 import chainlit as cl
 from chainlit.input_widget import Switch
+from chainlit.server import app as chainlit_server
 from langchain_core.messages import AIMessage, HumanMessage
 
 from src.asr.asr_model import ASRModel
 from src.medlit_agent.agent.agent import OllamaAgent
-from src.medlit_agent.tools.tools import tools
+from src.medlit_agent.pmc_service import metrics
+from src.medlit_agent.pmc_service.prefetcher import FullTextPrefetcher
+from src.medlit_agent.pmc_service.revalidation import ArticleRevalidator
+from src.medlit_agent.tools.tools import astream_search_pubmed_central, tools
 from src.tts.tts_model import TTSModel
 
 
@@ -33,18 +38,42 @@ def _extract_tool_status_info(streamed_text: str) -> str:
     status_lines = []
     for line in streamed_text.splitlines():
         stripped = line.strip()
-        if stripped.startswith(("🔎", "📄", "📚")):
+        if stripped.startswith(("🔎", "📄", "📖", "📚")):
             status_lines.append(stripped)
 
     return "\n\n".join(status_lines)
 
 
+# NCBI latency, bytes, parse time, retries, cache and rate-limit wait for Prometheus
+metrics.add_route(chainlit_server)
+
+
+async def _attach_ncbi_trace(trace: metrics.Trace) -> None:
+    """record this turn's NCBI time per stage as a step in the thread's trace."""
+    summary = trace.summary()
+    if not summary:
+        return
+    # "run" steps are kept in the trace but hidden from the chat (cot = "tool_call")
+    async with cl.Step(name="NCBI", type="run") as step:
+        step.language = "json"
+        step.output = json.dumps(summary, indent=2)
+
+
+# one background revalidation job per process; PMC_REVALIDATE_INTERVAL_SECONDS=0 disables
+revalidator = ArticleRevalidator()
+
+
 @cl.on_chat_start
 async def start():
+    revalidator.start()
+    # warm the full-text store with the top search hits; off unless PMC_PREFETCH_TOP_K > 0
+    prefetcher = FullTextPrefetcher()
     agent = OllamaAgent(
         model="qwen3:8b",
         tools=tools,
         temperature=0.0,
+        prefetcher=prefetcher if prefetcher.top_k > 0 else None,
+        search_stream=astream_search_pubmed_central,
     )
     asr_model = ASRModel(model_name="openai/whisper-large-v3")
     tts_model = TTSModel()
@@ -60,6 +89,13 @@ async def start():
     cl.user_session.set("TTS_enabled", settings["TTS_enabled"])
 
 
+@cl.on_chat_end
+async def end():
+    agent = cl.user_session.get("agent")
+    if agent is not None and agent.prefetcher is not None:
+        agent.prefetcher.cancel()
+
+
 @cl.on_settings_update
 async def on_settings_update(settings: dict):
     tts_enabled = bool(settings.get("TTS_enabled", False))
@@ -75,10 +111,12 @@ async def _handle_user_text_input(user_text: str) -> None:
     await msg.send()
 
     full_response = ""
-    async for chunk in agent.astream(user_text, chat_history):
-        if chunk:
-            full_response += chunk
-            await msg.stream_token(chunk)
+    # NCBI calls made for this turn, including tool threads it starts, land in ncbi_trace
+    with metrics.trace() as ncbi_trace:
+        async for chunk in agent.astream(user_text, chat_history):
+            if chunk:
+                full_response += chunk
+                await msg.stream_token(chunk)
 
     # after token streaming, replace response with schema-validated markdown when available
     # this allows a streaming response with after-the-fact schema validation
@@ -98,6 +136,7 @@ async def _handle_user_text_input(user_text: str) -> None:
         msg.content = full_response
 
     await msg.update()
+    await _attach_ncbi_trace(ncbi_trace)
 
     await _send_tts_audio_if_enabled(full_response, msg)
 
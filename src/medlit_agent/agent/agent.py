@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import os
 from typing import Any, AsyncIterator, Dict, List, Optional
 
 from langchain_core.messages import HumanMessage, SystemMessage
@@ -10,6 +12,8 @@ from src.medlit_agent.graph.langgraph_workflow import (
     build_qa_messages,
     build_synthesis_messages,
 )
+from src.medlit_agent.pmc_service.resilience import CircuitOpenError
+from src.medlit_agent.pmc_service.xml_to_dict import FullTextUnavailableError
 from src.medlit_agent.schemas.schemas import (
     ArticleQAAnswer,
     ResearchSynthesis,
@@ -18,11 +22,20 @@ from src.medlit_agent.schemas.schemas import (
 
 class OllamaAgent:
 
+    # tools that embed after downloading; their NCBI calls are bounded by the
+    # ``ResilientCaller`` deadline, so ``tool_timeout`` would only cut off
+    # slow local work and misreport it as NCBI being down
+    untimed_tools = frozenset({"retrieve_full_text"})
+
     def __init__(
         self,
         model: str,
         tools: List = None,
         temperature: float = 0.0,
+        tool_timeout: float = 60.0,
+        prefetcher=None,
+        search_stream=None,
+        synthesis_after: Optional[int] = None,
     ):
         """
         Ollama agent with tools.
@@ -31,10 +44,27 @@ class OllamaAgent:
             model: the Ollama model id to use
             tools: list of LangChain tools to provide to the agent
             temperature: model temperature (0-1), default 0.0
+            tool_timeout: seconds a tool call may take before the user is told
+                PubMed Central is unavailable, default 60.0; not applied to
+                ``untimed_tools``
+            prefetcher: optional FullTextPrefetcher that ingests top search hits
+                in the background so full-text follow-ups hit a warm store
+            search_stream: optional async generator function taking the search
+                tool arguments and yielding ``(rank, document)`` pairs;
+                when set, searches show each citation as it arrives
+            synthesis_after: with ``search_stream``, start the synthesis once
+                this many articles are in instead of waiting for all of them
+                (env PMC_SYNTHESIS_AFTER, default: wait for all)
         """
         self.model = model
         self.tools_list = tools or []
         self.tools = {tool.name: tool for tool in self.tools_list}
+        self.tool_timeout = tool_timeout
+        self.prefetcher = prefetcher
+        self.search_stream = search_stream
+        if synthesis_after is None and os.getenv("PMC_SYNTHESIS_AFTER"):
+            synthesis_after = int(os.getenv("PMC_SYNTHESIS_AFTER"))
+        self.synthesis_after = synthesis_after
         self.documents = []  # for storing fetched documents
         self.last_validated_response: Optional[str] = None
 
@@ -57,7 +87,11 @@ class OllamaAgent:
         if tool_name == "search_pubmed_central":
             query = tool_args.get("query", "")
             max_results = tool_args.get("max_results", 3)
-            return {"query": query, "max_results": max_results}
+            return {
+                "query": query,
+                "max_results": max_results,
+                "alternative_queries": tool_args.get("alternative_queries") or None,
+            }
 
         if tool_name == "retrieve_full_text":
             pmcid = tool_args.get("pmcid", "")
@@ -78,11 +112,74 @@ class OllamaAgent:
         self.documents = result
         return result
 
+    async def _arun_tool(
+        self, tool_name: str, tool_args: Dict[str, Any]
+    ) -> List[Dict[str, str]]:
+        """Async variant of ``_run_tool`` so NCBI calls do not block the event loop."""
+        tool = self.tools[tool_name]
+        if self.prefetcher is not None and tool_name == "retrieve_full_text":
+            # let an in-flight prefetch of this article finish instead of racing it
+            await self.prefetcher.wait_for(tool_args.get("pmcid", ""))
+
+        result = await tool.ainvoke(tool_args)
+        self.documents = result
+
+        if self.prefetcher is not None and tool_name == "search_pubmed_central":
+            self.prefetcher.schedule(doc["pmcid"] for doc in result or [])
+        return result
+
+    async def _astream_search_results(
+        self,
+        stream: AsyncIterator,
+        ranked: List,
+        limit: Optional[int] = None,
+        heading: str = "",
+    ) -> AsyncIterator[str]:
+        """Show each citation as its article arrives from ``search_stream``.
+
+        Reads ``stream`` until ``ranked`` holds ``limit`` articles (all of
+        them when None), preceded by ``heading`` if any arrive, then leaves
+        the documents in relevance order in ``self.documents``.
+        """
+        arrived = []
+        while limit is None or len(ranked) < limit:
+            try:
+                # bound each wait so one stuck download still reaches the user
+                rank, document = await asyncio.wait_for(
+                    anext(stream), timeout=self.tool_timeout
+                )
+            except StopAsyncIteration:
+                break
+            if heading and not arrived:
+                yield heading
+            ranked.append((rank, document))
+            arrived.append(document)
+            yield f"📖 {document['citation']}\n\n"
+
+        self.documents = [
+            document for _, document in sorted(ranked, key=lambda r: r[0])
+        ]
+        if self.prefetcher is not None and arrived:
+            self.prefetcher.schedule(doc["pmcid"] for doc in arrived)
+
     @staticmethod
     def _is_full_text_unavailable_error(exc: Exception) -> bool:
+        if isinstance(exc, FullTextUnavailableError):
+            return True
         msg = str(exc).casefold()
         return "no <body> element found" in msg or "cannot extract full text" in msg
 
+    @staticmethod
+    def _is_ncbi_unavailable_error(exc: Exception) -> bool:
+        return isinstance(exc, (TimeoutError, CircuitOpenError))
+
+    @staticmethod
+    def _build_ncbi_unavailable_message() -> str:
+        return (
+            "⚠️ **PubMed Central is not responding right now**\n\n"
+            "Please try again in a minute.\n\n"
+        )
+
     @staticmethod
     def _build_full_text_unavailable_message(pmcid: str) -> str:
         pmcid_label = f" for **{pmcid}**" if pmcid else ""
@@ -294,8 +391,29 @@ class OllamaAgent:
                         pmcid = normalized_args.get("pmcid", "")
                         yield f"📄 Retrieving full text for **{pmcid}**...\n\n"
 
+                    search = None
                     try:
-                        tool_result = self._run_tool(tool_name, normalized_args)
+                        if (
+                            tool_name == "search_pubmed_central"
+                            and self.search_stream is not None
+                        ):
+                            search = self.search_stream(**normalized_args)
+                            ranked = []
+                            async for chunk in self._astream_search_results(
+                                search, ranked, limit=self.synthesis_after
+                            ):
+                                yield chunk
+                            tool_result = self.documents
+                        else:
+                            # bound the wait so a stuck NCBI call still reaches the user
+                            tool_result = await asyncio.wait_for(
+                                self._arun_tool(tool_name, normalized_args),
+                                timeout=(
+                                    None
+                                    if tool_name in self.untimed_tools
+                                    else self.tool_timeout
+                                ),
+                            )
 
                         if tool_result:
                             if tool_name == "search_pubmed_central":
@@ -310,6 +428,15 @@ class OllamaAgent:
                             ):
                                 yield chunk
 
+                            if search is not None:
+                                # hits that arrived after ``synthesis_after``
+                                async for chunk in self._astream_search_results(
+                                    search,
+                                    ranked,
+                                    heading="\n\n📚 More articles on this topic:\n\n",
+                                ):
+                                    yield chunk
+
                             # Offer to answer follow up question for accessibility
                             yield f"\n\n---\n\n💡 *Any other follow-up questions? Just ask!*"
                         else:
@@ -322,8 +449,13 @@ class OllamaAgent:
                         ):
                             pmcid = normalized_args.get("pmcid", "")
                             yield self._build_full_text_unavailable_message(pmcid)
+                        elif self._is_ncbi_unavailable_error(e):
+                            yield self._build_ncbi_unavailable_message()
                         else:
                             yield "❌ Something went wrong: Please try again later.\n\n"
+                    finally:
+                        if search is not None:
+                            await search.aclose()
         else:
             # No tool calls, check if we have documents for already
             if self.documents:
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ArticleStore:
+    """Per-process, size-bounded LRU of raw article XML keyed by canonical PMCID.
+
+    Search results put the XML they already downloaded here so a follow-up
+    full-text request for a listed article is served from memory.
+    """
+
+    def __init__(self, max_bytes: int | None = None):
+        if max_bytes is None:
+            max_bytes = int(os.getenv("PMC_ARTICLE_STORE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[str, str | bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, pmcid: str) -> str | bytes | None:
+        with self._lock:
+            xml_data = self._items.get(pmcid)
+            if xml_data is not None:
+                self._items.move_to_end(pmcid)
+            return xml_data
+
+    def put(self, pmcid: str, xml_data: str | bytes) -> None:
+        size = len(xml_data)
+        if not pmcid or size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._items.pop(pmcid, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._items[pmcid] = xml_data
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def discard(self, pmcid: str) -> None:
+        with self._lock:
+            previous = self._items.pop(pmcid, None)
+            if previous is not None:
+                self._size -= len(previous)
+
+    def __contains__(self, pmcid: str) -> bool:
+        with self._lock:
+            return pmcid in self._items
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._size = 0
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import tarfile
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from src.medlit_agent.pmc_service.pmc_endpoint import PMCEndpoint, _fromstring
+from src.medlit_agent.pmc_service.sqlite_store import SQLiteStore
+from src.medlit_agent.pmc_service.xml_to_dict import (
+    FullTextUnavailableError,
+    XMLToDictConverter,
+)
+
+DEFAULT_BATCH_SIZE = 500
+
+# PMC OA bulk packages hold one JATS file per article (.xml or .nxml)
+_MEMBER_SUFFIXES = (".xml", ".nxml")
+
+
+def iter_archive_members(path: str | Path) -> Iterator[Tuple[str, bytes]]:
+    """Yield ``(member name, XML bytes)`` from a .tar.gz without extracting it.
+
+    The archive is read as a forward-only stream (``r|gz``), so memory holds
+    one member at a time whatever the archive size.
+    """
+    with tarfile.open(path, mode="r|gz") as archive:
+        for member in archive:
+            if not member.isfile() or not member.name.endswith(_MEMBER_SUFFIXES):
+                continue
+            stream = archive.extractfile(member)
+            if stream is not None:
+                yield member.name, stream.read()
+
+
+def parse_member(name: str, data: bytes) -> Dict[str, Any] | None:
+    """Citation record and full-text sections of one archive member.
+
+    Runs in the worker processes. Returns None for files that are not a
+    parseable article; articles without a ``<body>`` keep their citation and
+    get no sections.
+    """
+    try:
+        root = _fromstring(data)
+    except Exception:
+        return None
+    if root.tag != "article":
+        root = root.find("article")
+        if root is None:
+            return None
+    pmcid = PMCEndpoint.article_pmcid(root) or PMCEndpoint.canonical_pmcid(
+        Path(name).name.split(".")[0]
+    )
+    try:
+        record = PMCEndpoint._parse_article(root, pmcid)
+    except Exception:
+        return None
+    try:
+        sections = XMLToDictConverter.convert(data)
+    except (FullTextUnavailableError, ValueError):
+        sections = []
+    return {"pmcid": pmcid, "record": record, "sections": sections}
+
+
+@dataclass
+class ImportProgress:
+    archive: str
+    imported: int = 0
+    skipped: int = 0
+    failed: int = 0
+    started_at: float = 0.0
+
+    def rate(self, now: float) -> float:
+        elapsed = now - self.started_at
+        return self.imported / elapsed if elapsed > 0 else 0.0
+
+
+class BulkImporter(SQLiteStore):
+    """Loads PMC open-access bulk packages into ChromaDB and the local index.
+
+    Archives are streamed member by member. The parsing (``_parse_article``
+    and ``XMLToDictConverter``) runs on a pool of ``workers`` processes, with
+    at most a few members per worker in flight. Parsed articles are buffered
+    and written ``batch_size`` at a time. Each flush does one embedding call
+    and bulk Chroma writes, and indexes the citations and sections in one
+    local-index transaction.
+
+    A checkpoint in ``state_dir`` records which members have been written and
+    which archives are finished. Archives are identified by name, size and
+    modification time, so a re-downloaded archive is imported again. A rerun
+    skips finished archives. In a partly imported archive it skips members
+    already written without parsing them. A batch's members are committed to
+    the checkpoint only once all of its writes have succeeded; the writes are
+    upserts, so a batch interrupted before that is simply written again.
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS archives ("
+        " archive TEXT PRIMARY KEY,"
+        " finished_at REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS members ("
+        " archive TEXT NOT NULL,"
+        " member TEXT NOT NULL,"
+        " PRIMARY KEY (archive, member))",
+    )
+
+    def __init__(
+        self,
+        db=None,
+        workers: int | None = None,
+        batch_size: int | None = None,
+        state_dir: str | Path | None = None,
+        progress: Callable[[ImportProgress], None] | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if workers is None:
+            workers = int(os.getenv("PMC_BULK_IMPORT_WORKERS", os.cpu_count() or 1))
+        if batch_size is None:
+            batch_size = int(
+                os.getenv("PMC_BULK_IMPORT_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+            )
+        if state_dir is None:
+            state_dir = os.getenv("PMC_BULK_IMPORT_DIR") or (
+                Path(__file__).resolve().parent / "bulk_import"
+            )
+
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.state_dir = Path(state_dir)
+        super().__init__(self.state_dir / "checkpoint.sqlite3", clock=clock)
+        self.progress = progress
+        self._db = db
+
+    @property
+    def db(self):
+        # built lazily: ChromaDB loads the embedding model
+        if self._db is None:
+            from src.medlit_agent.pmc_service.chroma_db import ChromaDB
+
+            self._db = ChromaDB()
+        return self._db
+
+    @staticmethod
+    def archive_key(path: str | Path) -> str:
+        """Checkpoint key of an archive: its file name, size and mtime."""
+        path = Path(path)
+        stat = path.stat()
+        return f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def is_finished(self, path: str | Path) -> bool:
+        archive = self.archive_key(path)
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM archives WHERE archive = ?", (archive,)
+            ).fetchone()
+        return row is not None
+
+    def _done_members(self, archive: str) -> set:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT member FROM members WHERE archive = ?", (archive,)
+            )
+            return {member for (member,) in rows}
+
+    @staticmethod
+    def _checkpoint(
+        conn: sqlite3.Connection, archive: str, members: Iterable[str]
+    ) -> None:
+        conn.executemany(
+            "INSERT OR IGNORE INTO members (archive, member) VALUES (?, ?)",
+            [(archive, member) for member in members],
+        )
+
+    def _finish(self, archive: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO archives (archive, finished_at) VALUES (?, ?)",
+                (archive, self._clock()),
+            )
+            # a finished archive is skipped whole; its member rows are not needed
+            conn.execute("DELETE FROM members WHERE archive = ?", (archive,))
+
+    def import_archives(self, paths: Iterable[str | Path]) -> List[ImportProgress]:
+        """Import each archive in turn on one shared process pool."""
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return [self.import_archive(path, pool) for path in paths]
+
+    def import_archive(
+        self, path: str | Path, pool: Executor | None = None
+    ) -> ImportProgress:
+        archive = self.archive_key(path)
+        progress = ImportProgress(Path(path).name, started_at=self._clock())
+        if self.is_finished(path):
+            return progress
+        if pool is None:
+            with ProcessPoolExecutor(max_workers=self.workers) as own_pool:
+                return self._import(path, archive, progress, own_pool)
+        return self._import(path, archive, progress, pool)
+
+    def _import(self, path, archive, progress, pool) -> ImportProgress:
+        done = self._done_members(archive)
+        # bounded read-ahead keeps memory flat while every worker stays busy
+        max_pending = self.workers * 4
+        pending: deque = deque()
+        batch: List[Tuple[str, Dict[str, Any] | None]] = []
+
+        def collect():
+            name, future = pending.popleft()
+            batch.append((name, future.result()))
+            if len(batch) >= self.batch_size:
+                self._flush(archive, batch, progress)
+                batch.clear()
+
+        for name, data in iter_archive_members(path):
+            if name in done:
+                progress.skipped += 1
+                continue
+            pending.append((name, pool.submit(parse_member, name, data)))
+            if len(pending) >= max_pending:
+                collect()
+        while pending:
+            collect()
+        if batch:
+            self._flush(archive, batch, progress)
+        self._finish(archive)
+        return progress
+
+    def _flush(self, archive, batch, progress: ImportProgress) -> None:
+        parsed = [result for _, result in batch if result is not None]
+        articles = [
+            (result["pmcid"], result["sections"])
+            for result in parsed
+            if result["sections"]
+        ]
+        # the members commit only if every write below succeeds; a crash or
+        # error rolls them back and the batch is imported again
+        with self._transaction() as conn:
+            self._checkpoint(conn, archive, [name for name, _ in batch])
+            self.db.add_many(articles)
+            PMCEndpoint.embedded_articles.add_many(pmcid for pmcid, _ in articles)
+            PMCEndpoint.index_records(result["record"] for result in parsed)
+            PMCEndpoint.local_index.add_sections_batch(articles)
+        progress.imported += len(parsed)
+        progress.failed += len(batch) - len(parsed)
+        if self.progress is not None:
+            self.progress(progress)
+
+
+def _print_progress(progress: ImportProgress) -> None:
+    print(
+        f"{progress.archive}: {progress.imported} imported, "
+        f"{progress.skipped} skipped, {progress.failed} failed "
+        f"({progress.rate(time.time()):.1f} articles/s)",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Import PMC OA bulk packages (.tar.gz of JATS XML)."
+    )
+    parser.add_argument("archives", nargs="+")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--state-dir")
+    args = parser.parse_args()
+
+    importer = BulkImporter(
+        workers=args.workers,
+        batch_size=args.batch_size,
+        state_dir=args.state_dir,
+        progress=_print_progress,
+    )
+    for progress in importer.import_archives(args.archives):
+        _print_progress(progress)
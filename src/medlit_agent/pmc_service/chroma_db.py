@@ -1,8 +1,14 @@
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, Iterable, List, Tuple
 
 from src.medlit_agent.pmc_service.embeddings_service import SBertEmbeddingsService
 
+# Chroma rejects add() calls above a few thousand records
+_MAX_WRITE_BATCH = 5000
+
+# collection metadata flag set once stored PMCIDs have been canonicalized
+_CANONICAL_PMCIDS_KEY = "canonical_pmcids"
+
 
 class ChromaDB:
     """
@@ -44,24 +50,41 @@ class ChromaDB:
         return chunks
 
     def add(self, pmcid: str, texts: List[Dict[str, str]]):
+        self.add_many([(pmcid, texts)])
+
+    def add_many(self, articles: Iterable[Tuple[str, List[Dict[str, str]]]]):
+        """Chunk, embed and store several articles with one embedding call.
+
+        Writes go to Chroma in slices of ``_MAX_WRITE_BATCH`` chunks, which
+        stays under its per-request batch limit. They are upserts, so storing
+        an article again replaces its chunks instead of failing on their IDs.
+        """
+        ids = []
         metadatas = []
         documents = []
-        for text in texts:
-            body = text["body"]
-            chunks = self._split_text(body, chunk_size=1000, chunk_overlap=200)
-            for chunk in chunks:
-                documents.append(chunk)
-                metadatas.append(
-                    {"title": text["title"], "text": chunk, "pmcid": pmcid}
-                )
+        for pmcid, texts in articles:
+            first = len(documents)
+            for text in texts:
+                body = text["body"]
+                chunks = self._split_text(body, chunk_size=1000, chunk_overlap=200)
+                for chunk in chunks:
+                    documents.append(chunk)
+                    metadatas.append(
+                        {"title": text["title"], "text": chunk, "pmcid": pmcid}
+                    )
+            ids.extend(f"{pmcid}_{i}" for i in range(len(documents) - first))
+        if not documents:
+            return
 
         embeddings_service = SBertEmbeddingsService()
         embeddings = embeddings_service.get_embeddings([doc for doc in documents])
-        self.collection.add(
-            ids=[f"{pmcid}_{i}" for i in range(len(documents))],
-            embeddings=embeddings,
-            metadatas=metadatas,
-        )
+        for start in range(0, len(documents), _MAX_WRITE_BATCH):
+            end = start + _MAX_WRITE_BATCH
+            self.collection.upsert(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end],
+                metadatas=metadatas[start:end],
+            )
 
     def query(
         self, query_embedding: List[float], n_results: int, pmcid: str | None = None
@@ -87,6 +110,56 @@ class ChromaDB:
         results = self.collection.get(where={"pmcid": pmcid}, limit=1)
         return bool(results.get("ids"))
 
+    def canonicalize_pmcids(self, canonical: Callable[[str], str]) -> int:
+        """Rewrite stored ``pmcid`` metadata to ``canonical(pmcid)``, once.
+
+        Collections written before IDs were canonicalized hold whatever raw ID
+        the caller passed in ("123", "pmc123"). Those chunks are relabelled in
+        place, so nothing is re-embedded; chunks of an article that is also
+        stored under its canonical ID are dropped as duplicates. A flag in the
+        collection metadata makes later calls a no-op. Returns the number of
+        chunks changed.
+        """
+        metadata = dict(self.collection.metadata or {})
+        if metadata.get(_CANONICAL_PMCIDS_KEY):
+            return 0
+
+        results = self.collection.get(include=["metadatas"])
+        rows = list(zip(results.get("ids") or [], results.get("metadatas") or []))
+        stored = {meta["pmcid"] for _, meta in rows}
+        update_ids, update_metadatas, delete_ids = [], [], []
+        for chunk_id, meta in rows:
+            pmcid = canonical(meta["pmcid"])
+            if pmcid == meta["pmcid"]:
+                continue
+            if pmcid in stored:
+                delete_ids.append(chunk_id)
+            else:
+                update_ids.append(chunk_id)
+                update_metadatas.append({**meta, "pmcid": pmcid})
+
+        for start in range(0, len(update_ids), _MAX_WRITE_BATCH):
+            end = start + _MAX_WRITE_BATCH
+            self.collection.update(
+                ids=update_ids[start:end], metadatas=update_metadatas[start:end]
+            )
+        for start in range(0, len(delete_ids), _MAX_WRITE_BATCH):
+            self.collection.delete(ids=delete_ids[start : start + _MAX_WRITE_BATCH])
+        metadata[_CANONICAL_PMCIDS_KEY] = True
+        self.collection.modify(metadata=metadata)
+        return len(update_ids) + len(delete_ids)
+
+    def delete(self, pmcid: str) -> None:
+        """Remove every stored chunk of the PMCID."""
+        self.collection.delete(where={"pmcid": pmcid})
+
+    def pmcids(self) -> List[str]:
+        """Distinct PMCIDs with at least one stored chunk."""
+        results = self.collection.get(include=["metadatas"])
+        return sorted(
+            {metadata["pmcid"] for metadata in results.get("metadatas") or []}
+        )
+
     def get_sections_by_pmcid(self, pmcid: str, limit: int = 5) -> List[Dict[str, str]]:
         """Return up to `limit` stored chunks for a PMCID as section-like dicts."""
         results = self.collection.get(where={"pmcid": pmcid}, limit=limit)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List
+
+from src.medlit_agent.pmc_service.sqlite_store import SQLiteStore
+
+
+class EmbeddedArticleList(SQLiteStore):
+    """PMCIDs whose full text has been embedded into ChromaDB.
+
+    Listing the collection's articles from Chroma means reading every chunk's
+    metadata and, through ``FullTextRetriever``, loading the embedding model.
+    This key list answers the same question from a small SQLite file, so the
+    revalidation job can run in the Chainlit process without either. The
+    retriever and the bulk importer add to it as they store articles, and
+    ``seed`` fills it once from a collection written before it existed.
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS embedded ("
+        " pmcid TEXT PRIMARY KEY,"
+        " added_at REAL NOT NULL)",
+    )
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if cache_dir is None:
+            cache_dir = os.getenv("PMC_EMBEDDED_LIST_DIR") or (
+                Path(__file__).resolve().parent / "embedded_articles"
+            )
+
+        self.cache_dir = Path(cache_dir)
+        super().__init__(self.cache_dir / "embedded.sqlite3", clock=clock)
+
+    def add(self, pmcid: str) -> None:
+        self.add_many([pmcid])
+
+    def add_many(self, pmcids: Iterable[str]) -> None:
+        with self._connection() as conn:
+            self._insert(conn, pmcids)
+
+    def _insert(self, conn: sqlite3.Connection, pmcids: Iterable[str]) -> None:
+        now = self._clock()
+        conn.executemany(
+            "INSERT OR IGNORE INTO embedded (pmcid, added_at) VALUES (?, ?)",
+            [(pmcid, now) for pmcid in pmcids],
+        )
+
+    def contains(self, pmcid: str) -> bool:
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM embedded WHERE pmcid = ?", (pmcid,)
+            ).fetchone()
+        return row is not None
+
+    def pmcids(self) -> List[str]:
+        with self._connection() as conn:
+            rows = conn.execute("SELECT pmcid FROM embedded ORDER BY pmcid")
+            return [pmcid for (pmcid,) in rows]
+
+    def seed(self, list_pmcids: Callable[[], Iterable[str]]) -> int:
+        """Add ``list_pmcids()`` the first time the list is seeded.
+
+        The file's ``user_version`` records that seeding happened, so later
+        calls return 0 without calling ``list_pmcids``. Returns the number of
+        PMCIDs listed.
+        """
+        with self._connection() as conn:
+            (seeded,) = conn.execute("PRAGMA user_version").fetchone()
+        if seeded:
+            return 0
+
+        pmcids = list(list_pmcids())
+        with self._transaction() as conn:
+            self._insert(conn, pmcids)
+            conn.execute("PRAGMA user_version = 1")
+        return len(pmcids)
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from typing import Any, Dict, Iterable, List
+from urllib.request import urlopen
+
+import httpx
+from Bio import Entrez
+
+from src.medlit_agent.pmc_service import metrics
+from src.medlit_agent.pmc_service.rate_limiter import NCBIRateLimiter
+
+EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+# PMC OA web service: lists download links for open-access subset articles
+OA_SERVICE_URL = "https://www.ncbi.nlm.nih.gov/pmc/utils/oa/oa.fcgi"
+
+# NCBI asks clients to POST when the ID list would make the URL too long.
+_MAX_GET_IDS = 200
+
+
+class AsyncEUtilsClient:
+    """Async NCBI E-utilities client (esearch/efetch/esummary).
+
+    All requests share one keep-alive connection pool and accept gzip, so
+    concurrent sessions reuse open sockets instead of connecting per call.
+    """
+
+    def __init__(
+        self,
+        base_url: str = EUTILS_BASE_URL,
+        email: str | None = None,
+        api_key: str | None = None,
+        tool: str | None = None,
+        timeout: float = 30.0,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 10,
+        rate_limiter: NCBIRateLimiter | None = None,
+        oa_service_url: str = OA_SERVICE_URL,
+    ):
+        self.base_url = base_url
+        self.oa_service_url = oa_service_url
+        self.email = email
+        self.api_key = api_key
+        self.tool = tool
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # httpx pools are bound to the loop that opened them; rebuild the pool
+        # if we are called from a different (e.g. per-test) event loop.
+        loop = asyncio.get_running_loop()
+        if (
+            self._client is None
+            or self._client.is_closed
+            or self._client_loop is not loop
+        ):
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=self.limits,
+                timeout=self.timeout,
+                headers={"Accept-Encoding": "gzip"},
+            )
+            self._client_loop = loop
+        return self._client
+
+    def _params(self, **params: Any) -> Dict[str, Any]:
+        params.update(tool=self.tool, email=self.email, api_key=self.api_key)
+        return {key: value for key, value in params.items() if value is not None}
+
+    async def _request(self, cgi: str, params: Dict[str, Any]) -> httpx.Response:
+        client = self._get_client()
+        if self.rate_limiter is not None:
+            await self.rate_limiter.aacquire()
+        ids = params.get("id", "")
+        with metrics.request(cgi.removesuffix(".fcgi")) as timer:
+            if ids.count(",") >= _MAX_GET_IDS:
+                response = await client.post(cgi, data=params)
+            else:
+                response = await client.get(cgi, params=params)
+            response.raise_for_status()
+            timer.nbytes = len(response.content)
+        return response
+
+    @staticmethod
+    def _join_ids(ids: str | Iterable[str]) -> str:
+        if isinstance(ids, str):
+            return ids
+        return ",".join(str(i) for i in ids)
+
+    async def esearch(
+        self,
+        term: str,
+        db: str = "pmc",
+        retmax: int = 5,
+        sort: str = "relevance",
+        **extra: Any,
+    ) -> Dict[str, Any]:
+        """Run esearch and return an ``Entrez.read``-style record."""
+        params = self._params(
+            db=db, term=term, retmax=retmax, sort=sort, retmode="json", **extra
+        )
+        response = await self._request("esearch.fcgi", params)
+        result = response.json().get("esearchresult", {})
+        record: Dict[str, Any] = {
+            "Count": result.get("count", "0"),
+            "IdList": [str(i) for i in result.get("idlist", [])],
+        }
+        if "webenv" in result:
+            record["WebEnv"] = result["webenv"]
+            record["QueryKey"] = result.get("querykey", "")
+        return record
+
+    async def efetch(
+        self,
+        ids: str | Iterable[str],
+        db: str = "pmc",
+        rettype: str = "full",
+        retmode: str = "xml",
+        **extra: Any,
+    ) -> bytes:
+        """Run efetch and return the raw (already gunzipped) response body."""
+        params = self._params(
+            db=db, id=self._join_ids(ids), rettype=rettype, retmode=retmode, **extra
+        )
+        response = await self._request("efetch.fcgi", params)
+        return response.content
+
+    async def esummary(
+        self, ids: str | Iterable[str], db: str = "pmc", **extra: Any
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run esummary and return the per-UID summaries keyed by UID."""
+        params = self._params(db=db, id=self._join_ids(ids), retmode="json", **extra)
+        response = await self._request("esummary.fcgi", params)
+        result = response.json().get("result", {})
+        uids: List[str] = result.get("uids", [])
+        return {uid: result[uid] for uid in uids if uid in result}
+
+    async def oa_record(self, pmcid: str) -> bytes:
+        """Fetch the raw OA web service record for one PMCID."""
+        client = self._get_client()
+        if self.rate_limiter is not None:
+            await self.rate_limiter.aacquire()
+        with metrics.request("oa") as timer:
+            response = await client.get(self.oa_service_url, params={"id": pmcid})
+            response.raise_for_status()
+            timer.nbytes = len(response.content)
+        return response.content
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+
+
+def set_entrez_socket_timeout(seconds: float | None) -> None:
+    """Give every ``Bio.Entrez`` request a socket timeout (None removes it).
+
+    Biopython calls ``urlopen`` without one, so a stalled NCBI connection
+    would hold its thread until the OS gives up. The timeout is per socket
+    operation (connect or read), not for the whole response.
+    """
+    Entrez.urlopen = (
+        urlopen if seconds is None else functools.partial(urlopen, timeout=seconds)
+    )
+
+
+class RebasedEntrez:
+    """``Bio.Entrez`` with esearch/efetch/esummary sent to another base URL.
+
+    Biopython hard-codes the NCBI host inside each E-utility function, so the
+    three we use are rebuilt from its own request helpers (``_build_request``
+    keeps the GET/POST choice, ``_open`` its throttling). Every other
+    attribute, ``read``, ``email``, ``api_key`` and so on, is read from and
+    written to ``Bio.Entrez`` itself.
+    """
+
+    def __init__(self, base_url: str):
+        object.__setattr__(self, "base_url", base_url.rstrip("/") + "/")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(Entrez, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(Entrez, name, value)
+
+    def _open(self, cgi: str, params: Dict[str, Any]):
+        return Entrez._open(Entrez._build_request(self.base_url + cgi, params))
+
+    def esearch(self, db: str, term: str, **keywords: Any):
+        return self._open("esearch.fcgi", {"db": db, "term": term, **keywords})
+
+    def efetch(self, db: str, **keywords: Any):
+        return self._open("efetch.fcgi", {"db": db, **keywords})
+
+    def esummary(self, **keywords: Any):
+        return self._open("esummary.fcgi", keywords)
@@ -1,9 +1,14 @@
+import asyncio
+import os
 from typing import Dict, List
 
 from src.medlit_agent.pmc_service.chroma_db import ChromaDB
 from src.medlit_agent.pmc_service.embeddings_service import SBertEmbeddingsService
 from src.medlit_agent.pmc_service.pmc_endpoint import PMCEndpoint
-from src.medlit_agent.pmc_service.xml_to_dict import XMLToDictConverter
+from src.medlit_agent.pmc_service.xml_to_dict import (
+    FullTextUnavailableError,
+    XMLToDictConverter,
+)
 
 
 class FullTextRetriever:
@@ -12,29 +17,100 @@ class FullTextRetriever:
     and convert section titles + paragraphs dict of chunks
     """
 
-    def __init__(self):
+    def __init__(self, stream_min_bytes: int | None = None):
+        if stream_min_bytes is None:
+            stream_min_bytes = int(
+                os.getenv("PMC_STREAM_CONVERT_MIN_BYTES", 8 * 1024 * 1024)
+            )
+        # articles at least this large are converted without building a tree
+        self.stream_min_bytes = stream_min_bytes
         self.converter = XMLToDictConverter()
         self.endpoint = PMCEndpoint()
         self.db = ChromaDB()
+        # older collections stored chunks under the raw IDs callers passed in
+        self.db.canonicalize_pmcids(PMCEndpoint.canonical_pmcid)
+        # collections written before the embedded-article list existed
+        PMCEndpoint.embedded_articles.seed(self.db.pmcids)
 
     def retrieve_full_text(self, pmid: str, n_results: int = 5) -> List[Dict[str, str]]:
         """
         Retrieve top sections for a given PMID from ChromaDB.
         If the document is not cached, fetch, chunk, embed/store, then return cached sections.
         """
+        pmid = PMCEndpoint.canonical_pmcid(pmid)
+        # concurrent requests for one article download and embed it only once
+        PMCEndpoint.single_flight.do(("ingest", pmid), lambda: self.ingest(pmid))
+        return self.db.get_sections_by_pmcid(pmid, limit=n_results)
+
+    def ingest(self, pmid: str) -> bool:
+        """
+        Fetch, convert and store an article unless it is already in ChromaDB.
+        Returns True if the article had to be ingested.
+        """
+        pmid = PMCEndpoint.canonical_pmcid(pmid)
         if self.db.document_exists(pmid):
-            return self.db.get_sections_by_pmcid(pmid, limit=n_results)
+            return False
+        PMCEndpoint.raise_if_unavailable(pmid)
 
-        xml_content = PMCEndpoint.fetch_pmcid_xml(pmid)
-        sections = self.converter.convert(xml_content)
+        # search results leave their XML in the shared store; reuse it if present
+        xml_content = PMCEndpoint.article_store.get(pmid)
+        if xml_content is None:
+            xml_content = PMCEndpoint.fetch_pmcid_xml_bytes(pmid)
+        sections = self._convert(pmid, xml_content)
         self.store_full_text(pmid, sections)
-        return self.db.get_sections_by_pmcid(pmid, limit=n_results)
+        return True
+
+    def _convert(self, pmid: str, xml_content) -> List[Dict[str, str]]:
+        try:
+            if self.stream_min_bytes and len(xml_content) >= self.stream_min_bytes:
+                return self.converter.convert_stream(xml_content)
+            return self.converter.convert(xml_content)
+        except FullTextUnavailableError as exc:
+            PMCEndpoint.unavailable_cache.put(pmid, str(exc))
+            raise
+
+    async def aretrieve_full_text(
+        self, pmid: str, n_results: int = 5
+    ) -> List[Dict[str, str]]:
+        """
+        Async variant of ``retrieve_full_text``: the download goes through the
+        pooled async E-utilities client and blocking Chroma/embedding work runs
+        in a worker thread so the event loop stays free.
+        """
+        pmid = PMCEndpoint.canonical_pmcid(pmid)
+        await self.aingest(pmid)
+        return await asyncio.to_thread(
+            self.db.get_sections_by_pmcid, pmid, limit=n_results
+        )
+
+    async def aingest(self, pmid: str) -> bool:
+        """
+        Async variant of ``ingest``. Concurrent calls for the same article
+        share one download and embedding pass.
+        """
+        pmid = PMCEndpoint.canonical_pmcid(pmid)
+
+        async def ingest():
+            if await asyncio.to_thread(self.db.document_exists, pmid):
+                return False
+            PMCEndpoint.raise_if_unavailable(pmid)
+
+            xml_content = PMCEndpoint.article_store.get(pmid)
+            if xml_content is None:
+                xml_content = await PMCEndpoint.afetch_pmcid_xml_bytes(pmid)
+            sections = await asyncio.to_thread(self._convert, pmid, xml_content)
+            await asyncio.to_thread(self.store_full_text, pmid, sections)
+            return True
+
+        return await PMCEndpoint.single_flight.ado(("ingest", pmid), ingest)
 
     def store_full_text(self, pmid: str, sections: List[Dict[str, str]]):
         """
         Store full text sections in the database
         """
         self.db.add(pmid, sections)
+        PMCEndpoint.embedded_articles.add(pmid)
+        PMCEndpoint.local_index.add_sections(pmid, sections)
 
     def query_full_text(self, query: str, n_results: int = 5) -> List[Dict[str, str]]:
         """
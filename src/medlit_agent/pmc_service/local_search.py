@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import math
+import os
+import re
+import sqlite3
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from src.medlit_agent.pmc_service.search_cache import STOP_WORDS
+from src.medlit_agent.pmc_service.sqlite_store import SQLiteStore
+
+FIELDS = ("title", "abstract", "body")
+DEFAULT_BOOSTS = {"title": 3.0, "abstract": 2.0, "body": 1.0}
+
+SEARCH_MODES = ("remote", "local", "hybrid")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Case-folded word tokens without stop words or single letters."""
+    return [
+        token
+        for token in _TOKEN_RE.findall((text or "").casefold())
+        if token not in STOP_WORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+class LocalSearchIndex(SQLiteStore):
+    """Persistent BM25F inverted index over articles we have already seen.
+
+    Search hits parsed by ``PMCEndpoint`` add their title and abstract, and
+    full-text ingestion by ``FullTextRetriever`` adds the body. Updating one
+    field of an article only rewrites that field's postings. Scores use BM25F:
+    per-field term frequencies are length-normalised, weighted by the field
+    boost and then saturated once per term.
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS docs ("
+        " pmcid TEXT PRIMARY KEY,"
+        " title TEXT NOT NULL DEFAULT '',"
+        " apa_citation TEXT NOT NULL DEFAULT '',"
+        " abstract TEXT NOT NULL DEFAULT '',"
+        " title_len INTEGER NOT NULL DEFAULT 0,"
+        " abstract_len INTEGER NOT NULL DEFAULT 0,"
+        " body_len INTEGER NOT NULL DEFAULT 0,"
+        " updated_at REAL NOT NULL DEFAULT 0)",
+        "CREATE TABLE IF NOT EXISTS postings ("
+        " term TEXT NOT NULL,"
+        " field TEXT NOT NULL,"
+        " pmcid TEXT NOT NULL,"
+        " tf INTEGER NOT NULL,"
+        " PRIMARY KEY (term, field, pmcid)) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS postings_pmcid ON postings (pmcid, field)",
+    )
+
+    def __init__(
+        self,
+        index_dir: str | Path | None = None,
+        boosts: Dict[str, float] | None = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        clock: Callable[[], float] = time.time,
+    ):
+        if index_dir is None:
+            index_dir = os.getenv("PMC_LOCAL_INDEX_DIR") or (
+                Path(__file__).resolve().parent / "local_index"
+            )
+
+        self.index_dir = Path(index_dir)
+        super().__init__(self.index_dir / "index.sqlite3", clock=clock)
+        self.boosts = {**DEFAULT_BOOSTS, **(boosts or {})}
+        self.k1 = k1
+        self.b = b
+
+    def _write_fields(
+        self, conn: sqlite3.Connection, pmcid: str, texts: Dict[str, str], **columns
+    ) -> None:
+        now = self._clock()
+        conn.execute(
+            "INSERT OR IGNORE INTO docs (pmcid, updated_at) VALUES (?, ?)",
+            (pmcid, now),
+        )
+        for field, text in texts.items():
+            counts = Counter(tokenize(text))
+            conn.execute(
+                "DELETE FROM postings WHERE pmcid = ? AND field = ?", (pmcid, field)
+            )
+            conn.executemany(
+                "INSERT INTO postings (term, field, pmcid, tf) VALUES (?, ?, ?, ?)",
+                [(term, field, pmcid, tf) for term, tf in counts.items()],
+            )
+            columns[f"{field}_len"] = sum(counts.values())
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        conn.execute(
+            f"UPDATE docs SET {assignments}, updated_at = ? WHERE pmcid = ?",
+            (*columns.values(), now, pmcid),
+        )
+
+    def _write(self, writes: Iterable[tuple]) -> None:
+        """Apply ``(pmcid, texts, columns)`` updates in one transaction."""
+        with self._transaction() as conn:
+            for pmcid, texts, columns in writes:
+                self._write_fields(conn, pmcid, texts, **columns)
+
+    @staticmethod
+    def _record_write(record: Dict[str, str]) -> tuple:
+        title = record.get("title", "")
+        abstract = record.get("abstract", "")
+        columns = {
+            "title": title,
+            "apa_citation": record.get("apa_citation", ""),
+            "abstract": abstract,
+        }
+        return record["pmcid"], {"title": title, "abstract": abstract}, columns
+
+    def add_record(self, record: Dict[str, str]) -> None:
+        """Index a parsed search record (pmcid, title, apa_citation, abstract)."""
+        self.add_records([record])
+
+    def add_records(self, records: Iterable[Dict[str, str]]) -> None:
+        writes = [self._record_write(r) for r in records if r.get("pmcid")]
+        if writes:
+            self._write(writes)
+
+    def add_sections(self, pmcid: str, sections: List[Dict[str, str]]) -> None:
+        """Index full-text sections (``title``/``body`` dicts) as the body field."""
+        self.add_sections_batch([(pmcid, sections)])
+
+    def add_sections_batch(
+        self, articles: Iterable[Tuple[str, List[Dict[str, str]]]]
+    ) -> None:
+        """``add_sections`` for many articles in one transaction."""
+        writes = [
+            (
+                pmcid,
+                {
+                    "body": "\n".join(
+                        f"{section.get('title', '')}\n{section.get('body', '')}"
+                        for section in sections
+                    )
+                },
+                {},
+            )
+            for pmcid, sections in articles
+        ]
+        if writes:
+            self._write(writes)
+
+    def delete(self, pmcid: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM postings WHERE pmcid = ?", (pmcid,))
+            conn.execute("DELETE FROM docs WHERE pmcid = ?", (pmcid,))
+
+    def __len__(self) -> int:
+        with self._connection() as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM docs").fetchone()
+        return count
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, object]]:
+        """Rank citable articles for ``query`` by BM25F.
+
+        Each hit is a search record plus ``score`` and ``matched_terms`` (the
+        share of distinct query terms found in the article).
+        """
+        terms = sorted(set(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+
+        with self._connection() as conn:
+            n_docs, *totals = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(title_len), 0),"
+                " COALESCE(SUM(abstract_len), 0), COALESCE(SUM(body_len), 0)"
+                " FROM docs"
+            ).fetchone()
+            if not n_docs:
+                return []
+            avg_len = {f: max(total / n_docs, 1.0) for f, total in zip(FIELDS, totals)}
+
+            placeholders = ",".join("?" * len(terms))
+            rows = conn.execute(
+                "SELECT p.term, p.field, p.pmcid, p.tf,"
+                " d.title_len, d.abstract_len, d.body_len"
+                " FROM postings AS p JOIN docs AS d ON d.pmcid = p.pmcid"
+                f" WHERE p.term IN ({placeholders}) AND d.apa_citation != ''",
+                terms,
+            ).fetchall()
+            if not rows:
+                return []
+
+            # BM25F: length-normalised, boosted tf summed over fields per term
+            k1, b = self.k1, self.b
+            norms = {
+                field: (self.boosts[field], b / avg_len[field]) for field in FIELDS
+            }
+            weighted: Dict[tuple, float] = defaultdict(float)
+            for term, field, pmcid, tf, *lengths in rows:
+                boost, scale = norms[field]
+                length = lengths[FIELDS.index(field)]
+                weighted[pmcid, term] += boost * tf / (1 - b + scale * length)
+
+            df = Counter(term for _, term in weighted)
+            idf = {
+                term: math.log(1 + (n_docs - count + 0.5) / (count + 0.5))
+                for term, count in df.items()
+            }
+            scores: Dict[str, float] = defaultdict(float)
+            matched: Counter = Counter()
+            for (pmcid, term), w in weighted.items():
+                scores[pmcid] += idf[term] * w * (k1 + 1) / (w + k1)
+                matched[pmcid] += 1
+
+            top = sorted(scores, key=lambda pmcid: (-scores[pmcid], pmcid))[:limit]
+            doc_placeholders = ",".join("?" * len(top))
+            docs = {
+                row[0]: row
+                for row in conn.execute(
+                    "SELECT pmcid, title, apa_citation, abstract FROM docs"
+                    f" WHERE pmcid IN ({doc_placeholders})",
+                    top,
+                )
+            }
+
+        return [
+            {
+                "pmcid": pmcid,
+                "title": docs[pmcid][1],
+                "apa_citation": docs[pmcid][2],
+                "abstract": docs[pmcid][3],
+                "score": scores[pmcid],
+                "matched_terms": matched[pmcid] / len(terms),
+            }
+            for pmcid in top
+        ]
@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BYTES_BUCKETS = tuple(1024 * 4**i for i in range(8))  # 1 KiB .. 16 MiB
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+
+class Counter(_Metric):
+    """Monotonic count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] += amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = self._header()
+        for key, value in values:
+            labels = _label_text(self.labelnames, key)
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label combination."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket..., count above the last], sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = defaultdict(float)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            counts[index] += 1
+            self._sums[key] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            return sum(self._counts.get(self._key(labels), ()))
+
+    def sum(self, **labels: str) -> float:
+        with self._lock:
+            return self._sums.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted(
+                (key, list(counts), self._sums[key])
+                for key, counts in self._counts.items()
+            )
+        lines = self._header()
+        names = (*self.labelnames, "le")
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                labels = _label_text(names, (*key, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _label_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = [line for metric in metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "ncbi_request_seconds",
+    "Network time of one NCBI request attempt, rate-limit wait excluded.",
+    ("operation", "outcome"),
+)
+RESPONSE_BYTES = REGISTRY.histogram(
+    "ncbi_response_bytes",
+    "Body size of successful NCBI responses.",
+    ("operation",),
+    buckets=BYTES_BUCKETS,
+)
+RETRIES = REGISTRY.counter(
+    "ncbi_retries_total",
+    "NCBI calls retried after a transient failure.",
+    ("operation",),
+)
+HEDGES = REGISTRY.counter(
+    "ncbi_hedged_requests_total",
+    "Duplicate requests sent because the first was slower than p95.",
+    ("operation",),
+)
+RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    "ncbi_rate_limit_wait_seconds",
+    "Time spent waiting for the shared NCBI rate limiter.",
+    ("bucket",),
+)
+PARSE_SECONDS = REGISTRY.histogram(
+    "ncbi_parse_seconds",
+    "Time spent turning article XML into citations or full-text sections.",
+    ("parser",),
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "ncbi_cache_lookups_total",
+    "Cache lookups in front of esearch and efetch.",
+    ("cache", "result"),
+)
+
+
+class Trace:
+    """Per-request list of NCBI spans, e.g. one chat turn.
+
+    Spans are ``(stage, seconds, attributes)``; stages are ``request``,
+    ``rate_limit``, ``parse``, ``cache``, ``retry`` and ``hedge``.
+    """
+
+    def __init__(self):
+        self.spans: List[Tuple[str, float, Dict[str, object]]] = []
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float = 0.0, **attributes: object) -> None:
+        with self._lock:
+            self.spans.append((stage, seconds, attributes))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count and total seconds per stage, plus bytes for requests."""
+        totals: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for stage, seconds, attributes in spans:
+            total = totals.setdefault(stage, {"count": 0, "seconds": 0.0})
+            total["count"] += 1
+            total["seconds"] += seconds
+            if "bytes" in attributes:
+                total["bytes"] = total.get("bytes", 0) + attributes["bytes"]
+            if stage == "cache":
+                result = attributes.get("result", "miss")
+                total[result] = total.get(result, 0) + 1
+        return totals
+
+
+_current_trace: contextvars.ContextVar[Trace | None] = contextvars.ContextVar(
+    "ncbi_trace", default=None
+)
+
+
+def current_trace() -> Trace | None:
+    return _current_trace.get()
+
+
+@contextmanager
+def trace() -> Iterator[Trace]:
+    """Collect the NCBI spans recorded in this context (and tasks it starts)."""
+    current = Trace()
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+
+
+def _add_span(stage: str, seconds: float = 0.0, **attributes: object) -> None:
+    current = _current_trace.get()
+    if current is not None:
+        current.add(stage, seconds, **attributes)
+
+
+def observe_request(
+    operation: str, seconds: float, nbytes: int | None = None, error: bool = False
+) -> None:
+    outcome = "error" if error else "ok"
+    REQUEST_SECONDS.observe(seconds, operation=operation, outcome=outcome)
+    if nbytes is not None:
+        RESPONSE_BYTES.observe(nbytes, operation=operation)
+    attributes = {"operation": operation, "outcome": outcome}
+    if nbytes is not None:
+        attributes["bytes"] = nbytes
+    _add_span("request", seconds, **attributes)
+
+
+class _RequestTimer:
+    __slots__ = ("nbytes",)
+
+    def __init__(self):
+        self.nbytes: int | None = None
+
+
+@contextmanager
+def request(operation: str) -> Iterator[_RequestTimer]:
+    """Time a blocking NCBI request; set ``.nbytes`` once the body is read."""
+    timer = _RequestTimer()
+    start = time.perf_counter()
+    try:
+        yield timer
+    except BaseException:
+        observe_request(operation, time.perf_counter() - start, error=True)
+        raise
+    observe_request(operation, time.perf_counter() - start, timer.nbytes)
+
+
+def observe_retry(operation: str) -> None:
+    RETRIES.inc(operation=operation)
+    _add_span("retry", operation=operation)
+
+
+def observe_hedge(operation: str) -> None:
+    HEDGES.inc(operation=operation)
+    _add_span("hedge", operation=operation)
+
+
+def observe_rate_limit_wait(seconds: float, bucket: str = "ncbi") -> None:
+    RATE_LIMIT_WAIT_SECONDS.observe(seconds, bucket=bucket)
+    _add_span("rate_limit", seconds, bucket=bucket)
+
+
+def observe_cache(cache: str, hit: bool) -> None:
+    result = "hit" if hit else "miss"
+    CACHE_LOOKUPS.inc(cache=cache, result=result)
+    _add_span("cache", cache=cache, result=result)
+
+
+def timed_parse(parser: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator recording the wrapped parser's run time."""
+
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                PARSE_SECONDS.observe(seconds, parser=parser)
+                _add_span("parse", seconds, parser=parser)
+
+        return wrapper
+
+    return decorator
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def add_route(app, path: str = "/metrics") -> None:
+    """Serve ``render()`` at ``path`` on a Starlette or FastAPI ``app``.
+
+    The route is put first: Chainlit's server ends in a catch-all route for
+    its single-page app, which would answer any path registered after it.
+    """
+    from starlette.responses import Response
+    from starlette.routing import Route
+
+    async def ncbi_metrics(request):
+        return Response(render(), media_type=CONTENT_TYPE)
+
+    app.router.routes.insert(0, Route(path, ncbi_metrics, methods=["GET"]))
@@ -1,138 +1,964 @@
+import asyncio
+import contextvars
 import os
 import re
-from xml.etree import ElementTree as ET
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+from urllib.request import urlopen
 
 from Bio import Entrez
 from dotenv import load_dotenv
+from lxml import etree as ET
+
+from src.medlit_agent.pmc_service import metrics
+from src.medlit_agent.pmc_service.article_store import ArticleStore
+from src.medlit_agent.pmc_service.embedded_articles import EmbeddedArticleList
+from src.medlit_agent.pmc_service.eutils_client import (
+    EUTILS_BASE_URL,
+    OA_SERVICE_URL,
+    AsyncEUtilsClient,
+    RebasedEntrez,
+    set_entrez_socket_timeout,
+)
+from src.medlit_agent.pmc_service.local_search import SEARCH_MODES, LocalSearchIndex
+from src.medlit_agent.pmc_service.query_expansion import (
+    expand_query,
+    reciprocal_rank_fusion,
+)
+from src.medlit_agent.pmc_service.rate_limiter import NCBIRateLimiter
+from src.medlit_agent.pmc_service.resilience import ResilientCaller
+from src.medlit_agent.pmc_service.search_cache import (
+    SearchResultCache,
+    normalize_query,
+)
+from src.medlit_agent.pmc_service.single_flight import SingleFlight
+from src.medlit_agent.pmc_service.unavailable_cache import FullTextUnavailableCache
+from src.medlit_agent.pmc_service.xml_cache import ArticleXMLCache
+from src.medlit_agent.pmc_service.xml_to_dict import FullTextUnavailableError
 
 load_dotenv()
 
+_ARTICLE_RE = re.compile(r"<article[\s>].*?</article>", re.DOTALL)
+
+# every efetch document goes through one hardened parser: no DTD loading,
+# no entity expansion and no network access while parsing
+_PARSER_OPTIONS = {
+    "resolve_entities": False,
+    "no_network": True,
+    "load_dtd": False,
+    "huge_tree": False,
+}
+_XML_PARSER = ET.XMLParser(**_PARSER_OPTIONS)
+
+_LETTER_RE = re.compile(r"[A-Za-z]")
+_YEAR_RE = re.compile(r"(18|19|20)\d{2}")
+_JOURNAL_PIPE_RE = re.compile(r"\s*\|\s*")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+_SPACES_RE = re.compile(r"[ \t]+")
+_SO2_RE = re.compile(r"SO\s*2")
+_ABSTRACT_HEADERS = (
+    "Objective",
+    "Impact Statement",
+    "Introduction",
+    "Methods",
+    "Results",
+    "Conclusion",
+)
+# one alternation instead of a pass per header; the lookahead on the initials
+# skips most positions cheaply and the group that matched names the header so
+# the replacement keeps its canonical capitalisation
+_ABSTRACT_HEADER_RE = re.compile(
+    r"\b(?=[OIMRC])(?:"
+    + "|".join(rf"(?P<h{i}>{h})" for i, h in enumerate(_ABSTRACT_HEADERS))
+    + r"):\s*",
+    flags=re.IGNORECASE,
+)
+
+
+def _abstract_header(match):
+    return f"\n\n{_ABSTRACT_HEADERS[int(match.lastgroup[1:])]}: "
+
+
+# tags collected from <article-meta>; anything not special-cased in
+# _extract_front_matter keeps the first element found
+_META_TAGS = (
+    "contrib",
+    "pub-date",
+    "article-id",
+    "title-group",
+    "volume",
+    "issue",
+    "fpage",
+    "lpage",
+    "abstract",
+)
+_CONTRIB_NAME_TAGS = ("collab", "surname", "given-names")
+
+
+def _fromstring(xml_data):
+    """Parse efetch XML with the shared hardened parser."""
+    if isinstance(xml_data, str):
+        xml_data = xml_data.encode("utf-8")
+    return ET.fromstring(xml_data, _XML_PARSER)
+
+
+class _CountingHandle:
+    """Response handle wrapper that counts the bytes read through it."""
+
+    def __init__(self, handle):
+        self._handle = handle
+        self.nbytes = 0
+
+    def read(self, *args):
+        data = self._handle.read(*args)
+        self.nbytes += len(data)
+        return data
+
+    def close(self):
+        self._handle.close()
+
+
+def _iter_tags(elem, tags):
+    """``elem.iter(*tags)`` that also accepts xml.etree elements."""
+    if isinstance(elem, ET._Element):
+        return elem.iter(*tags)
+    return (el for el in elem.iter() if el.tag in tags)
+
 
 class PMCEndpoint:
+    # NCBI_EUTILS_BASE_URL / NCBI_OA_SERVICE_URL send every call elsewhere,
+    # e.g. to the local simulator in tests/load
+    eutils_base_url = os.getenv("NCBI_EUTILS_BASE_URL") or EUTILS_BASE_URL
+    oa_service_url = os.getenv("NCBI_OA_SERVICE_URL") or OA_SERVICE_URL
+
     # email and api key allow for increased rate limits with NCBI Entrez
 
-    endpoint = Entrez
+    endpoint = (
+        Entrez if eutils_base_url == EUTILS_BASE_URL else RebasedEntrez(eutils_base_url)
+    )
     endpoint.email = os.getenv("EMAIL")
     endpoint.tool = "pmc_apa_abstract_fetcher"
     endpoint.api_key = os.getenv("PMC_API_KEY")
+    # retries are handled by ``resilience``; Entrez's own sleep 15s between tries
+    endpoint.max_tries = 1
+    # a stalled socket raises instead of holding a ``resilience`` worker past
+    # the call deadline
+    socket_timeout = float(os.getenv("NCBI_SOCKET_TIMEOUT_SECONDS", 15.0))
+    set_entrez_socket_timeout(socket_timeout)
+
+    # every process on the host draws from one NCBI request budget
+    rate_limiter = NCBIRateLimiter.for_api_key(endpoint.api_key)
+
+    # raw article XML is cached on disk so repeat fetches skip the network
+    xml_cache = ArticleXMLCache()
+
+    # search hits keep their XML in memory for follow-up full-text requests
+    article_store = ArticleStore()
+
+    # esearch ID lists are reused across rephrasings of the same question
+    search_cache = SearchResultCache()
+
+    # async callers share one pooled keep-alive client instead of Entrez handles;
+    # it has no rate limiter of its own, callers acquire (through ``resilience``
+    # for E-utilities) before each request
+    async_client = AsyncEUtilsClient(
+        base_url=eutils_base_url,
+        oa_service_url=oa_service_url,
+        email=endpoint.email,
+        api_key=endpoint.api_key,
+        tool=endpoint.tool,
+    )
+
+    # deadline, hedged requests, backoff and circuit breaker for every NCBI call
+    resilience = ResilientCaller()
+
+    # concurrent identical esearch/efetch/ingest requests share one call
+    single_flight = SingleFlight()
+
+    # BM25 index over every article we have parsed or ingested; search_mode
+    # "local" answers from it only, "hybrid" falls back to esearch when fewer
+    # than local_min_recall * retmax hits match every query term
+    local_index = LocalSearchIndex()
+    search_mode = os.getenv("PMC_SEARCH_MODE", "remote")
+    local_min_recall = float(os.getenv("PMC_LOCAL_SEARCH_MIN_RECALL", 1.0))
+
+    # articles without retrievable full text fail fast until the TTL expires;
+    # with oa_precheck, the PMC OA service is asked before downloading and
+    # non-OA articles are rejected without fetching their XML
+    unavailable_cache = FullTextUnavailableCache()
+    oa_precheck = os.getenv("PMC_OA_PRECHECK", "0") == "1"
+    oa_precheck_timeout = float(os.getenv("PMC_OA_PRECHECK_TIMEOUT_SECONDS", 5.0))
+
+    # which articles are embedded in ChromaDB, readable without opening Chroma
+    embedded_articles = EmbeddedArticleList()
+
+    # locally generated reformulations (synonyms, MeSH headings) searched
+    # alongside each query and merged by reciprocal rank fusion; 0 disables
+    query_variants = int(os.getenv("PMC_QUERY_VARIANTS", 0))
+
+    @classmethod
+    def _cached_ids(cls, query, retmax):
+        ids = cls.search_cache.get(query, retmax)
+        metrics.observe_cache("search", hit=ids is not None)
+        return ids
+
+    @classmethod
+    def _cached_xml(cls, key):
+        xml_data = cls.xml_cache.get(key)
+        metrics.observe_cache("xml", hit=xml_data is not None)
+        return xml_data
 
     @classmethod
     def _fetch_pmc_ids(cls, query, retmax=5):
         """Search for PMC IDs matching the query."""
-        handle = cls.endpoint.esearch(
-            db="pmc", term=query, retmax=retmax, sort="relevance"
+        cached = cls._cached_ids(query, retmax)
+        if cached is not None:
+            return cached
+
+        def search():
+            record = cls.resilience.call(
+                "esearch",
+                lambda: cls._read_esearch(
+                    "esearch", term=query, retmax=retmax, sort="relevance"
+                ),
+                acquire=cls.rate_limiter.acquire,
+            )
+            ids = record.get("IdList", [])
+            cls.search_cache.put(query, retmax, ids)
+            return ids
+
+        return list(cls.single_flight.do(cls._esearch_key(query, retmax), search))
+
+    @classmethod
+    def _read_esearch(cls, operation, **params):
+        """Send one esearch and return the ``Entrez.read`` record."""
+        # Entrez.read parses while the response streams in
+        with metrics.request(operation) as timer:
+            handle = _CountingHandle(cls.endpoint.esearch(db="pmc", **params))
+            try:
+                record = cls.endpoint.read(handle)
+            finally:
+                handle.close()
+            timer.nbytes = handle.nbytes
+        return record
+
+    @classmethod
+    def _esearch_history(cls, query):
+        """Post ``query`` to the NCBI history server without returning IDs.
+
+        Returns ``(count, webenv, query_key)``; later esearch and efetch
+        calls page through the stored result instead of re-running the query.
+        """
+        record = cls.resilience.call(
+            "esearch-history",
+            lambda: cls._read_esearch(
+                "esearch-history",
+                term=query,
+                usehistory="y",
+                retmax=0,
+                sort="relevance",
+            ),
+            acquire=cls.rate_limiter.acquire,
         )
-        record = cls.endpoint.read(handle)
-        handle.close()
-        return record.get("IdList", [])
+        return int(record.get("Count", 0)), record["WebEnv"], record["QueryKey"]
 
     @classmethod
-    def fetch_pmc_records(cls, query, retmax=5):
-        """Use private methods to fetch and parse PMC XML records."""
-        pmc_ids = cls._fetch_pmc_ids(query, retmax)
-        articles = []
+    def iter_pmc_ids(cls, query, max_results=None, page_size=5000):
+        """Yield the PMC IDs matching ``query`` in relevance order, page by page.
 
-        for pmcid in pmc_ids:
+        For bulk jobs that need more hits than one esearch returns. Only one
+        page of ``page_size`` IDs is held at a time; ``#<query_key>`` refers
+        to the stored result, so NCBI does not evaluate the query again.
+        """
+        count, webenv, query_key = cls._esearch_history(query)
+        total = count if max_results is None else min(count, max_results)
+        for retstart in range(0, total, page_size):
+            retmax = min(page_size, total - retstart)
+            record = cls.resilience.call(
+                "esearch-page",
+                lambda: cls._read_esearch(
+                    "esearch-page",
+                    term=f"#{query_key}",
+                    WebEnv=webenv,
+                    retstart=retstart,
+                    retmax=retmax,
+                    sort="relevance",
+                ),
+                acquire=cls.rate_limiter.acquire,
+            )
+            ids = record.get("IdList", [])
+            yield from ids
+            if len(ids) < retmax:
+                return
+
+    @classmethod
+    def iter_pmc_records(cls, query, max_results=None, page_size=100, cache_xml=False):
+        """Yield parsed records for every article matching ``query``.
+
+        Articles are downloaded ``page_size`` at a time with efetch over the
+        history server (WebEnv/query_key/retstart), so a result set of
+        thousands of articles costs ``count / page_size`` round trips and only
+        one page of XML is in memory at a time. Each article is added to the
+        local search index. The XML cache holds the articles interactive
+        requests keep coming back to and a bulk run would evict them, so
+        articles are only written there with ``cache_xml=True`` (to warm it
+        for one topic). Articles that fail to parse are skipped.
+        """
+        count, webenv, query_key = cls._esearch_history(query)
+        total = count if max_results is None else min(count, max_results)
+        for retstart in range(0, total, page_size):
+            retmax = min(page_size, total - retstart)
+            xml_data = cls.resilience.call(
+                "efetch-page",
+                lambda: cls._read_efetch_page(webenv, query_key, retstart, retmax),
+                acquire=cls.rate_limiter.acquire,
+            )
+            records = []
+            for root in cls._split_articleset(xml_data):
+                pmcid = cls.article_pmcid(root)
+                if not pmcid:
+                    continue
+                if cache_xml:
+                    cls.xml_cache.put(pmcid, cls._wrap_articleset(root))
+                try:
+                    record = cls._parse_article(root, pmcid[3:])
+                except Exception:
+                    continue
+                records.append(record)
+                yield record
+            cls.index_records(records)
+
+    @classmethod
+    def _read_efetch_page(cls, webenv, query_key, retstart, retmax):
+        with metrics.request("efetch-page") as timer:
             handle = cls.endpoint.efetch(
-                db="pmc", id=pmcid, rettype="full", retmode="xml"
+                db="pmc",
+                WebEnv=webenv,
+                query_key=query_key,
+                retstart=retstart,
+                retmax=retmax,
+                rettype="full",
+                retmode="xml",
             )
-            xml_data = handle.read()
-            handle.close()
+            try:
+                data = handle.read()
+            finally:
+                handle.close()
+            timer.nbytes = len(data)
+        return data
+
+    @classmethod
+    def _esearch_key(cls, query, retmax):
+        drop_stop_words = cls.search_cache.drop_stop_words
+        return ("esearch", normalize_query(query, drop_stop_words), retmax)
 
-            root = ET.fromstring(xml_data)
+    @classmethod
+    def search_queries(cls, query, alternative_queries=None):
+        """The query, caller-supplied reformulations and local expansions."""
+        queries = expand_query(query, cls.query_variants)
+        seen = {normalize_query(q) for q in queries}
+        for alternative in alternative_queries or []:
+            key = normalize_query(alternative)
+            if alternative and key not in seen:
+                seen.add(key)
+                queries.append(alternative)
+        return queries
+
+    @classmethod
+    def _fetch_fused_pmc_ids(cls, queries, retmax=5):
+        """Run one esearch per query concurrently and fuse the ID lists.
+
+        Each esearch still takes its turn from the shared rate limiter, so the
+        fan-out costs about one search round trip while the budget allows.
+        """
+        if len(queries) == 1:
+            return cls._fetch_pmc_ids(queries[0], retmax)
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            futures = [
+                pool.submit(
+                    contextvars.copy_context().run, cls._fetch_pmc_ids, q, retmax
+                )
+                for q in queries
+            ]
+            rankings = [future.result() for future in futures]
+        return reciprocal_rank_fusion(rankings, limit=retmax)
+
+    @classmethod
+    async def _afetch_fused_pmc_ids(cls, queries, retmax=5):
+        if len(queries) == 1:
+            return await cls._afetch_pmc_ids(queries[0], retmax)
+        rankings = await asyncio.gather(
+            *(cls._afetch_pmc_ids(q, retmax) for q in queries)
+        )
+        return reciprocal_rank_fusion(rankings, limit=retmax)
+
+    @classmethod
+    def fetch_pmc_records(
+        cls,
+        query,
+        retmax=5,
+        batched=False,
+        front_only=False,
+        alternative_queries=None,
+    ):
+        """Use private methods to fetch and parse PMC XML records.
+
+        With ``batched=True`` all esearch hits are requested in one efetch call
+        instead of one round trip per PMC ID. With ``front_only=True`` responses
+        are stream-parsed only as far as ``</front>``, so the body, references
+        and supplements are never built into a tree. ``alternative_queries``
+        are searched alongside ``query``; when there is more than one query
+        the fused hits are always fetched in one batch.
+        """
+        queries = cls.search_queries(query, alternative_queries)
+        pmc_ids = cls._fetch_fused_pmc_ids(queries, retmax)
+        batched = batched or len(queries) > 1
+        if front_only:
+            articles = cls._fetch_front_matter_records(pmc_ids, batched=batched)
+        elif batched:
+            articles = cls._fetch_pmc_records_batched(pmc_ids)
+        else:
+            articles = cls._fetch_pmc_records_each(pmc_ids)
+        cls.index_records(articles)
+        return articles
+
+    @classmethod
+    def _fetch_pmc_records_each(cls, pmc_ids):
+        articles = []
+
+        for pmcid in pmc_ids:
+            xml_data = cls.fetch_pmcid_xml_bytes(pmcid)
+            cls.article_store.put(cls.canonical_pmcid(pmcid), xml_data)
+
+            root = _fromstring(xml_data)
             articles.append(cls._parse_article(root, pmcid))
 
         return articles
 
+    @classmethod
+    async def _afetch_pmc_ids(cls, query, retmax=5):
+        """Async counterpart of ``_fetch_pmc_ids``."""
+        # the search cache is SQLite on disk; keep it off the loop
+        cached = await asyncio.to_thread(cls._cached_ids, query, retmax)
+        if cached is not None:
+            return cached
+
+        async def search():
+            record = await cls.resilience.acall(
+                "esearch",
+                lambda: cls.async_client.esearch(
+                    db="pmc", term=query, retmax=retmax, sort="relevance"
+                ),
+                acquire=cls.rate_limiter.aacquire,
+            )
+            ids = record.get("IdList", [])
+            await asyncio.to_thread(cls.search_cache.put, query, retmax, ids)
+            return ids
+
+        key = cls._esearch_key(query, retmax)
+        return list(await cls.single_flight.ado(key, search))
+
+    @classmethod
+    async def afetch_pmc_records(cls, query, retmax=5, alternative_queries=None):
+        """Async counterpart of ``fetch_pmc_records``.
+
+        The per-article efetch calls run concurrently over the shared
+        connection pool; results keep the (fused) relevance order.
+        """
+        queries = cls.search_queries(query, alternative_queries)
+        pmc_ids = await cls._afetch_fused_pmc_ids(queries, retmax)
+        articles = list(await asyncio.gather(*(cls._afetch_record(i) for i in pmc_ids)))
+        # the local index is SQLite on disk; keep its writes off the loop
+        await asyncio.to_thread(cls.index_records, articles)
+        return articles
+
+    @classmethod
+    async def astream_pmc_records(cls, query, retmax=5, alternative_queries=None):
+        """Yield ``(rank, record)`` pairs as soon as each article is parsed.
+
+        The efetch calls run concurrently as in ``afetch_pmc_records``, but
+        records come out in completion order so callers can show them before
+        the slowest download finishes; ``rank`` is the esearch relevance
+        position. Closing the generator early cancels the remaining
+        downloads, except those another caller is also waiting for (see
+        ``SingleFlight``).
+        """
+        queries = cls.search_queries(query, alternative_queries)
+        pmc_ids = await cls._afetch_fused_pmc_ids(queries, retmax)
+
+        async def fetch_ranked(rank, pmcid):
+            return rank, await cls._afetch_record(pmcid)
+
+        tasks = [
+            asyncio.ensure_future(fetch_ranked(rank, pmcid))
+            for rank, pmcid in enumerate(pmc_ids)
+        ]
+        fetched = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                rank, record = await next_done
+                fetched.append(record)
+                yield rank, record
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.to_thread(cls.index_records, fetched)
+
+    @classmethod
+    async def arefresh_article(cls, pmcid):
+        """Drop every cached copy of an article, refetch it and re-index it."""
+        key = cls.canonical_pmcid(pmcid)
+        cls.xml_cache.delete(key)
+        cls.article_store.discard(key)
+        cls.unavailable_cache.delete(key)
+        record = await cls._afetch_record(key)
+        await asyncio.to_thread(cls.index_records, [record])
+        return record
+
+    @classmethod
+    async def _afetch_record(cls, pmcid):
+        xml_data = await cls.afetch_pmcid_xml_bytes(pmcid)
+        cls.article_store.put(cls.canonical_pmcid(pmcid), xml_data)
+        return cls._parse_article(_fromstring(xml_data), pmcid)
+
+    @classmethod
+    def index_records(cls, records):
+        """Add parsed records to the local search index under canonical PMCIDs."""
+        cls.local_index.add_records(
+            {**record, "pmcid": cls.canonical_pmcid(record["pmcid"])}
+            for record in records
+        )
+
+    @classmethod
+    def search_local(cls, query, retmax=5, mode=None):
+        """Answer a search from the local index, or None to query NCBI instead.
+
+        Returns None in ``remote`` mode, and in ``hybrid`` mode when too few
+        local hits contain every query term.
+        """
+        mode = mode or cls.search_mode
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {mode!r}; use one of {SEARCH_MODES}")
+        if mode == "remote":
+            return None
+
+        hits = cls.local_index.search(query, limit=retmax)
+        if mode == "hybrid":
+            complete = sum(1 for hit in hits if hit["matched_terms"] >= 1.0)
+            if complete < cls.local_min_recall * retmax:
+                return None
+        return hits
+
+    @classmethod
+    def _fetch_pmc_records_batched(cls, pmc_ids):
+        """Fetch all PMC IDs in a single efetch and parse each returned article.
+
+        Results keep the esearch relevance order. An article that cannot be
+        parsed is dropped so the rest of the set still comes back.
+        """
+        if not pmc_ids:
+            return []
+
+        roots_by_id = {}
+        missing = []
+        for pmcid in pmc_ids:
+            cached = cls._cached_xml(cls.canonical_pmcid(pmcid))
+            roots = cls._split_articleset(cached) if cached is not None else []
+            if roots:
+                roots_by_id[pmcid] = roots[0]
+                cls.article_store.put(cls.canonical_pmcid(pmcid), cached)
+            else:
+                missing.append(pmcid)
+
+        if missing:
+
+            def efetch():
+                with metrics.request("efetch-batch") as timer:
+                    handle = cls.endpoint.efetch(
+                        db="pmc", id=",".join(missing), rettype="full", retmode="xml"
+                    )
+                    try:
+                        data = handle.read()
+                    finally:
+                        handle.close()
+                    timer.nbytes = len(data)
+                return data
+
+            key = ("efetch", tuple(sorted(cls.canonical_pmcid(i) for i in missing)))
+            xml_data = cls.single_flight.do(
+                key,
+                lambda: cls.resilience.call(
+                    "efetch-batch", efetch, acquire=cls.rate_limiter.acquire
+                ),
+            )
+            roots = cls._split_articleset(xml_data)
+            fetched = cls._match_articles_to_ids(roots, missing)
+            for pmcid, root in fetched.items():
+                article_xml = cls._wrap_articleset(root)
+                cls.xml_cache.put(cls.canonical_pmcid(pmcid), article_xml)
+                cls.article_store.put(cls.canonical_pmcid(pmcid), article_xml)
+            roots_by_id.update(fetched)
+
+        articles = []
+        for pmcid in pmc_ids:
+            root = roots_by_id.get(pmcid)
+            if root is None:
+                continue
+            try:
+                articles.append(cls._parse_article(root, pmcid))
+            except Exception:
+                continue
+        return articles
+
+    @classmethod
+    def _fetch_front_matter_records(cls, pmc_ids, batched=False):
+        """Parse search hits from their ``<front>`` only.
+
+        Cached articles are read from the XML cache; the rest are fetched one
+        per efetch (stopping the download at ``</front>``) or, when
+        ``batched``, in a single streamed efetch.
+        """
+        roots_by_id = {}
+        missing = []
+        for pmcid in pmc_ids:
+            cached = cls._cached_xml(cls.canonical_pmcid(pmcid))
+            root = None
+            if cached is not None:
+                root = next(cls._iter_article_fronts([cached]), None)
+            if root is None:
+                missing.append(pmcid)
+            else:
+                roots_by_id[pmcid] = root
+
+        if batched:
+            if missing:
+                roots_by_id.update(cls._efetch_fronts(missing))
+        else:
+            for pmcid in missing:
+                roots_by_id.update(cls._efetch_fronts([pmcid]))
+
+        articles = []
+        for pmcid in pmc_ids:
+            root = roots_by_id.get(pmcid)
+            if root is None:
+                continue
+            if not batched:
+                articles.append(cls._parse_article(root, pmcid))
+                continue
+            try:
+                articles.append(cls._parse_article(root, pmcid))
+            except Exception:
+                continue
+        return articles
+
+    @classmethod
+    def _efetch_fronts(cls, pmc_ids):
+        """Stream one efetch response and map PMC IDs to front-only article roots."""
+
+        def open_efetch():
+            with metrics.request("efetch-open"):
+                return _CountingHandle(
+                    cls.endpoint.efetch(
+                        db="pmc", id=",".join(pmc_ids), rettype="full", retmode="xml"
+                    )
+                )
+
+        # only opening the response is guarded; the body is streamed below
+        handle = cls.resilience.call(
+            "efetch-open",
+            open_efetch,
+            discard=lambda h: h.close(),
+            acquire=cls.rate_limiter.acquire,
+        )
+        start = time.perf_counter()
+        try:
+            if len(pmc_ids) == 1:
+                # closing the handle after </front> skips downloading the body
+                root = next(cls._iter_article_fronts(cls._iter_chunks(handle)), None)
+                return {} if root is None else {pmc_ids[0]: root}
+
+            received = []
+
+            def recorded_chunks():
+                for chunk in cls._iter_chunks(handle):
+                    received.append(chunk)
+                    yield chunk
+
+            try:
+                roots = list(cls._iter_article_fronts(recorded_chunks()))
+            except ET.ParseError:
+                # one broken article spoils the stream; parse articles one by one
+                received.extend(cls._iter_chunks(handle))
+                roots = cls._split_articleset(received[0][:0].join(received))
+            return cls._match_articles_to_ids(roots, pmc_ids)
+        finally:
+            handle.close()
+            # body download interleaved with the incremental front parsing
+            metrics.observe_request(
+                "efetch-stream", time.perf_counter() - start, handle.nbytes
+            )
+
     @staticmethod
-    def _parse_article(root, pmcid):
-        """XML needs to be parsed to extract needed fields for an APA citation."""
+    def _iter_chunks(handle, chunk_size=64 * 1024):
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
 
-        def find_text(path):
-            """Helper method to find text content."""
-            el = root.find(path)
-            return el.text.strip() if el is not None and el.text else ""
+    @staticmethod
+    def _iter_article_fronts(chunks):
+        """Incrementally parse efetch XML, yielding each article once its front closes.
 
-        def has_letter(text: str) -> bool:
-            return bool(re.search(r"[A-Za-z]", text or ""))
+        The yielded ``<article>`` holds only its ``<front>``. Elements outside the
+        front are cleared and detached as soon as they close, so body content
+        never accumulates in memory.
+        """
+        parser = ET.XMLPullParser(events=("start", "end"), **_PARSER_OPTIONS)
+        stack = []
+        front_depth = 0
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                name = elem.tag.rsplit("}", 1)[-1]
+                if event == "start":
+                    stack.append(elem)
+                    if front_depth or name == "front":
+                        front_depth += 1
+                    continue
 
-        def clean_year(text: str) -> str:
-            text = (text or "").strip()
-            if re.fullmatch(r"(18|19|20)\d{2}", text):
-                return text
-            return ""
+                stack.pop()
+                if front_depth:
+                    front_depth -= 1
+                    parent = stack[-1] if stack else None
+                    if (
+                        name == "front"
+                        and parent is not None
+                        and parent.tag.rsplit("}", 1)[-1] == "article"
+                    ):
+                        yield parent
+                    continue
 
-        def first_alpha_initial(given_names: str) -> str:
-            # Prefer first alphabetic character as the initial.
-            m = re.search(r"[A-Za-z]", given_names or "")
-            return m.group(0).upper() if m else ""
+                # the article itself now holds only its front, which we yielded
+                if name != "article":
+                    elem.clear()
+                if stack:
+                    # later siblings may already be in the tree, so detach by identity
+                    stack[-1].remove(elem)
+
+    @staticmethod
+    def _split_articleset(xml_data):
+        """Return one root per ``<article>`` in a ``<pmc-articleset>`` response.
+
+        If the set as a whole is not well-formed, each ``<article>`` is parsed on
+        its own and the broken ones are skipped.
+        """
+        try:
+            root = _fromstring(xml_data)
+        except ET.ParseError:
+            if isinstance(xml_data, bytes):
+                xml_data = xml_data.decode("utf-8", errors="replace")
+            roots = []
+            for match in _ARTICLE_RE.finditer(xml_data):
+                try:
+                    roots.append(_fromstring(match.group(0)))
+                except ET.ParseError:
+                    continue
+            return roots
+
+        if root.tag == "article":
+            return [root]
+        return root.findall("article")
+
+    @staticmethod
+    def _wrap_articleset(root) -> bytes:
+        """Serialize one article the way a single-ID efetch returns it."""
+        article = ET.tostring(root, encoding="unicode")
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f"<pmc-articleset>{article}</pmc-articleset>"
+        ).encode("utf-8")
+
+    @staticmethod
+    def canonical_pmcid(pmcid) -> str:
+        """Normalize ``"PMC123"``, ``"pmc123"`` and ``"123"`` to ``"PMC123"``."""
+        text = str(pmcid or "").strip()
+        if text[:3].upper() == "PMC":
+            text = text[3:]
+        return f"PMC{text}" if text else ""
+
+    @classmethod
+    def article_pmcid(cls, root) -> str:
+        """Canonical PMCID from an ``<article>``'s front matter, or ``""``."""
+        for aid in root.findall(".//front//article-meta//article-id"):
+            if aid.attrib.get("pub-id-type") in ("pmc", "pmcid") and aid.text:
+                return cls.canonical_pmcid(aid.text)
+        return ""
+
+    @classmethod
+    def _match_articles_to_ids(cls, roots, pmc_ids):
+        """Map requested PMC IDs to article roots.
+
+        Articles are matched on their PMC article-id. When an article carries no
+        usable ID and the response has one article per requested ID, the efetch
+        order is used instead.
+        """
+        wanted = {cls.canonical_pmcid(pmcid): pmcid for pmcid in pmc_ids}
+        matched = {}
+        unmatched = []
+        for position, root in enumerate(roots):
+            pmcid = wanted.get(cls.article_pmcid(root))
+            if pmcid is not None and pmcid not in matched:
+                matched[pmcid] = root
+            else:
+                unmatched.append((position, root))
+
+        if len(roots) == len(pmc_ids):
+            for position, root in unmatched:
+                pmcid = pmc_ids[position]
+                if pmcid not in matched:
+                    matched[pmcid] = root
+        return matched
+
+    @classmethod
+    def _extract_front_matter(cls, root):
+        """Collect citation fields from every ``<front>`` in a single walk.
+
+        Each ``<article-meta>`` is scanned once for all the tags we need instead
+        of one ``.//front//article-meta//...`` search per field. As before, the
+        first matching element wins for scalar fields and contributors/pub-dates
+        keep document order.
+        """
+        fields = {
+            "title": None,
+            "contribs": [],
+            "pub_dates": [],
+            "journal": None,
+            "volume": None,
+            "issue": None,
+            "fpage": None,
+            "lpage": None,
+            "doi": None,
+            "abstract": None,
+        }
+
+        for front in root.iter("front"):
+            if front is root:
+                continue
+            for meta in front.iter("article-meta"):
+                for el in _iter_tags(meta, _META_TAGS):
+                    tag = el.tag
+                    if tag == "contrib":
+                        if el.get("contrib-type") == "author":
+                            fields["contribs"].append(el)
+                    elif tag == "pub-date":
+                        fields["pub_dates"].append(el)
+                    elif tag == "article-id":
+                        if (
+                            fields["doi"] is None
+                            and el.get("pub-id-type") == "doi"
+                            and el.text
+                        ):
+                            fields["doi"] = el
+                    elif tag == "title-group":
+                        if fields["title"] is None:
+                            fields["title"] = el.find(".//article-title")
+                    elif fields[tag] is None:
+                        fields[tag] = el
+            if fields["journal"] is None:
+                for journal_meta in front.iter("journal-meta"):
+                    fields["journal"] = journal_meta.find(".//journal-title")
+                    if fields["journal"] is not None:
+                        break
+        return fields
+
+    @staticmethod
+    def _element_text(el):
+        return el.text.strip() if el is not None and el.text else ""
+
+    @staticmethod
+    def _clean_year(text: str) -> str:
+        text = (text or "").strip()
+        if _YEAR_RE.fullmatch(text):
+            return text
+        return ""
+
+    @classmethod
+    @metrics.timed_parse("citation")
+    def _parse_article(cls, root, pmcid):
+        """XML needs to be parsed to extract needed fields for an APA citation."""
+        fields = cls._extract_front_matter(root)
+        clean_year = cls._clean_year
 
-        title = find_text(".//front//article-meta//title-group//article-title")
+        title = cls._element_text(fields["title"])
 
         # Authors: handle person authors and group/collab authors.
         authors = []
-        for contrib in root.findall(
-            ".//front//article-meta//contrib[@contrib-type='author']"
-        ):
-            collab = (contrib.findtext(".//collab") or "").strip()
+        for contrib in fields["contribs"]:
+            names = {}
+            for el in _iter_tags(contrib, _CONTRIB_NAME_TAGS):
+                names.setdefault(el.tag, el.text or "")
+
+            collab = names.get("collab", "").strip()
             if collab:
                 authors.append(collab)
                 continue
 
-            surname = (contrib.findtext(".//surname") or "").strip()
-            given = (contrib.findtext(".//given-names") or "").strip()
+            surname = names.get("surname", "").strip()
+            given = names.get("given-names", "").strip()
 
             # Filter malformed "authors" where the surname is actually a year or numeric.
-            if not surname or not has_letter(surname):
+            if not surname or not _LETTER_RE.search(surname):
                 continue
             if clean_year(surname):
                 continue
 
-            initial = first_alpha_initial(given)
+            # Prefer first alphabetic character as the initial.
+            initial = _LETTER_RE.search(given)
             if initial:
-                authors.append(f"{surname}, {initial}.")
+                authors.append(f"{surname}, {initial.group(0).upper()}.")
             else:
                 authors.append(surname)
 
         year = ""
-        for pd in root.findall(".//front//article-meta//pub-date"):
-            if pd.attrib.get("pub-type") in ("epub", "ppub", "epublish"):
+        for pd in fields["pub_dates"]:
+            if pd.get("pub-type") in ("epub", "ppub", "epublish"):
                 y = clean_year(pd.findtext("year", ""))
                 if y:
                     year = y
                     break
         if not year:
             # Fallback: first valid year anywhere in article-meta
-            for pd in root.findall(".//front//article-meta//pub-date"):
+            for pd in fields["pub_dates"]:
                 y = clean_year(pd.findtext("year", ""))
                 if y:
                     year = y
                     break
 
-        journal = find_text(".//front//journal-meta//journal-title")
-        journal = re.sub(r"\s*\|\s*", " ", journal)
+        journal = _JOURNAL_PIPE_RE.sub(" ", cls._element_text(fields["journal"]))
 
-        volume = find_text(".//front//article-meta//volume")
-        issue = find_text(".//front//article-meta//issue")
+        volume = cls._element_text(fields["volume"])
+        issue = cls._element_text(fields["issue"])
 
-        fpage = find_text(".//front//article-meta//fpage")
-        lpage = find_text(".//front//article-meta//lpage")
+        fpage = cls._element_text(fields["fpage"])
+        lpage = cls._element_text(fields["lpage"])
         pages = f"{fpage}\u2013{lpage}" if fpage and lpage else ""
 
         doi = ""
-        for aid in root.findall(".//front//article-meta//article-id"):
-            if aid.attrib.get("pub-id-type") == "doi" and aid.text:
-                doi = aid.text.replace("https://doi.org/", "").strip()
-                break
+        if fields["doi"] is not None:
+            doi = fields["doi"].text.replace("https://doi.org/", "").strip()
 
         # abstract needs to be cleaned and resassembled
         raw_abstract = ""
-        abstract_node = root.find(".//front//article-meta//abstract")
+        abstract_node = fields["abstract"]
 
         if abstract_node is not None:
             # Extract text from each paragraph element to preserve structure
             paragraphs = []
-            for p in abstract_node.findall(".//p"):
+            for p in abstract_node.iter("p"):
+                if p is abstract_node:
+                    continue
                 para_text = " ".join(
                     text.strip() for text in p.itertext() if text.strip()
                 )
@@ -147,38 +973,33 @@ class PMCEndpoint:
                     text.strip() for text in abstract_node.itertext() if text.strip()
                 )
 
-        abstract = PMCEndpoint._clean_abstract(raw_abstract)
+        abstract = cls._clean_abstract(raw_abstract)
 
         # Generate APA citation
-        apa_citation = PMCEndpoint._format_apa(
+        apa_citation = cls._format_apa(
             authors, year, title, journal, volume, issue, pages, doi
         )
 
-        return {"pmcid": pmcid, "apa_citation": apa_citation, "abstract": abstract}
+        return {
+            "pmcid": pmcid,
+            "title": title,
+            "apa_citation": apa_citation,
+            "abstract": abstract,
+        }
 
     @staticmethod
     def _clean_abstract(raw_abstract: str) -> str:
         text = raw_abstract
 
         # Normalize whitespace
-        text = re.sub(r"\n\s*\n+", "\n\n", text)
-        text = re.sub(r"[ \t]+", " ", text)
+        text = _BLANK_LINES_RE.sub("\n\n", text)
+        text = _SPACES_RE.sub(" ", text)
 
         # Fix broken chemical notation (SO 2 → SO₂)
-        text = re.sub(r"SO\s*2", "SO₂", text)
+        text = _SO2_RE.sub("SO₂", text)
 
         # Need to add section headers if they exist
-        headers = [
-            "Objective",
-            "Impact Statement",
-            "Introduction",
-            "Methods",
-            "Results",
-            "Conclusion",
-        ]
-
-        for h in headers:
-            text = re.sub(rf"\b{h}:\s*", f"\n\n{h}: ", text, flags=re.IGNORECASE)
+        text = _ABSTRACT_HEADER_RE.sub(_abstract_header, text)
 
         text = text.strip()
 
@@ -208,19 +1029,134 @@ class PMCEndpoint:
         return citation
 
     @classmethod
-    def _read_efetch(cls, pmcid: str, rettype: str, retmode: str) -> str:
-        handle = cls.endpoint.efetch(
-            db="pmc", id=pmcid, rettype=rettype, retmode=retmode
-        )
-        try:
-            data = handle.read()
-        finally:
-            handle.close()
+    def _read_efetch(cls, pmcid: str, rettype: str, retmode: str) -> bytes:
+        def efetch():
+            with metrics.request("efetch") as timer:
+                handle = cls.endpoint.efetch(
+                    db="pmc", id=pmcid, rettype=rettype, retmode=retmode
+                )
+                try:
+                    data = handle.read()
+                finally:
+                    handle.close()
+                timer.nbytes = len(data)
+            return data
 
-        if isinstance(data, bytes):
-            return data.decode("utf-8", errors="replace")
+        data = cls.resilience.call("efetch", efetch, acquire=cls.rate_limiter.acquire)
+
+        if isinstance(data, str):
+            return data.encode("utf-8")
         return data
 
+    @classmethod
+    def fetch_pmcid_xml_bytes(cls, pmcid: str) -> bytes:
+        """Article XML exactly as efetch sent it.
+
+        Parsers take these bytes directly, and lxml honours the encoding the
+        document declares, so multi-megabyte articles are never decoded and
+        re-encoded on their way to the converter.
+        """
+        key = cls.canonical_pmcid(pmcid)
+        cached = cls._cached_xml(key)
+        if cached is not None:
+            return cached
+
+        def fetch():
+            if cls.oa_precheck:
+                cls._check_open_access(key)
+            xml_data = cls._read_efetch(pmcid=pmcid, rettype="full", retmode="xml")
+            cls.xml_cache.put(key, xml_data)
+            return xml_data
+
+        return cls.single_flight.do(("efetch", key), fetch)
+
     @classmethod
     def fetch_pmcid_xml(cls, pmcid: str) -> str:
-        return cls._read_efetch(pmcid=pmcid, rettype="full", retmode="xml")
+        """``fetch_pmcid_xml_bytes`` decoded, for callers that want text."""
+        return cls.fetch_pmcid_xml_bytes(pmcid).decode("utf-8", errors="replace")
+
+    @classmethod
+    async def _aread_efetch(cls, pmcid: str, rettype: str, retmode: str) -> bytes:
+        return await cls.resilience.acall(
+            "efetch",
+            lambda: cls.async_client.efetch(
+                db="pmc", ids=pmcid, rettype=rettype, retmode=retmode
+            ),
+            acquire=cls.rate_limiter.aacquire,
+        )
+
+    @classmethod
+    async def afetch_pmcid_xml_bytes(cls, pmcid: str) -> bytes:
+        """Async counterpart of ``fetch_pmcid_xml_bytes``."""
+        key = cls.canonical_pmcid(pmcid)
+        # the XML cache is SQLite on disk; keep its reads and writes off the loop
+        cached = await asyncio.to_thread(cls._cached_xml, key)
+        if cached is not None:
+            return cached
+
+        async def fetch():
+            if cls.oa_precheck:
+                await cls._acheck_open_access(key)
+            xml_data = await cls._aread_efetch(
+                pmcid=pmcid, rettype="full", retmode="xml"
+            )
+            await asyncio.to_thread(cls.xml_cache.put, key, xml_data)
+            return xml_data
+
+        return await cls.single_flight.ado(("efetch", key), fetch)
+
+    @classmethod
+    async def afetch_pmcid_xml(cls, pmcid: str) -> str:
+        """``afetch_pmcid_xml_bytes`` decoded, for callers that want text."""
+        data = await cls.afetch_pmcid_xml_bytes(pmcid)
+        return data.decode("utf-8", errors="replace")
+
+    @classmethod
+    def raise_if_unavailable(cls, pmcid: str) -> None:
+        """Fail fast for articles recently found to lack full text."""
+        reason = cls.unavailable_cache.get(cls.canonical_pmcid(pmcid))
+        if reason is not None:
+            raise FullTextUnavailableError(reason)
+
+    @classmethod
+    def _check_open_access(cls, key: str) -> None:
+        """Raise if the OA service says ``key`` is not open access.
+
+        The check is advisory: if the service is slow or down we go on and
+        let efetch decide.
+        """
+        url = f"{cls.oa_service_url}?{urlencode({'id': key})}"
+        try:
+            cls.rate_limiter.acquire()
+            with metrics.request("oa") as timer:
+                with urlopen(url, timeout=cls.oa_precheck_timeout) as response:
+                    record = response.read()
+                timer.nbytes = len(record)
+        except Exception:
+            return
+        cls._reject_if_not_open_access(key, record)
+
+    @classmethod
+    async def _acheck_open_access(cls, key: str) -> None:
+        try:
+            await cls.rate_limiter.aacquire()
+            record = await asyncio.wait_for(
+                cls.async_client.oa_record(key), timeout=cls.oa_precheck_timeout
+            )
+        except Exception:
+            return
+        cls._reject_if_not_open_access(key, record)
+
+    @classmethod
+    def _reject_if_not_open_access(cls, key: str, record: bytes) -> None:
+        try:
+            error = _fromstring(record).find("error")
+        except ET.XMLSyntaxError:
+            return
+        if error is not None and error.get("code") == "idIsNotOpenAccess":
+            reason = (
+                f"{key} is not in the PMC open access subset; "
+                "cannot extract full text."
+            )
+            cls.unavailable_cache.put(key, reason)
+            raise FullTextUnavailableError(reason)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Dict, Iterable, List
+
+from src.medlit_agent.pmc_service.pmc_endpoint import PMCEndpoint
+
+# prefetching spends NCBI budget and embedding time on articles nobody may
+# open, so deployments opt in by setting PMC_PREFETCH_TOP_K
+DEFAULT_TOP_K = 0
+DEFAULT_CONCURRENCY = 2
+
+
+class FullTextPrefetcher:
+    """Speculatively ingests the top search hits into the full-text store.
+
+    As soon as search results are shown, the first ``top_k`` PMC IDs are
+    fetched, converted, embedded and stored in ChromaDB in the background so a
+    follow-up ``retrieve_full_text`` only reads from the store. At most
+    ``max_concurrency`` articles are ingested at once. Downloads go through
+    ``PMCEndpoint`` and therefore the shared NCBI rate limiter; usually the
+    XML is already in ``PMCEndpoint.article_store`` from the search itself.
+    A new search cancels prefetches for hits it no longer lists.
+    """
+
+    def __init__(
+        self,
+        retriever=None,
+        top_k: int | None = None,
+        max_concurrency: int | None = None,
+    ):
+        if top_k is None:
+            top_k = int(os.getenv("PMC_PREFETCH_TOP_K", DEFAULT_TOP_K))
+        if max_concurrency is None:
+            max_concurrency = int(
+                os.getenv("PMC_PREFETCH_CONCURRENCY", DEFAULT_CONCURRENCY)
+            )
+
+        self.top_k = top_k
+        self.max_concurrency = max(1, max_concurrency)
+        self._retriever = retriever
+        self._semaphore: asyncio.Semaphore | None = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def retriever(self):
+        # built lazily: FullTextRetriever loads Chroma and the embedding model
+        if self._retriever is None:
+            from src.medlit_agent.pmc_service.full_text_retriever import (
+                FullTextRetriever,
+            )
+
+            self._retriever = FullTextRetriever()
+        return self._retriever
+
+    def schedule(self, pmcids: Iterable[str]) -> List[asyncio.Task]:
+        """Start prefetching the top hits; must be called from a running loop."""
+        wanted = []
+        for pmcid in pmcids:
+            pmcid = PMCEndpoint.canonical_pmcid(pmcid)
+            if pmcid not in wanted:
+                wanted.append(pmcid)
+        wanted = wanted[: self.top_k]
+
+        for pmcid, task in list(self._tasks.items()):
+            if pmcid not in wanted:
+                task.cancel()
+                del self._tasks[pmcid]
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        for pmcid in wanted:
+            if pmcid not in self._tasks:
+                task = asyncio.create_task(self._prefetch(pmcid))
+                task.add_done_callback(self._forget(pmcid))
+                self._tasks[pmcid] = task
+        return [self._tasks[pmcid] for pmcid in wanted if pmcid in self._tasks]
+
+    def _forget(self, pmcid: str):
+        def callback(task: asyncio.Task) -> None:
+            if self._tasks.get(pmcid) is task:
+                del self._tasks[pmcid]
+
+        return callback
+
+    async def _prefetch(self, pmcid: str) -> bool:
+        async with self._semaphore:
+            # speculative work never hammers NCBI while it is failing
+            if PMCEndpoint.resilience.breaker.state == "open":
+                return False
+            try:
+                return await self.retriever.aingest(pmcid)
+            except Exception:
+                # the user's own request will retry and surface the error
+                return False
+
+    def is_pending(self, pmcid: str) -> bool:
+        return PMCEndpoint.canonical_pmcid(pmcid) in self._tasks
+
+    async def wait_for(self, pmcid: str) -> None:
+        """Wait for an in-flight prefetch of ``pmcid`` (if any) to finish."""
+        task = self._tasks.get(PMCEndpoint.canonical_pmcid(pmcid))
+        if task is None:
+            return
+        try:
+            await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+
+    def cancel(self) -> None:
+        """Cancel every outstanding prefetch."""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Sequence
+
+from src.medlit_agent.pmc_service.search_cache import (
+    STOP_WORDS,
+    normalize_query,
+    uses_entrez_syntax,
+)
+
+# constant from Cormack et al.; damps the weight of top ranks so agreement
+# across lists matters more than a single list's first hit
+RRF_K = 60
+
+# lay phrasing -> preferred clinical (MeSH heading) phrasing; matching is
+# case-insensitive on whole words
+SYNONYMS: Dict[str, str] = {
+    "heart attack": "myocardial infarction",
+    "high blood pressure": "hypertension",
+    "stroke": "cerebrovascular accident",
+    "cancer": "neoplasms",
+    "tumor": "neoplasms",
+    "kidney disease": "renal insufficiency",
+    "kidney failure": "renal insufficiency",
+    "diabetes": "diabetes mellitus",
+    "sugar": "glucose",
+    "blood sugar": "blood glucose",
+    "obesity": "obesity",
+    "overweight": "obesity",
+    "depression": "depressive disorder",
+    "anxiety": "anxiety disorders",
+    "dementia": "dementia",
+    "alzheimer's": "alzheimer disease",
+    "flu": "influenza",
+    "covid": "covid-19",
+    "covid19": "covid-19",
+    "coronavirus": "covid-19",
+    "asthma": "asthma",
+    "copd": "pulmonary disease, chronic obstructive",
+    "painkillers": "analgesics",
+    "pain killers": "analgesics",
+    "blood thinners": "anticoagulants",
+    "antibiotics": "anti-bacterial agents",
+    "vaccine": "vaccines",
+    "vaccines": "vaccines",
+    "exercise": "exercise",
+    "smoking": "tobacco smoking",
+    "sleep": "sleep",
+    "insomnia": "sleep initiation and maintenance disorders",
+    "birth control": "contraception",
+    "pregnancy": "pregnancy",
+    "heart disease": "heart diseases",
+    "cholesterol": "cholesterol",
+    "aspirin": "aspirin",
+}
+
+_HEADINGS = frozenset(SYNONYMS.values())
+# headings are matched too, so "diabetes mellitus" is not rewritten as
+# "diabetes mellitus mellitus"; longest alternatives first
+_TERM_RE = re.compile(
+    r"(?<!\w)("
+    + "|".join(
+        re.escape(term)
+        for term in sorted({*SYNONYMS, *_HEADINGS}, key=len, reverse=True)
+    )
+    + r")(?!\w)",
+    re.IGNORECASE,
+)
+
+
+_WORD_RE = re.compile(r"[\w'-]+")
+
+
+def _heading(term: str) -> str:
+    term = term.casefold()
+    return term if term in _HEADINGS else SYNONYMS[term]
+
+
+def _synonym_variant(query: str) -> str:
+    return _TERM_RE.sub(lambda m: _heading(m.group(1)), query)
+
+
+def _mesh_variant(query: str) -> str:
+    """Tag recognised concepts as MeSH headings and keep the other terms."""
+    parts = []
+    for i, segment in enumerate(_TERM_RE.split(query)):
+        if i % 2:
+            parts.append(f'"{_heading(segment)}"[MeSH Terms]')
+        else:
+            parts.extend(
+                word
+                for word in _WORD_RE.findall(segment)
+                if word.casefold() not in STOP_WORDS
+            )
+    if not any(part.endswith("[MeSH Terms]") for part in parts):
+        return ""
+    return " AND ".join(dict.fromkeys(parts))
+
+
+def expand_query(query: str, max_variants: int = 2) -> List[str]:
+    """Return ``query`` followed by up to ``max_variants`` reformulations.
+
+    Variants swap lay phrases for their clinical synonyms and restate the
+    recognised concepts as MeSH headings. Queries already written in Entrez
+    syntax are left alone. Variants that normalise to an earlier query are
+    dropped.
+    """
+    queries = [query]
+    if max_variants <= 0 or uses_entrez_syntax(query):
+        return queries
+
+    seen = {normalize_query(query)}
+    for variant in (_synonym_variant(query), _mesh_variant(query)):
+        if len(queries) > max_variants:
+            break
+        key = normalize_query(variant)
+        if variant and key not in seen:
+            seen.add(key)
+            queries.append(variant)
+    return queries
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[Sequence[str]], k: int = RRF_K, limit: int | None = None
+) -> List[str]:
+    """Merge ranked ID lists by summing ``1 / (k + rank)`` per ID.
+
+    Ties keep the order in which IDs were first seen, so the original query's
+    ranking wins when the lists do not disagree.
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] += 1.0 / (k + rank)
+    fused = sorted(scores, key=lambda item: -scores[item])
+    return fused if limit is None else fused[:limit]
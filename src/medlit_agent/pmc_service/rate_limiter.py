@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from src.medlit_agent.pmc_service import metrics
+from src.medlit_agent.pmc_service.sqlite_store import SQLiteStore
+
+# NCBI E-utilities quota per host: 3 req/s anonymously, 10 req/s with an API key.
+ANONYMOUS_RATE = 3.0
+API_KEY_RATE = 10.0
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to wait longer than ``max_wait``."""
+
+
+class NCBIRateLimiter(SQLiteStore):
+    """Token-bucket limiter for NCBI calls shared by every process on the host.
+
+    The bucket lives in a small SQLite file, so Chainlit workers and eval jobs
+    draw from one budget. Each caller reserves the next free slot inside an
+    exclusive transaction and then sleeps until that slot, which queues requests
+    in FIFO order instead of failing them. Only a request whose slot is more
+    than ``max_wait`` seconds away is rejected.
+
+    ``burst`` defaults to 1, i.e. requests are spaced exactly ``1/rate``
+    apart. A larger burst lets idle capacity be spent at once, but then up to
+    ``rate + burst - 1`` requests can fall into one second, above NCBI's
+    per-second limit.
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS buckets ("
+        " name TEXT PRIMARY KEY,"
+        " next_slot REAL NOT NULL DEFAULT 0,"
+        " acquired INTEGER NOT NULL DEFAULT 0,"
+        " rejected INTEGER NOT NULL DEFAULT 0,"
+        " wait_seconds REAL NOT NULL DEFAULT 0,"
+        " max_wait_seconds REAL NOT NULL DEFAULT 0)",
+    )
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: int = 1,
+        db_path: str | Path | None = None,
+        bucket: str = "ncbi",
+        max_wait: float = 30.0,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate is None:
+            rate = float(os.getenv("NCBI_RATE_LIMIT_RPS", ANONYMOUS_RATE))
+        if db_path is None:
+            db_path = os.getenv("NCBI_RATE_LIMIT_DB") or (
+                Path(tempfile.gettempdir()) / "medlit_ncbi_rate_limit.sqlite3"
+            )
+
+        super().__init__(db_path, clock=clock)
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.bucket = bucket
+        self.max_wait = max_wait
+        self._sleep = sleep
+
+    @classmethod
+    def for_api_key(cls, api_key: str | None, **kwargs) -> "NCBIRateLimiter":
+        """Build a limiter sized to the NCBI quota for the given API key."""
+        if "NCBI_RATE_LIMIT_RPS" not in os.environ:
+            kwargs.setdefault("rate", API_KEY_RATE if api_key else ANONYMOUS_RATE)
+        return cls(**kwargs)
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        super()._create_schema(conn)
+        conn.execute("INSERT OR IGNORE INTO buckets (name) VALUES (?)", (self.bucket,))
+
+    def _reserve(self) -> float:
+        """Reserve the next slot and return how long the caller must wait."""
+        interval = 1.0 / self.rate
+        tolerance = (self.burst - 1) * interval
+
+        with self._transaction() as conn:
+            (next_slot,) = conn.execute(
+                "SELECT next_slot FROM buckets WHERE name = ?", (self.bucket,)
+            ).fetchone()
+            now = self._clock()
+            slot = max(next_slot, now)
+            wait = slot - tolerance - now
+            # ignore float residue from accumulating 1/rate intervals
+            wait = wait if wait > 1e-6 else 0.0
+
+            if wait > self.max_wait:
+                conn.execute(
+                    "UPDATE buckets SET rejected = rejected + 1 WHERE name = ?",
+                    (self.bucket,),
+                )
+            else:
+                conn.execute(
+                    "UPDATE buckets SET next_slot = ?, acquired = acquired + 1,"
+                    " wait_seconds = wait_seconds + ?,"
+                    " max_wait_seconds = MAX(max_wait_seconds, ?)"
+                    " WHERE name = ?",
+                    (slot + interval, wait, wait, self.bucket),
+                )
+
+        if wait > self.max_wait:
+            raise RateLimitExceeded(
+                f"NCBI rate limit: next slot in {wait:.2f}s exceeds "
+                f"max_wait={self.max_wait:.2f}s"
+            )
+        return wait
+
+    def acquire(self) -> float:
+        """Block until this process may send one NCBI request; return the wait."""
+        wait = self._reserve()
+        metrics.observe_rate_limit_wait(wait, bucket=self.bucket)
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    async def aacquire(self) -> float:
+        """Async variant of ``acquire`` that waits without blocking the loop."""
+        # the reservation may wait on another process's sqlite lock
+        wait = await asyncio.to_thread(self._reserve)
+        metrics.observe_rate_limit_wait(wait, bucket=self.bucket)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self) -> Dict[str, float]:
+        """Host-wide counters for this bucket."""
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT acquired, rejected, wait_seconds, max_wait_seconds"
+                " FROM buckets WHERE name = ?",
+                (self.bucket,),
+            ).fetchone()
+        acquired, rejected, wait_seconds, max_wait_seconds = row
+        return {
+            "acquired": acquired,
+            "rejected": rejected,
+            "wait_seconds_total": wait_seconds,
+            "wait_seconds_max": max_wait_seconds,
+        }
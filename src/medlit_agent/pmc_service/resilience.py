@@ -0,0 +1,447 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import http.client
+import os
+import random
+import threading
+import time
+import urllib.error
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Deque, Dict, List, TypeVar
+
+import httpx
+
+from src.medlit_agent.pmc_service import metrics
+from src.medlit_agent.pmc_service.rate_limiter import RateLimitExceeded
+
+T = TypeVar("T")
+
+# NCBI answers 429 when a key's quota is exceeded and 5xx while overloaded.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Raised without contacting NCBI while the circuit breaker is open."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Transient transport failures and overload statuses are worth retrying."""
+    if isinstance(exc, RateLimitExceeded):
+        return False
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUSES
+    if isinstance(exc, urllib.error.HTTPError):
+        return exc.code in RETRY_STATUSES
+    return isinstance(
+        exc,
+        (
+            TimeoutError,
+            ConnectionError,
+            httpx.TransportError,
+            urllib.error.URLError,
+            http.client.HTTPException,
+        ),
+    )
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker shared by every NCBI call in the process.
+
+    After ``failure_threshold`` transient failures in a row the circuit opens
+    and calls fail immediately with ``CircuitOpenError``. Once ``reset_timeout``
+    has passed a single probe call is let through; its outcome closes the
+    circuit again or restarts the timeout.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._clock() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            waited = self._clock() - self._opened_at
+            if waited >= self.reset_timeout and not self._probing:
+                self._probing = True
+                return
+        raise CircuitOpenError(
+            "NCBI E-utilities are failing; not retrying for "
+            f"{max(0.0, self.reset_timeout - waited):.0f}s"
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release(self) -> None:
+        """End a probe that never reached NCBI without judging its health."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._probing = False
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per operation."""
+
+    def __init__(self, window: int = 100, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(operation)
+            if samples is None:
+                samples = self._samples[operation] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, operation: str, q: float) -> float | None:
+        """The ``q`` quantile of recent latencies, or None until warmed up."""
+        with self._lock:
+            samples = sorted(self._samples.get(operation, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class ResilientCaller:
+    """Deadline, hedging, retries and circuit breaking around NCBI requests.
+
+    Each call gets ``deadline`` seconds in total. If an attempt has not
+    answered after the operation's p95 latency (``hedge_delay`` until enough
+    samples exist) an identical second request is raced against it and the
+    first success wins. Transient failures are retried with full-jitter
+    exponential backoff while time remains. ``acquire`` takes a rate-limiter
+    token before every attempt, hedges and retries included, so they count
+    against the NCBI budget. The hedge clock and the latency samples start
+    once the token is held: time queued behind the limiter is not mistaken
+    for a slow response.
+
+    A blocking attempt cannot be interrupted once it runs on the worker
+    pool; the deadline only stops waiting for it. The callables must bound
+    their own I/O (``PMCEndpoint`` sets a socket timeout on Entrez) so hung
+    requests do not pile up on the workers.
+    """
+
+    def __init__(
+        self,
+        deadline: float | None = None,
+        max_attempts: int | None = None,
+        hedge: bool | None = None,
+        hedge_delay: float = 2.0,
+        min_hedge_delay: float = 0.25,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 8.0,
+        breaker: CircuitBreaker | None = None,
+        latency: LatencyTracker | None = None,
+        max_workers: int = 8,
+        rng: random.Random | None = None,
+    ):
+        if deadline is None:
+            deadline = float(os.getenv("NCBI_CALL_DEADLINE_SECONDS", 20.0))
+        if max_attempts is None:
+            max_attempts = int(os.getenv("NCBI_MAX_ATTEMPTS", 3))
+        if hedge is None:
+            hedge = os.getenv("NCBI_HEDGE_REQUESTS", "1") != "0"
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=int(os.getenv("NCBI_BREAKER_FAILURES", 5)),
+                reset_timeout=float(os.getenv("NCBI_BREAKER_RESET_SECONDS", 30.0)),
+            )
+
+        self.deadline = deadline
+        self.max_attempts = max(1, max_attempts)
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.breaker = breaker
+        self.latency = latency or LatencyTracker()
+        self.max_workers = max_workers
+        self._rng = rng or random.Random()
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="ncbi"
+                )
+            return self._executor
+
+    def hedge_after(self, operation: str) -> float:
+        p95 = self.latency.percentile(operation, 0.95)
+        if p95 is None:
+            return self.hedge_delay
+        return max(self.min_hedge_delay, p95)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number ``attempt`` (0-based)."""
+        return self._rng.uniform(
+            0.0, min(self.backoff_cap, self.backoff_base * 2**attempt)
+        )
+
+    def _settle(self, exc: Exception) -> None:
+        # NCBI answered (e.g. 400 or unparseable XML), so it is reachable;
+        # a local rate-limit rejection says nothing about its health
+        if isinstance(exc, RateLimitExceeded):
+            self.breaker.release()
+        else:
+            self.breaker.record_success()
+
+    def _timed(
+        self,
+        operation: str,
+        fn: Callable[[], T],
+        acquire: Callable[[], object] | None,
+        sent: List[float],
+    ) -> T:
+        if acquire is not None:
+            acquire()
+        start = time.monotonic()
+        sent.append(start)
+        result = fn()
+        self.latency.record(operation, time.monotonic() - start)
+        return result
+
+    def _submit(
+        self,
+        operation: str,
+        fn: Callable[[], T],
+        acquire: Callable[[], object] | None,
+        sent: List[float],
+    ):
+        # run in a copy of the caller's context so spans reach its trace
+        context = contextvars.copy_context()
+        return self._get_executor().submit(
+            context.run, self._timed, operation, fn, acquire, sent
+        )
+
+    def _until_hedge(self, operation: str, sent: List[float], now: float) -> float:
+        """Seconds until the first request has been out for the hedge delay.
+
+        Before it is sent (still waiting for a token or a worker) the delay
+        is counted from ``now``, i.e. the check is simply repeated later.
+        """
+        return (sent[0] if sent else now) + self.hedge_after(operation) - now
+
+    def _attempt(
+        self,
+        operation: str,
+        fn: Callable[[], T],
+        timeout: float,
+        discard: Callable[[T], None] | None,
+        acquire: Callable[[], object] | None,
+    ) -> T:
+        end = time.monotonic() + timeout
+        sent: List[float] = []
+        pending = {self._submit(operation, fn, acquire, sent)}
+        hedged = not self.hedge
+        error: BaseException | None = None
+
+        while pending:
+            now = time.monotonic()
+            remaining = end - now
+            if remaining <= 0:
+                break
+            wait_for = remaining
+            if not hedged:
+                wait_for = max(
+                    0.0, min(remaining, self._until_hedge(operation, sent, now))
+                )
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        if not loser.cancel() and discard is not None:
+                            loser.add_done_callback(_discard_result(discard))
+                    return future.result()
+                error = future.exception()
+
+            now = time.monotonic()
+            if (
+                not hedged
+                and not done
+                and sent
+                and self._until_hedge(operation, sent, now) <= 0
+            ):
+                # no answer within the p95 latency: race an identical request
+                hedged = True
+                if now < end:
+                    metrics.observe_hedge(operation)
+                    pending.add(self._submit(operation, fn, acquire, []))
+
+        for loser in pending:
+            if not loser.cancel() and discard is not None:
+                loser.add_done_callback(_discard_result(discard))
+        if error is not None:
+            raise error
+        raise TimeoutError(f"NCBI {operation} did not answer within {timeout:.1f}s")
+
+    def call(
+        self,
+        operation: str,
+        fn: Callable[[], T],
+        discard: Callable[[T], None] | None = None,
+        acquire: Callable[[], object] | None = None,
+    ) -> T:
+        """Run a blocking NCBI request under the deadline/hedge/retry policy.
+
+        ``discard`` is called with the result of a hedge that lost the race
+        (e.g. to close an open response handle). ``acquire`` (e.g.
+        ``NCBIRateLimiter.acquire``) blocks until the request may be sent.
+        """
+        end = time.monotonic() + self.deadline
+        for attempt in range(self.max_attempts):
+            self.breaker.before_call()
+            try:
+                result = self._attempt(
+                    operation, fn, end - time.monotonic(), discard, acquire
+                )
+            except Exception as exc:
+                if not is_retryable(exc):
+                    self._settle(exc)
+                    raise
+                self.breaker.record_failure()
+                delay = self.backoff(attempt)
+                if attempt + 1 >= self.max_attempts or time.monotonic() + delay >= end:
+                    raise
+                metrics.observe_retry(operation)
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+        raise AssertionError("unreachable")
+
+    async def _atimed(
+        self,
+        operation: str,
+        fn: Callable[[], Awaitable[T]],
+        acquire: Callable[[], Awaitable[object]] | None,
+        sent: List[float],
+    ) -> T:
+        if acquire is not None:
+            await acquire()
+        start = time.monotonic()
+        sent.append(start)
+        result = await fn()
+        self.latency.record(operation, time.monotonic() - start)
+        return result
+
+    async def _aattempt(
+        self,
+        operation: str,
+        fn: Callable[[], Awaitable[T]],
+        acquire: Callable[[], Awaitable[object]] | None,
+    ) -> T:
+        sent: List[float] = []
+        pending = {asyncio.ensure_future(self._atimed(operation, fn, acquire, sent))}
+        hedged = not self.hedge
+        error: BaseException | None = None
+        try:
+            while pending:
+                timeout = None
+                if not hedged:
+                    timeout = max(
+                        0.0, self._until_hedge(operation, sent, time.monotonic())
+                    )
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+
+                if (
+                    not hedged
+                    and not done
+                    and sent
+                    and self._until_hedge(operation, sent, time.monotonic()) <= 0
+                ):
+                    hedged = True
+                    metrics.observe_hedge(operation)
+                    pending.add(
+                        asyncio.ensure_future(self._atimed(operation, fn, acquire, []))
+                    )
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def acall(
+        self,
+        operation: str,
+        fn: Callable[[], Awaitable[T]],
+        acquire: Callable[[], Awaitable[object]] | None = None,
+    ) -> T:
+        """Async counterpart of ``call``; losing hedges are cancelled.
+
+        ``acquire`` is awaited before each attempt (e.g.
+        ``NCBIRateLimiter.aacquire``).
+        """
+        loop = asyncio.get_running_loop()
+        end = loop.time() + self.deadline
+        for attempt in range(self.max_attempts):
+            self.breaker.before_call()
+            try:
+                result = await asyncio.wait_for(
+                    self._aattempt(operation, fn, acquire), timeout=end - loop.time()
+                )
+            except Exception as exc:
+                if not is_retryable(exc):
+                    self._settle(exc)
+                    raise
+                self.breaker.record_failure()
+                delay = self.backoff(attempt)
+                if attempt + 1 >= self.max_attempts or loop.time() + delay >= end:
+                    raise
+                metrics.observe_retry(operation)
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+        raise AssertionError("unreachable")
+
+
+def _discard_result(discard: Callable[[T], None]):
+    def callback(future):
+        if not future.cancelled() and future.exception() is None:
+            discard(future.result())
+
+    return callback
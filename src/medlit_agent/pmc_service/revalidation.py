@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List
+
+from src.medlit_agent.pmc_service.pmc_endpoint import PMCEndpoint
+from src.medlit_agent.pmc_service.sqlite_store import SQLiteStore
+
+# esummary accepts a few hundred UIDs per call; the client POSTs long lists
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_CONCURRENCY = 1
+
+# esummary fields that change when PMC publishes a new version of an article;
+# citation counts and similar bookkeeping are left out on purpose
+REVISION_FIELDS = (
+    "title",
+    "authors",
+    "pubdate",
+    "epubdate",
+    "printpubdate",
+    "sortdate",
+    "pmclivedate",
+    "volume",
+    "issue",
+    "pages",
+    "articleids",
+)
+
+
+def revision_token(summary: Dict[str, Any]) -> str:
+    """Fingerprint of the esummary fields that identify an article version."""
+    fields = {name: summary.get(name) for name in REVISION_FIELDS}
+    encoded = json.dumps(fields, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ArticleRevalidator(SQLiteStore):
+    """Finds cached articles that PMC has since updated and refreshes them.
+
+    Every PMCID held in the XML cache or listed in
+    ``PMCEndpoint.embedded_articles`` is checked with batched esummary calls
+    (``batch_size`` IDs per request). The summary's version fields are
+    fingerprinted and compared with the fingerprint from the previous pass. Only articles whose fingerprint changed are refetched
+    and re-indexed, and re-embedded if they were in ChromaDB. The first pass
+    only records fingerprints.
+
+    All calls go through ``PMCEndpoint``, so they draw from the shared NCBI
+    rate limiter. A pass stops early while the circuit breaker is open.
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS revisions ("
+        " pmcid TEXT PRIMARY KEY,"
+        " token TEXT NOT NULL,"
+        " checked_at REAL NOT NULL)",
+    )
+
+    def __init__(
+        self,
+        retriever=None,
+        batch_size: int | None = None,
+        max_concurrency: int | None = None,
+        interval_seconds: float | None = None,
+        state_dir: str | Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if batch_size is None:
+            batch_size = int(os.getenv("PMC_REVALIDATE_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+        if max_concurrency is None:
+            max_concurrency = int(
+                os.getenv("PMC_REVALIDATE_CONCURRENCY", DEFAULT_CONCURRENCY)
+            )
+        if interval_seconds is None:
+            interval_seconds = float(os.getenv("PMC_REVALIDATE_INTERVAL_SECONDS", 0))
+        if state_dir is None:
+            state_dir = os.getenv("PMC_REVALIDATE_DIR") or (
+                Path(__file__).resolve().parent / "revalidation"
+            )
+
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.interval_seconds = interval_seconds
+        self.state_dir = Path(state_dir)
+        super().__init__(self.state_dir / "revisions.sqlite3", clock=clock)
+        self._retriever = retriever
+        self._task: asyncio.Task | None = None
+
+    @property
+    def retriever(self):
+        # built lazily: FullTextRetriever loads Chroma and the embedding model
+        if self._retriever is None:
+            from src.medlit_agent.pmc_service.full_text_retriever import (
+                FullTextRetriever,
+            )
+
+            self._retriever = FullTextRetriever()
+        return self._retriever
+
+    def _load_tokens(self) -> Dict[str, str]:
+        with self._connection() as conn:
+            return dict(conn.execute("SELECT pmcid, token FROM revisions"))
+
+    def _save_tokens(self, tokens: Dict[str, str]) -> None:
+        if not tokens:
+            return
+        now = self._clock()
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO revisions (pmcid, token, checked_at)"
+                " VALUES (?, ?, ?)",
+                [(pmcid, token, now) for pmcid, token in tokens.items()],
+            )
+
+    def cached_pmcids(self) -> List[str]:
+        """PMCIDs held in the XML cache or embedded in the full-text store."""
+        pmcids = set(PMCEndpoint.xml_cache.pmcids())
+        pmcids.update(PMCEndpoint.embedded_articles.pmcids())
+        return sorted(pmcids)
+
+    async def arevalidate(
+        self, pmcids: Iterable[str] | None = None
+    ) -> Dict[str, List[str]]:
+        """Check ``pmcids`` (default: everything cached) and refresh changes.
+
+        Returns the PMCIDs sorted into ``changed``, ``unchanged``, ``new``
+        (no earlier fingerprint), ``missing`` (no summary) and ``failed``
+        (changed but the refresh failed; retried on the next pass).
+        """
+        if pmcids is None:
+            pmcids = await asyncio.to_thread(self.cached_pmcids)
+        pmcids = list(dict.fromkeys(PMCEndpoint.canonical_pmcid(p) for p in pmcids))
+        report = {key: [] for key in ("changed", "unchanged", "new", "missing")}
+        report["failed"] = []
+        previous = await asyncio.to_thread(self._load_tokens)
+
+        changed: Dict[str, str] = {}
+        for start in range(0, len(pmcids), self.batch_size):
+            # background work yields to user traffic while NCBI is failing
+            if PMCEndpoint.resilience.breaker.state == "open":
+                break
+            batch = pmcids[start : start + self.batch_size]
+            summaries = await PMCEndpoint.resilience.acall(
+                "esummary",
+                lambda: PMCEndpoint.async_client.esummary(
+                    ids=[pmcid[3:] for pmcid in batch]
+                ),
+                acquire=PMCEndpoint.rate_limiter.aacquire,
+            )
+
+            unchanged: Dict[str, str] = {}
+            for pmcid in batch:
+                summary = summaries.get(pmcid[3:])
+                if not summary or "error" in summary:
+                    report["missing"].append(pmcid)
+                    continue
+                token = revision_token(summary)
+                if pmcid not in previous:
+                    report["new"].append(pmcid)
+                    unchanged[pmcid] = token
+                elif previous[pmcid] == token:
+                    report["unchanged"].append(pmcid)
+                    unchanged[pmcid] = token
+                else:
+                    changed[pmcid] = token
+            await asyncio.to_thread(self._save_tokens, unchanged)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def refresh(pmcid: str) -> None:
+            async with semaphore:
+                try:
+                    await self._refresh(pmcid)
+                except Exception:
+                    # keep the old fingerprint so the next pass tries again
+                    report["failed"].append(pmcid)
+                    return
+            await asyncio.to_thread(self._save_tokens, {pmcid: changed[pmcid]})
+            report["changed"].append(pmcid)
+
+        await asyncio.gather(*(refresh(pmcid) for pmcid in changed))
+        return report
+
+    async def _refresh(self, pmcid: str) -> None:
+        await PMCEndpoint.arefresh_article(pmcid)
+        if await asyncio.to_thread(PMCEndpoint.embedded_articles.contains, pmcid):
+            # only articles that need re-embedding build the retriever, and
+            # it loads Chroma and the embedding model in a worker thread
+            retriever = await asyncio.to_thread(lambda: self.retriever)
+            await asyncio.to_thread(retriever.db.delete, pmcid)
+            await retriever.aingest(pmcid)
+
+    def start(self) -> asyncio.Task | None:
+        """Revalidate every ``interval_seconds`` in the background (0 disables).
+
+        Must be called from a running loop; calling it again while the job is
+        running returns the existing task.
+        """
+        if self.interval_seconds <= 0:
+            return None
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.arevalidate()
+            except Exception:
+                # a failed pass (e.g. NCBI down) is simply retried next interval
+                pass
+            await asyncio.sleep(self.interval_seconds)
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+if __name__ == "__main__":
+    report = asyncio.run(ArticleRevalidator().arevalidate())
+    for outcome, pmcids in report.items():
+        print(f"{outcome}: {len(pmcids)}")
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from src.medlit_agent.pmc_service.sqlite_store import SQLiteStore
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+STOP_WORDS = frozenset(
+    {
+        "a",
+        "about",
+        "an",
+        "and",
+        "are",
+        "at",
+        "by",
+        "can",
+        "do",
+        "does",
+        "for",
+        "from",
+        "how",
+        "in",
+        "is",
+        "it",
+        "of",
+        "on",
+        "or",
+        "the",
+        "to",
+        "what",
+        "when",
+        "which",
+        "who",
+        "why",
+        "with",
+    }
+)
+
+# Queries using Entrez syntax are cached verbatim (modulo whitespace/case) since
+# reordering or dropping their tokens can change what they match.
+_ENTREZ_SYNTAX_RE = re.compile(r'\b(?:AND|OR|NOT)\b|[\[\]"()*]')
+_POSSESSIVE_RE = re.compile(r"['’]s\b")
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+
+def uses_entrez_syntax(query: str) -> bool:
+    """True if the query has boolean operators, field tags, quotes or wildcards."""
+    return bool(_ENTREZ_SYNTAX_RE.search(query or ""))
+
+
+def normalize_query(query: str, drop_stop_words: bool = False) -> str:
+    """Collapse equivalent spellings of a free-text query to one cache key.
+
+    Case is folded, possessives and punctuation are dropped and whitespace is
+    collapsed. Term order is kept because esearch matches adjacent terms as
+    phrases. Stop words are removed only on request, and never single
+    letters, which carry meaning in terms like "vitamin a" or "hepatitis a".
+    """
+    query = (query or "").strip()
+    if uses_entrez_syntax(query):
+        return " ".join(query.split()).casefold()
+
+    text = _POSSESSIVE_RE.sub("", query.casefold())
+    terms = [t for t in _NON_WORD_RE.split(text) if t]
+    if drop_stop_words:
+        terms = [t for t in terms if len(t) == 1 or t not in STOP_WORDS] or terms
+    return " ".join(terms)
+
+
+class SearchResultCache(SQLiteStore):
+    """TTL cache of esearch ID lists keyed by normalized query and sort order.
+
+    An entry stored for ``retmax=N`` also answers any smaller ``retmax`` (the
+    relevance ranking is a prefix), and any larger one when esearch returned
+    fewer than ``N`` IDs.
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS searches ("
+        " query TEXT NOT NULL,"
+        " sort TEXT NOT NULL,"
+        " retmax INTEGER NOT NULL,"
+        " ids TEXT NOT NULL,"
+        " created_at REAL NOT NULL,"
+        " PRIMARY KEY (query, sort))",
+    )
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        ttl_seconds: float | None = None,
+        drop_stop_words: bool | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if cache_dir is None:
+            cache_dir = os.getenv("PMC_SEARCH_CACHE_DIR") or (
+                Path(__file__).resolve().parent / "search_cache"
+            )
+        if ttl_seconds is None:
+            ttl_seconds = float(
+                os.getenv("PMC_SEARCH_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+            )
+        if drop_stop_words is None:
+            drop_stop_words = os.getenv("PMC_SEARCH_CACHE_STOP_WORDS", "0") != "0"
+
+        self.cache_dir = Path(cache_dir)
+        super().__init__(self.cache_dir / "searches.sqlite3", clock=clock)
+        self.ttl_seconds = ttl_seconds
+        self.drop_stop_words = drop_stop_words
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def _key(self, query: str) -> str:
+        return normalize_query(query, drop_stop_words=self.drop_stop_words)
+
+    def get(self, query: str, retmax: int, sort: str = "relevance") -> List[str] | None:
+        """Return up to ``retmax`` cached IDs, or None if no entry can answer."""
+        if not self.enabled:
+            return None
+
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT retmax, ids, created_at FROM searches"
+                " WHERE query = ? AND sort = ?",
+                (self._key(query), sort),
+            ).fetchone()
+        if row is None:
+            return None
+
+        cached_retmax, ids_json, created_at = row
+        if self._clock() - created_at > self.ttl_seconds:
+            return None
+
+        ids = json.loads(ids_json)
+        exhausted = len(ids) < cached_retmax
+        if retmax > cached_retmax and not exhausted:
+            return None
+        return ids[:retmax]
+
+    def put(
+        self, query: str, retmax: int, ids: List[str], sort: str = "relevance"
+    ) -> None:
+        """Store an esearch result unless a fresh, larger entry already exists."""
+        if not self.enabled:
+            return
+
+        key = self._key(query)
+        now = self._clock()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT retmax, created_at FROM searches WHERE query = ? AND sort = ?",
+                (key, sort),
+            ).fetchone()
+            if row is not None:
+                cached_retmax, created_at = row
+                fresh = now - created_at <= self.ttl_seconds
+                if fresh and cached_retmax > retmax:
+                    return
+            conn.execute(
+                "INSERT OR REPLACE INTO searches (query, sort, retmax, ids, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, sort, retmax, json.dumps(list(ids)), now),
+            )
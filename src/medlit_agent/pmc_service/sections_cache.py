@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from src.medlit_agent.pmc_service.sqlite_store import SQLiteStore
+
+# off unless PMC_SECTIONS_CACHE_MAX_BYTES is set
+DEFAULT_MAX_BYTES = 0
+
+
+class ConvertedSectionsCache(SQLiteStore):
+    """Size-bounded on-disk cache of ``XMLToDictConverter.convert`` output.
+
+    Entries are keyed by a content hash of the article XML and the converter
+    configuration (see ``XMLToDictConverter.cache_key``), so they never go
+    stale: a changed article or converter simply produces a new key. Sections
+    are stored as gzip-compressed JSON in one SQLite file shared by every
+    process on the host. When the compressed total exceeds ``max_bytes`` the
+    least recently used entries are evicted.
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS sections ("
+        " key TEXT PRIMARY KEY,"
+        " data BLOB NOT NULL,"
+        " stored_size INTEGER NOT NULL,"
+        " accessed_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS sections_accessed_at ON sections (accessed_at)",
+    )
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        max_bytes: int | None = None,
+        compress_level: int = 6,
+        clock: Callable[[], float] = time.time,
+    ):
+        if cache_dir is None:
+            cache_dir = os.getenv("PMC_SECTIONS_CACHE_DIR") or (
+                Path(__file__).resolve().parent / "sections_cache"
+            )
+        if max_bytes is None:
+            max_bytes = int(
+                os.getenv("PMC_SECTIONS_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+            )
+
+        self.cache_dir = Path(cache_dir)
+        super().__init__(self.cache_dir / "sections.sqlite3", clock=clock)
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: str) -> List[Dict[str, str]] | None:
+        """Return the cached sections for ``key``, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT data FROM sections WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE sections SET accessed_at = ? WHERE key = ?",
+                (self._clock(), key),
+            )
+        return json.loads(gzip.decompress(row[0]))
+
+    def put(self, key: str, sections: List[Dict[str, str]]) -> None:
+        """Store converted sections and evict LRU entries over budget."""
+        if not self.enabled:
+            return
+
+        compressed = gzip.compress(
+            json.dumps(sections, ensure_ascii=False).encode("utf-8"),
+            compresslevel=self.compress_level,
+        )
+        if len(compressed) > self.max_bytes:
+            return
+
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sections"
+                " (key, data, stored_size, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, compressed, len(compressed), self._clock()),
+            )
+            self._evict_lru(conn, "sections", "key", self.max_bytes)
+
+    def stats(self) -> Dict[str, int]:
+        if not self.enabled:
+            return {"entries": 0, "stored_bytes": 0}
+
+        with self._connection() as conn:
+            entries, stored_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(stored_size), 0) FROM sections"
+            ).fetchone()
+        return {"entries": entries, "stored_bytes": stored_bytes}
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "task", "waiters")
+
+    def __init__(self, task: asyncio.Task | None = None):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+        # set when the call runs as a coroutine; None for blocking calls
+        self.task = task
+        self.waiters = 0
+
+    def outcome(self):
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def stale(self) -> bool:
+        # a task left behind by a closed event loop never finishes
+        return self.task is not None and self.task.get_loop().is_closed()
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical requests into one in-flight call.
+
+    The first caller for a key runs the work; callers arriving while it is in
+    flight wait for and share its result (or exception). Once the call
+    finishes the key is forgotten, so later callers start a fresh call and
+    caching stays the job of the caches behind it.
+
+    ``do`` serves blocking callers across threads and ``ado`` serves
+    coroutines. Both share one table of calls, so a blocking fetch and an
+    async fetch of the same key (e.g. a retriever racing the prefetcher) send
+    one request. The async work runs as its own task, so a cancelled caller
+    does not cancel the call the others are waiting on; once every caller has
+    been cancelled the task is cancelled as well (a step already running in a
+    worker thread still runs to its end).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call.stale():
+                call = None
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            elif call.task is not None and call.task.get_loop() is _running_loop():
+                # blocking here would stall the loop that runs the shared call
+                call = None
+            else:
+                call.waiters += 1
+
+        if call is None:
+            return fn()
+
+        if not leader:
+            try:
+                call.done.wait()
+                return call.outcome()
+            finally:
+                with self._lock:
+                    call.waiters -= 1
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            self._forget(key, call)
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None or call.stale():
+                call = self._calls[key] = _Call(asyncio.ensure_future(fn()))
+                call.task.add_done_callback(
+                    lambda task, call=call: self._finish(key, call, task)
+                )
+            call.waiters += 1
+
+        try:
+            if call.task is not None and call.task.get_loop() is loop:
+                return await asyncio.shield(call.task)
+            # a blocking call, or a task on another loop: wait off this loop
+            await asyncio.to_thread(call.done.wait)
+            return call.outcome()
+        except asyncio.CancelledError:
+            with self._lock:
+                last = call.waiters == 1
+                if last and call.task is not None and self._calls.get(key) is call:
+                    # the task is about to be cancelled: later callers start anew
+                    del self._calls[key]
+            if last and call.task is not None:
+                # nobody is left to use the result
+                call.task.get_loop().call_soon_threadsafe(call.task.cancel)
+            raise
+        finally:
+            with self._lock:
+                call.waiters -= 1
+
+    def _finish(self, key: Hashable, call: _Call, task: asyncio.Task) -> None:
+        if task.cancelled():
+            call.error = asyncio.CancelledError()
+        else:
+            call.error = task.exception()
+            if call.error is None:
+                call.result = task.result()
+        self._forget(key, call)
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.done.set()
+
+    def in_flight(self, key: Hashable) -> int:
+        """Number of calls (sync or async) currently running for ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            return int(call is not None and not call.stale())
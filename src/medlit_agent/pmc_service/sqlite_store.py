@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Tuple
+
+
+class SQLiteStore:
+    """Base for the small SQLite files shared by every process on the host.
+
+    Subclasses list their ``CREATE ... IF NOT EXISTS`` statements in
+    ``schema`` (or extend ``_create_schema``); they run on the first
+    connection of each instance, after the parent directory is created.
+    Connections are in autocommit mode: use ``_connection`` for single
+    statements and ``_transaction`` to group writes under the database write
+    lock. Stores on a hot path set ``wal``: the file then uses write-ahead
+    logging with ``synchronous=NORMAL``, so readers never wait for a writer
+    and a commit does not fsync (a power cut can lose the last commits, never
+    corrupt the file).
+    """
+
+    schema: Tuple[str, ...] = ()
+    wal = False
+
+    def __init__(self, db_path: str | Path, clock: Callable[[], float] = time.time):
+        self.db_path = Path(db_path)
+        self._clock = clock
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=60.0, isolation_level=None)
+        if self.wal:
+            conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._initialized:
+            if self.wal:
+                # stored in the file, so once per instance is enough
+                conn.execute("PRAGMA journal_mode=WAL")
+            self._create_schema(conn)
+            self._initialized = True
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        for statement in self.schema:
+            conn.execute(statement)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """``BEGIN IMMEDIATE`` ... ``COMMIT``, rolled back if the body raises."""
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _evict_lru(
+        conn: sqlite3.Connection, table: str, key: str, max_bytes: int
+    ) -> int:
+        """Delete least recently used rows until ``stored_size`` fits.
+
+        ``table`` needs ``stored_size`` and ``accessed_at`` columns. Returns
+        the number of rows evicted.
+        """
+        (total,) = conn.execute(
+            f"SELECT COALESCE(SUM(stored_size), 0) FROM {table}"
+        ).fetchone()
+        if total <= max_bytes:
+            return 0
+
+        evicted = 0
+        rows = conn.execute(
+            f"SELECT {key}, stored_size FROM {table} ORDER BY accessed_at ASC"
+        ).fetchall()
+        for value, stored_size in rows:
+            if total <= max_bytes:
+                break
+            conn.execute(f"DELETE FROM {table} WHERE {key} = ?", (value,))
+            total -= stored_size
+            evicted += 1
+        return evicted
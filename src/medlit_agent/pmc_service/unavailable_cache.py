@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import Callable
+
+from src.medlit_agent.pmc_service.sqlite_store import SQLiteStore
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+class FullTextUnavailableCache(SQLiteStore):
+    """TTL cache of PMCIDs known to have no retrievable full text.
+
+    Remembers articles whose XML had no ``<body>`` or that the open-access
+    check rejected, so follow-up requests fail fast instead of downloading
+    and parsing the same article again. Entries expire because publishers
+    do occasionally release full text later.
+    """
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS unavailable ("
+        " pmcid TEXT PRIMARY KEY,"
+        " reason TEXT NOT NULL,"
+        " created_at REAL NOT NULL)",
+    )
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        ttl_seconds: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if cache_dir is None:
+            cache_dir = os.getenv("PMC_UNAVAILABLE_CACHE_DIR") or (
+                Path(__file__).resolve().parent / "unavailable_cache"
+            )
+        if ttl_seconds is None:
+            ttl_seconds = float(
+                os.getenv("PMC_UNAVAILABLE_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+            )
+
+        self.cache_dir = Path(cache_dir)
+        super().__init__(self.cache_dir / "unavailable.sqlite3", clock=clock)
+        self.ttl_seconds = ttl_seconds
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, pmcid: str) -> str | None:
+        """Return why ``pmcid`` has no full text, or None if not (freshly) known."""
+        if not self.enabled:
+            return None
+
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT reason, created_at FROM unavailable WHERE pmcid = ?",
+                (pmcid,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        reason, created_at = row
+        if self._clock() - created_at > self.ttl_seconds:
+            return None
+        return reason
+
+    def put(self, pmcid: str, reason: str) -> None:
+        if not self.enabled:
+            return
+
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO unavailable (pmcid, reason, created_at)"
+                " VALUES (?, ?, ?)",
+                (pmcid, reason, self._clock()),
+            )
+
+    def delete(self, pmcid: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM unavailable WHERE pmcid = ?", (pmcid,))
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import gzip
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from src.medlit_agent.pmc_service.sqlite_store import SQLiteStore
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60
+DEFAULT_FLUSH_EVERY = 64
+
+
+class ArticleXMLCache(SQLiteStore):
+    """Size-bounded on-disk cache of raw efetch article XML keyed by PMCID.
+
+    Entries are gzip-compressed and stored in one SQLite file so every process
+    on the host shares the cache. When the compressed total exceeds
+    ``max_bytes`` the least recently used entries are evicted; entries older
+    than ``ttl_seconds`` are treated as misses and dropped.
+
+    A hit is a single read. Access times and the hit/miss counters are kept
+    in memory and written ``flush_every`` lookups at a time, before each
+    eviction and before ``stats``; other processes see them that much later,
+    and up to ``flush_every`` of them are lost when the process exits.
+    """
+
+    wal = True
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS articles ("
+        " pmcid TEXT PRIMARY KEY,"
+        " data BLOB NOT NULL,"
+        " raw_size INTEGER NOT NULL,"
+        " stored_size INTEGER NOT NULL,"
+        " created_at REAL NOT NULL,"
+        " accessed_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS articles_accessed_at ON articles (accessed_at)",
+        "CREATE TABLE IF NOT EXISTS counters ("
+        " name TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    )
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        max_bytes: int | None = None,
+        ttl_seconds: float | None = None,
+        compress_level: int = 6,
+        flush_every: int = DEFAULT_FLUSH_EVERY,
+        clock: Callable[[], float] = time.time,
+    ):
+        if cache_dir is None:
+            cache_dir = os.getenv("PMC_XML_CACHE_DIR") or (
+                Path(__file__).resolve().parent / "xml_cache"
+            )
+        if max_bytes is None:
+            max_bytes = int(os.getenv("PMC_XML_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        if ttl_seconds is None:
+            ttl_seconds = float(
+                os.getenv("PMC_XML_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+            )
+
+        self.cache_dir = Path(cache_dir)
+        super().__init__(self.cache_dir / "articles.sqlite3", clock=clock)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.compress_level = compress_level
+        self.flush_every = max(1, flush_every)
+        self._pending_lock = threading.Lock()
+        self._pending = 0
+        self._counts: Counter = Counter()
+        self._touched: Dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, name: str, amount: int = 1) -> None:
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?)"
+            " ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def _record(self, *counters: str, touched: str | None = None) -> bool:
+        """Note a lookup in memory; True once ``flush_every`` are pending."""
+        with self._pending_lock:
+            self._counts.update(counters)
+            if touched is not None:
+                self._touched[touched] = self._clock()
+            self._pending += 1
+            return self._pending >= self.flush_every
+
+    def _flush_pending(self, conn: sqlite3.Connection) -> None:
+        with self._pending_lock:
+            counts, self._counts = self._counts, Counter()
+            touched, self._touched = self._touched, {}
+            self._pending = 0
+        conn.executemany(
+            "UPDATE articles SET accessed_at = MAX(accessed_at, ?) WHERE pmcid = ?",
+            [(accessed_at, pmcid) for pmcid, accessed_at in touched.items()],
+        )
+        for name, amount in counts.items():
+            self._bump(conn, name, amount)
+
+    def flush(self) -> None:
+        """Write the access times and counters held in memory."""
+        if not self.enabled:
+            return
+        with self._transaction() as conn:
+            self._flush_pending(conn)
+
+    def get(self, pmcid: str) -> bytes | None:
+        """Return cached XML bytes for a canonical PMCID, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT data, created_at FROM articles WHERE pmcid = ?", (pmcid,)
+            ).fetchone()
+            if row is not None and self._clock() - row[1] > self.ttl_seconds:
+                # keep a fresh copy another process may have stored meanwhile
+                conn.execute(
+                    "DELETE FROM articles WHERE pmcid = ? AND created_at = ?",
+                    (pmcid, row[1]),
+                )
+                due = self._record("expired", "misses")
+                row = None
+            elif row is None:
+                due = self._record("misses")
+            else:
+                due = self._record("hits", touched=pmcid)
+        if due:
+            self.flush()
+        return None if row is None else gzip.decompress(row[0])
+
+    def put(self, pmcid: str, xml_data: str | bytes) -> None:
+        """Store XML for a canonical PMCID and evict LRU entries over budget."""
+        if not self.enabled:
+            return
+        if isinstance(xml_data, str):
+            xml_data = xml_data.encode("utf-8")
+
+        compressed = gzip.compress(xml_data, compresslevel=self.compress_level)
+        if len(compressed) > self.max_bytes:
+            return
+
+        now = self._clock()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO articles"
+                " (pmcid, data, raw_size, stored_size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (pmcid, compressed, len(xml_data), len(compressed), now, now),
+            )
+            self._flush_pending(conn)
+            evicted = self._evict_lru(conn, "articles", "pmcid", self.max_bytes)
+            if evicted:
+                self._bump(conn, "evictions", evicted)
+
+    def delete(self, pmcid: str) -> None:
+        if not self.enabled:
+            return
+        with self._connection() as conn:
+            conn.execute("DELETE FROM articles WHERE pmcid = ?", (pmcid,))
+
+    def pmcids(self) -> List[str]:
+        """Every PMCID currently in the cache, expired or not."""
+        if not self.enabled:
+            return []
+        with self._connection() as conn:
+            rows = conn.execute("SELECT pmcid FROM articles ORDER BY pmcid").fetchall()
+        return [pmcid for (pmcid,) in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """Host-wide hit/miss/eviction counters plus current size."""
+        stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+        if not self.enabled:
+            return {**stats, "entries": 0, "raw_bytes": 0, "stored_bytes": 0}
+
+        self.flush()
+        with self._connection() as conn:
+            for name, value in conn.execute("SELECT name, value FROM counters"):
+                stats[name] = value
+            entries, raw_bytes, stored_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0),"
+                " COALESCE(SUM(stored_size), 0) FROM articles"
+            ).fetchone()
+        return {
+            **stats,
+            "entries": entries,
+            "raw_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+        }
@@ -1,10 +1,63 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import re
-from typing import Dict, List
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, Iterator, List, Set, Tuple
 
 from lxml import etree as ET
 
+from src.medlit_agent.pmc_service import metrics
+from src.medlit_agent.pmc_service.sections_cache import ConvertedSectionsCache
+
+# the streaming mode holds at most one open branch of the tree, so lxml's
+# depth and text-node limits are lifted for it
+_STREAM_PARSER_OPTIONS = {
+    "resolve_entities": False,
+    "no_network": True,
+    "load_dtd": False,
+    "huge_tree": True,
+}
+
+
+class FullTextUnavailableError(ValueError):
+    """The article exists in PMC but its full text cannot be retrieved."""
+
+
+@dataclass
+class ConversionResult:
+    """Outcome of one document in ``XMLToDictConverter.convert_many``."""
+
+    index: int
+    sections: List[Dict[str, str]] | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class _StreamSection:
+    """A ``<sec>`` still open in ``XMLToDictConverter.iter_sections``."""
+
+    __slots__ = ("element", "title_seen", "title", "paragraphs")
+
+    def __init__(self, element: ET._Element):
+        self.element = element
+        self.title_seen = False
+        self.title: str | None = None
+        self.paragraphs: List[str] = []
+
 
 class XMLToDictConverter:
     """Extract article full text from NLM/JATS XML.
@@ -13,6 +66,11 @@ class XMLToDictConverter:
     and convert section titles + paragraphs dict of chunks
     """
 
+    # part of the sections cache key; bump whenever ``convert`` output changes
+    version = 1
+
+    sections_cache = ConvertedSectionsCache()
+
     skip_sections = {
         "references",
         "acknowledgments",
@@ -23,6 +81,14 @@ class XMLToDictConverter:
         "supplementary information",
     }
 
+    # subtrees the streaming mode discards as they are read
+    stream_pruned_elements = {
+        "back",
+        "floats-group",
+        "ref-list",
+        "supplementary-material",
+    }
+
     @staticmethod
     def _parse_xml(xml_content: str | bytes) -> ET._Element:
         try:
@@ -64,55 +130,60 @@ class XMLToDictConverter:
         title = re.sub(r"\s+", " ", title)
         return title.casefold()
 
+    @classmethod
+    def _section_title(cls, sec: ET._Element, skip_titles) -> str | None:
+        """Title of a section to keep, or None for untitled and skipped ones."""
+        title_elem = next(
+            (child for child in sec if cls._localname(child) == "title"),
+            None,
+        )
+        if title_elem is None:
+            return None
+        return cls._title_text(title_elem, skip_titles)
+
+    @classmethod
+    def _title_text(cls, title_elem: ET._Element, skip_titles) -> str | None:
+        title_text = cls._clean_text("".join(title_elem.itertext()))
+        if not title_text:
+            return None
+        normalized_title_text = cls._normalize_section_title(title_text)
+        if any(skip_title in normalized_title_text for skip_title in skip_titles):
+            return None
+        return title_text
+
     @classmethod
     def _iter_body_blocks(cls, body: ET._Element):
         normalized_skip_titles = {
             cls._normalize_section_title(title) for title in cls.skip_sections
         }
+        # (title, paragraphs) in section start order; a section's slot is
+        # taken when it is entered so nested subsections come after it
+        sections: List[Tuple[str, List[str]]] = []
 
-        for sec in body.iter():
-            if cls._localname(sec) != "sec":
-                continue
-
-            title_elem = next(
-                (child for child in sec if cls._localname(child) == "title"),
-                None,
-            )
-            if title_elem is None:
-                continue
-
-            title_text = cls._clean_text("".join(title_elem.itertext()))
-            if not title_text:
-                continue
-            normalized_title_text = cls._normalize_section_title(title_text)
-            if any(
-                skip_title in normalized_title_text
-                for skip_title in normalized_skip_titles
-            ):
-                continue
-
-            paragraphs: List[str] = []
-            for p in sec.iter():
-                if cls._localname(p) != "p":
+        def visit(node: ET._Element, paragraphs: List[str] | None) -> None:
+            # ``paragraphs`` belongs to the nearest enclosing <sec>; it is None
+            # when that section is untitled or skipped, dropping its paragraphs
+            # but not those of its subsections.
+            for child in node:
+                name = cls._localname(child)
+                if name is None:
                     continue
-
-                # keep only paragraphs that belong to this section directly,
-                # not nested subsections.
-                parent = p.getparent()
-                nearest_sec = None
-                while parent is not None:
-                    if cls._localname(parent) == "sec":
-                        nearest_sec = parent
-                        break
-                    parent = parent.getparent()
-
-                if nearest_sec is not sec:
+                if name == "sec":
+                    title_text = cls._section_title(child, normalized_skip_titles)
+                    own: List[str] | None = None
+                    if title_text is not None:
+                        own = []
+                        sections.append((title_text, own))
+                    visit(child, own)
                     continue
+                if name == "p" and paragraphs is not None:
+                    para = cls._clean_text("".join(child.itertext()))
+                    if para:
+                        paragraphs.append(para)
+                visit(child, paragraphs)
 
-                para = cls._clean_text("".join(p.itertext()))
-                if para:
-                    paragraphs.append(para)
-
+        visit(body, None)
+        for title_text, paragraphs in sections:
             body_text = "\n\n".join(paragraphs)
             if body_text:
                 yield {"title": title_text, "body": body_text}
@@ -131,16 +202,46 @@ class XMLToDictConverter:
 
         return paragraphs
 
+    @classmethod
+    def cache_key(cls, xml_content: bytes) -> str:
+        """Content hash of the XML, the converter version and ``skip_sections``."""
+        config = json.dumps([cls.version, sorted(cls.skip_sections)])
+        digest = hashlib.sha256(config.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(xml_content)
+        return digest.hexdigest()
+
     @classmethod
     def convert(
         cls,
         xml_content: str | bytes,
     ) -> List[Dict[str, str]]:
-        """return article sections from XML ``body`` as title/body dictionaries."""
+        """return article sections from XML ``body`` as title/body dictionaries.
+
+        With the sections cache enabled, XML converted before is answered
+        from it without being parsed.
+        """
+        cache = cls.sections_cache
+        if not cache.enabled:
+            return cls._convert_tree(xml_content)
+
+        if isinstance(xml_content, str):
+            xml_content = xml_content.encode("utf-8")
+        key = cls.cache_key(xml_content)
+        sections = cache.get(key)
+        metrics.observe_cache("sections", sections is not None)
+        if sections is None:
+            sections = cls._convert_tree(xml_content)
+            cache.put(key, sections)
+        return sections
+
+    @classmethod
+    @metrics.timed_parse("full_text")
+    def _convert_tree(cls, xml_content: str | bytes) -> List[Dict[str, str]]:
         root = cls._parse_xml(xml_content)
         body = cls._find_body(root)
         if body is None:
-            raise ValueError(
+            raise FullTextUnavailableError(
                 "No <body> element found in XML; cannot extract full text."
             )
         sections = list(cls._iter_body_blocks(body))
@@ -153,3 +254,239 @@ class XMLToDictConverter:
             return []
 
         return [{"title": "Body", "body": "\n\n".join(paragraphs)}]
+
+    @staticmethod
+    def _iter_source_chunks(source, chunk_size: int) -> Iterator[bytes]:
+        """Read XML text, bytes, a path, a binary file or an iterable of chunks."""
+        if isinstance(source, str):
+            # chunks are encoded one by one; utf-8 never splits a character
+            for start in range(0, len(source), chunk_size):
+                yield source[start : start + chunk_size].encode("utf-8")
+        elif isinstance(source, (bytes, bytearray)):
+            for start in range(0, len(source), chunk_size):
+                yield bytes(source[start : start + chunk_size])
+        elif isinstance(source, os.PathLike):
+            with open(source, "rb") as handle:
+                yield from iter(lambda: handle.read(chunk_size), b"")
+        elif hasattr(source, "read"):
+            yield from iter(lambda: source.read(chunk_size), b"")
+        else:
+            yield from source
+
+    @classmethod
+    def iter_sections(
+        cls,
+        source: str | bytes | os.PathLike | Iterable[bytes],
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator[Dict[str, str]]:
+        """Streaming ``convert``: yield sections while the XML is being read.
+
+        The document is fed to an lxml pull parser ``chunk_size`` bytes at a
+        time. Each element is cleared and detached once it closes, unless it
+        is inside an open ``<p>`` or ``<title>`` whose text is still needed,
+        so memory stays bounded by the deepest open branch rather than the
+        document size. A top-level section and its subsections are yielded
+        as soon as it closes, in the same order ``convert`` returns them.
+
+        Unlike ``convert``, paragraphs inside ``stream_pruned_elements``
+        (e.g. supplementary material captions) are dropped.
+        """
+        skip_titles = {
+            cls._normalize_section_title(title) for title in cls.skip_sections
+        }
+        parser = ET.XMLPullParser(events=("start", "end"), **_STREAM_PARSER_OPTIONS)
+        stack: List[ET._Element] = []
+        secs: List[_StreamSection] = []
+        # sections of the open top-level <sec>, in start order
+        pending: List[_StreamSection] = []
+        # open <p>s as (section paragraphs or None, slot, fallback slot or None)
+        open_paragraphs: List[tuple] = []
+        body: ET._Element | None = None
+        in_body = False
+        prune_depth = 0
+        keep_depth = 0
+        # paragraphs for the untitled "Body" section; dropped once a section
+        # has been emitted
+        fallback: List[str] | None = []
+
+        def handle(event: str, elem: ET._Element):
+            nonlocal body, in_body, prune_depth, keep_depth, fallback
+            name = elem.tag.rsplit("}", 1)[-1]
+            if event == "start":
+                stack.append(elem)
+                if prune_depth:
+                    prune_depth += 1
+                elif not in_body:
+                    if body is None and name == "body":
+                        body, in_body = elem, True
+                elif name in cls.stream_pruned_elements and not keep_depth:
+                    prune_depth = 1
+                elif name == "sec":
+                    section = _StreamSection(elem)
+                    secs.append(section)
+                    pending.append(section)
+                elif name == "p":
+                    # a slot is taken on open so nested paragraphs keep
+                    # document order
+                    paragraphs = secs[-1].paragraphs if secs else None
+                    if paragraphs is not None:
+                        paragraphs.append("")
+                    if fallback is not None:
+                        fallback.append("")
+                    open_paragraphs.append(
+                        (
+                            paragraphs,
+                            len(paragraphs) - 1 if paragraphs is not None else 0,
+                            len(fallback) - 1 if fallback is not None else None,
+                        )
+                    )
+                    keep_depth += 1
+                elif name == "title":
+                    keep_depth += 1
+                return
+
+            stack.pop()
+            if prune_depth:
+                prune_depth -= 1
+            elif elem is body:
+                in_body = False
+            elif in_body:
+                if name == "p":
+                    paragraphs, slot, fallback_slot = open_paragraphs.pop()
+                    para = cls._clean_text("".join(elem.itertext()))
+                    if paragraphs is not None:
+                        paragraphs[slot] = para
+                    if fallback is not None and fallback_slot is not None:
+                        fallback[fallback_slot] = para
+                    keep_depth -= 1
+                elif name == "title":
+                    keep_depth -= 1
+                    section = secs[-1] if secs else None
+                    if (
+                        section is not None
+                        and section.element is stack[-1]
+                        and not section.title_seen
+                    ):
+                        section.title_seen = True
+                        section.title = cls._title_text(elem, skip_titles)
+                elif name == "sec":
+                    secs.pop()
+                    if not secs:
+                        for done in pending:
+                            body_text = "\n\n".join(p for p in done.paragraphs if p)
+                            if done.title is not None and body_text:
+                                fallback = None
+                                yield {"title": done.title, "body": body_text}
+                        pending.clear()
+
+            if not keep_depth:
+                # detaching ``elem`` itself from its still-open parent races
+                # libxml2 writing its tail, so only drop finished siblings
+                elem.clear(keep_tail=True)
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+
+        try:
+            for chunk in cls._iter_source_chunks(source, chunk_size):
+                parser.feed(chunk)
+                for event, elem in parser.read_events():
+                    yield from handle(event, elem)
+            parser.close()
+        except ET.XMLSyntaxError as exc:
+            raise ValueError(f"Invalid XML content: {exc}") from exc
+        for event, elem in parser.read_events():
+            yield from handle(event, elem)
+
+        if body is None:
+            raise FullTextUnavailableError(
+                "No <body> element found in XML; cannot extract full text."
+            )
+        if fallback:
+            paragraphs = [para for para in fallback if para]
+            if paragraphs:
+                yield {"title": "Body", "body": "\n\n".join(paragraphs)}
+
+    @classmethod
+    @metrics.timed_parse("full_text_stream")
+    def convert_stream(
+        cls,
+        source: str | bytes | os.PathLike | Iterable[bytes],
+    ) -> List[Dict[str, str]]:
+        """``convert`` through ``iter_sections``, for very large documents."""
+        return list(cls.iter_sections(source))
+
+    @classmethod
+    def _convert_item(cls, index: int, xml_content: str | bytes) -> ConversionResult:
+        try:
+            return ConversionResult(index, sections=cls.convert(xml_content))
+        except Exception as exc:
+            return ConversionResult(index, error=exc)
+
+    @classmethod
+    def convert_many(
+        cls,
+        documents: Iterable[str | bytes],
+        workers: int | None = None,
+        ordered: bool = True,
+        executor: Executor | None = None,
+    ) -> Iterator[ConversionResult]:
+        """Convert many documents on a process pool.
+
+        Pass the efetch bytes as they are; they are parsed in the workers
+        without being decoded. Results are yielded in input order, or as they
+        complete with ``ordered=False``. Each result carries its input
+        ``index``. An error in one document is returned on its result and the
+        other documents still convert. At most a few documents per worker are
+        in flight, so ``documents`` can be a lazy stream.
+
+        ``workers`` defaults to ``PMC_CONVERT_WORKERS`` or the CPU count; with
+        one worker documents are converted in the calling process. An
+        ``executor`` given by the caller is used as is and not shut down.
+        """
+        if executor is None:
+            if workers is None:
+                workers = int(os.getenv("PMC_CONVERT_WORKERS", os.cpu_count() or 1))
+            if workers <= 1:
+                for index, xml_content in enumerate(documents):
+                    yield cls._convert_item(index, xml_content)
+                return
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                yield from cls.convert_many(
+                    documents, workers=workers, ordered=ordered, executor=pool
+                )
+            return
+
+        max_pending = max(1, workers or os.cpu_count() or 1) * 4
+        pending: Deque[Tuple[int, Future]] = deque()
+        running: Set[Future] = set()
+        indexes: Dict[Future, int] = {}
+
+        def settle(index: int, future: Future) -> ConversionResult:
+            try:
+                return future.result()
+            except Exception as exc:
+                # the worker itself failed (e.g. it was killed); only this
+                # document is reported
+                return ConversionResult(index, error=exc)
+
+        def collect() -> Iterator[ConversionResult]:
+            if ordered:
+                index, future = pending.popleft()
+                yield settle(index, future)
+                return
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                running.discard(future)
+                yield settle(indexes.pop(future), future)
+
+        for index, xml_content in enumerate(documents):
+            future = executor.submit(cls._convert_item, index, xml_content)
+            if ordered:
+                pending.append((index, future))
+            else:
+                running.add(future)
+                indexes[future] = index
+            if len(pending) + len(running) >= max_pending:
+                yield from collect()
+        while pending or running:
+            yield from collect()
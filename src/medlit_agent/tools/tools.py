@@ -1,44 +1,109 @@
-from typing import Dict, List
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 
 from src.medlit_agent.pmc_service.full_text_retriever import FullTextRetriever
 from src.medlit_agent.pmc_service.pmc_endpoint import PMCEndpoint
+from src.medlit_agent.pmc_service.resilience import CircuitOpenError
 
 
-@tool
-def search_pubmed_central(query: str, max_results: int = 5) -> List[Dict[str, str]]:
+def _to_documents(pmc_results: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    documents = []
+    for result in pmc_results:
+        documents.append(
+            {
+                "pmcid": result["pmcid"],
+                "citation": result["apa_citation"],
+                "abstract": result["abstract"],
+            }
+        )
+    return documents
+
+
+def _search_pubmed_central(
+    query: str,
+    max_results: int = 5,
+    alternative_queries: Optional[List[str]] = None,
+) -> List[Dict[str, str]]:
     """
     Search PubMed Central for biomedical research articles.
 
     Args:
         query: The search query (e.g., "cancer therapy", "diabetes treatment")
         max_results: Maximum number of articles to return (default: 5)
+        alternative_queries: Optional rephrasings of the same question using
+            synonyms or medical terms (e.g., ["heart attack aspirin",
+            "myocardial infarction aspirin"]); all are searched and merged
 
     Returns:
         List of articles with PMC ID, APA citation, and abstract
     """
     try:
-        pmc_results = PMCEndpoint.fetch_pmc_records(query, retmax=max_results)
-
-        documents = []
-        for result in pmc_results:
-            documents.append(
-                {
-                    "pmcid": result["pmcid"],
-                    "citation": result["apa_citation"],
-                    "abstract": result["abstract"],
-                }
+        pmc_results = PMCEndpoint.search_local(query, retmax=max_results)
+        if pmc_results is None:
+            pmc_results = PMCEndpoint.fetch_pmc_records(
+                query, retmax=max_results, alternative_queries=alternative_queries
             )
+        return _to_documents(pmc_results)
+    except (TimeoutError, CircuitOpenError):
+        # the agent tells the user NCBI is unavailable for these
+        raise
+    except Exception as e:
+        raise Exception(f"Error searching PubMed Central: {str(e)}") from e
 
-        return documents
+
+async def _asearch_pubmed_central(
+    query: str,
+    max_results: int = 5,
+    alternative_queries: Optional[List[str]] = None,
+) -> List[Dict[str, str]]:
+    try:
+        # the local index is SQLite on disk; search it off the event loop
+        pmc_results = await asyncio.to_thread(
+            PMCEndpoint.search_local, query, retmax=max_results
+        )
+        if pmc_results is None:
+            pmc_results = await PMCEndpoint.afetch_pmc_records(
+                query, retmax=max_results, alternative_queries=alternative_queries
+            )
+        return _to_documents(pmc_results)
+    except (TimeoutError, CircuitOpenError):
+        # the agent tells the user NCBI is unavailable for these
+        raise
     except Exception as e:
-        raise Exception(f"Error searching PubMed Central: {str(e)}")
+        raise Exception(f"Error searching PubMed Central: {str(e)}") from e
 
 
-@tool
-def retrieve_full_text(pmcid: str) -> List[Dict[str, str]]:
-    """Retrieve full text sections for a given PMC ID article in response to a 
+async def astream_search_pubmed_central(
+    query: str,
+    max_results: int = 5,
+    alternative_queries: Optional[List[str]] = None,
+) -> AsyncIterator[Tuple[int, Dict[str, str]]]:
+    """
+    Streaming form of the search tool for the agent: yields ``(rank, document)``
+    pairs as each article arrives instead of waiting for the whole batch.
+    """
+    pmc_results = await asyncio.to_thread(
+        PMCEndpoint.search_local, query, retmax=max_results
+    )
+    if pmc_results is not None:
+        for rank, document in enumerate(_to_documents(pmc_results)):
+            yield rank, document
+        return
+
+    records = PMCEndpoint.astream_pmc_records(
+        query, retmax=max_results, alternative_queries=alternative_queries
+    )
+    try:
+        async for rank, record in records:
+            yield rank, _to_documents([record])[0]
+    finally:
+        await records.aclose()
+
+
+def _retrieve_full_text(pmcid: str) -> List[Dict[str, str]]:
+    """Retrieve full text sections for a given PMC ID article in response to a
     user's query about follow questions about a specific article. For example, if the
     user is following up on a previous search and wants to know more details about a specific article.
     Exmple: How does the second article in your response discuss medication side effects?
@@ -51,5 +116,26 @@ def retrieve_full_text(pmcid: str) -> List[Dict[str, str]]:
     return sections
 
 
+async def _aretrieve_full_text(pmcid: str) -> List[Dict[str, str]]:
+    retriever = FullTextRetriever()
+    sections = await retriever.aretrieve_full_text(pmcid)
+    return sections
+
+
+# Each tool has a sync body for ``invoke`` and an async body for ``ainvoke`` so the
+# agent can await NCBI calls without blocking the event loop.
+search_pubmed_central = StructuredTool.from_function(
+    func=_search_pubmed_central,
+    coroutine=_asearch_pubmed_central,
+    name="search_pubmed_central",
+)
+
+retrieve_full_text = StructuredTool.from_function(
+    func=_retrieve_full_text,
+    coroutine=_aretrieve_full_text,
+    name="retrieve_full_text",
+)
+
+
 # Export tools list for easy import
 tools = [search_pubmed_central, retrieve_full_text]
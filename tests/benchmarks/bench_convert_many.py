@@ -0,0 +1,73 @@
+"""Throughput of ``XMLToDictConverter.convert_many`` by worker count.
+
+Each run converts the same corpus of synthetic nested reviews (or a directory
+of efetch XML files) from raw bytes. One worker converts in the calling
+process; more workers spread the documents over a process pool. The results
+are compared with the in-process run before the throughput is reported.
+
+Usage:
+    python -m tests.benchmarks.bench_convert_many
+    python -m tests.benchmarks.bench_convert_many --workers 1 2 4 8 --size 200
+    python -m tests.benchmarks.bench_convert_many --corpus-dir path/to/efetch_xml
+"""
+
+import argparse
+import os
+import time
+
+from src.medlit_agent.pmc_service.xml_to_dict import XMLToDictConverter
+from tests.benchmarks.bench_convert_sections import load_corpus
+
+
+def run(corpus, workers):
+    start = time.perf_counter()
+    results = list(XMLToDictConverter.convert_many(corpus, workers=workers))
+    return time.perf_counter() - start, results
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus-dir", help="directory of efetch article XML files")
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--paragraphs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, max(1, cpus // 2), cpus}),
+    )
+    args = parser.parse_args()
+
+    corpus = load_corpus(
+        args.corpus_dir,
+        args.size,
+        args.seed,
+        args.depth,
+        args.fanout,
+        args.paragraphs,
+    )
+    if not corpus:
+        raise SystemExit("empty corpus")
+
+    baseline_seconds, expected = run(corpus, 1)
+    failed = sum(1 for result in expected if not result.ok)
+    print(f"articles: {len(corpus)} ({failed} failed), cpus: {cpus}")
+    print(f"{'workers':>7} {'seconds':>8} {'articles/s':>11} {'speedup':>8}")
+    for workers in args.workers:
+        if workers == 1:
+            seconds = baseline_seconds
+        else:
+            seconds, results = run(corpus, workers)
+            assert [r.sections for r in results] == [r.sections for r in expected]
+        print(
+            f"{workers:>7} {seconds:>8.2f} {len(corpus) / seconds:>11.1f} "
+            f"{baseline_seconds / seconds:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
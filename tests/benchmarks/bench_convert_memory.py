@@ -0,0 +1,103 @@
+"""Peak memory of ``convert`` versus the streaming ``convert_stream``.
+
+Synthetic articles of growing size are written to disk; each conversion then
+runs in a fresh interpreter that reports how much its peak RSS grew. The tree
+converter has to hold the document and its full lxml tree, while the
+streaming one reads the file in chunks and clears elements as they close, so
+its peak should stay flat as the article grows.
+
+Usage:
+    python -m tests.benchmarks.bench_convert_memory
+    python -m tests.benchmarks.bench_convert_memory --sections 500 5000 20000
+"""
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from tests.benchmarks.bench_parse_article import _sentence
+
+
+def write_article(path, sections, seed):
+    """Write a long article one section at a time, with a table per section."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("<article><front/><body>")
+        for i in range(sections):
+            rows = "".join(
+                f"<tr><td>{rng.random():.6f}</td><td>{rng.random():.6f}</td></tr>"
+                for _ in range(20)
+            )
+            out.write(
+                f"<sec><title>Section {i}</title>"
+                f"<p>{_sentence(rng, 60)}</p><p>{_sentence(rng, 60)}</p>"
+                f"<table-wrap><table>{rows}</table></table-wrap></sec>"
+            )
+        out.write("</body><back><ref-list>")
+        for i in range(sections):
+            out.write(
+                f"<ref><mixed-citation>{_sentence(rng, 20)}</mixed-citation></ref>"
+            )
+        out.write("</ref-list></back></article>")
+
+
+def _peak_kib():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _child(mode, path):
+    from src.medlit_agent.pmc_service.xml_to_dict import XMLToDictConverter
+
+    before = _peak_kib()
+    if mode == "tree":
+        sections = len(XMLToDictConverter.convert(Path(path).read_bytes()))
+    else:
+        # sections are consumed as they arrive, as a caller writing them out would
+        sections = sum(1 for _ in XMLToDictConverter.iter_sections(Path(path)))
+    print(json.dumps({"sections": sections, "kib": _peak_kib() - before}))
+
+
+def measure(mode, path):
+    out = subprocess.run(
+        [sys.executable, "-m", __spec__.name, "--child", mode, str(path)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, nargs="+", default=[500, 5000, 20000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child)
+        return
+
+    print(f"{'sections':>8} {'size MB':>8} {'tree MB':>8} {'stream MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for sections in args.sections:
+            path = Path(tmp) / f"article_{sections}.xml"
+            write_article(path, sections, args.seed)
+            tree = measure("tree", path)
+            stream = measure("stream", path)
+            assert tree["sections"] == stream["sections"] == sections
+            print(
+                f"{sections:>8} {path.stat().st_size / 2**20:>8.1f} "
+                f"{tree['kib'] / 1024:>8.1f} {stream['kib'] / 1024:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Benchmark ``XMLToDictConverter.convert`` against the previous implementation.
+
+The previous section extraction walked every descendant ``<p>`` of every
+``<sec>`` and climbed parent pointers from each one to find its nearest
+section, which grows with sections x paragraphs x depth. The current one
+assigns each paragraph to its section in a single traversal. Both are run over
+the same corpus of nested JATS bodies and their outputs are compared before
+timing.
+
+It also times the text path efetch XML used to take to the converter (decoded
+to ``str``, then encoded back to UTF-8 for lxml) against handing the raw bytes
+straight to the converter.
+
+Usage:
+    python -m tests.benchmarks.bench_convert_sections
+    python -m tests.benchmarks.bench_convert_sections --depth 8 --fanout 3
+    python -m tests.benchmarks.bench_convert_sections --corpus-dir path/to/efetch_xml
+"""
+
+import argparse
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import List
+
+from src.medlit_agent.pmc_service.sections_cache import ConvertedSectionsCache
+from src.medlit_agent.pmc_service.xml_to_dict import (
+    FullTextUnavailableError,
+    XMLToDictConverter,
+)
+from tests.benchmarks.bench_parse_article import _sentence
+
+
+def legacy_iter_body_blocks(body):
+    """The per-section descendant walk this benchmark compares against."""
+    cls = XMLToDictConverter
+    normalized_skip_titles = {
+        cls._normalize_section_title(title) for title in cls.skip_sections
+    }
+
+    for sec in body.iter():
+        if cls._localname(sec) != "sec":
+            continue
+
+        title_elem = next(
+            (child for child in sec if cls._localname(child) == "title"),
+            None,
+        )
+        if title_elem is None:
+            continue
+
+        title_text = cls._clean_text("".join(title_elem.itertext()))
+        if not title_text:
+            continue
+        normalized_title_text = cls._normalize_section_title(title_text)
+        if any(
+            skip_title in normalized_title_text for skip_title in normalized_skip_titles
+        ):
+            continue
+
+        paragraphs: List[str] = []
+        for p in sec.iter():
+            if cls._localname(p) != "p":
+                continue
+
+            parent = p.getparent()
+            nearest_sec = None
+            while parent is not None:
+                if cls._localname(parent) == "sec":
+                    nearest_sec = parent
+                    break
+                parent = parent.getparent()
+
+            if nearest_sec is not sec:
+                continue
+
+            para = cls._clean_text("".join(p.itertext()))
+            if para:
+                paragraphs.append(para)
+
+        body_text = "\n\n".join(paragraphs)
+        if body_text:
+            yield {"title": title_text, "body": body_text}
+
+
+def legacy_convert(xml_content):
+    cls = XMLToDictConverter
+    root = cls._parse_xml(xml_content)
+    body = cls._find_body(root)
+    if body is None:
+        raise FullTextUnavailableError("No <body> element found")
+    sections = list(legacy_iter_body_blocks(body))
+    if sections:
+        return sections
+    paragraphs = cls._extract_body_paragraphs(body)
+    if not paragraphs:
+        return []
+    return [{"title": "Body", "body": "\n\n".join(paragraphs)}]
+
+
+def _section(rng, depth, fanout, paragraphs, label):
+    paras = "".join(
+        # statistics as PMC prints them, so the text is not pure ASCII
+        f"<p>{_sentence(rng, 30)} <italic>{_sentence(rng, 4)}</italic> "
+        f"(95% CI {rng.random():.2f}–{1 + rng.random():.2f}; 10 µg/kg)</p>"
+        for _ in range(paragraphs)
+    )
+    children = ""
+    if depth > 1:
+        children = "".join(
+            _section(rng, depth - 1, fanout, paragraphs, f"{label}.{i + 1}")
+            for i in range(fanout)
+        )
+    return f"<sec><title>{label} {_sentence(rng, 4)}</title>{paras}{children}</sec>"
+
+
+def synthetic_article(rng, depth, fanout, paragraphs):
+    """A long review: a few top-level sections, each a tree of subsections."""
+    sections = "".join(
+        _section(rng, depth, fanout, paragraphs, str(i + 1)) for i in range(4)
+    )
+    refs = "<sec><title>References</title><p>Skipped.</p></sec>"
+    return f"<article><front/><body>{sections}{refs}</body></article>"
+
+
+def load_corpus(corpus_dir, size, seed, depth, fanout, paragraphs):
+    if corpus_dir:
+        return [p.read_bytes() for p in sorted(Path(corpus_dir).glob("*.xml"))]
+    rng = random.Random(seed)
+    return [
+        synthetic_article(rng, depth, fanout, paragraphs).encode("utf-8")
+        for _ in range(size)
+    ]
+
+
+def _time(fn, corpus, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for xml in corpus:
+            fn(xml)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus-dir", help="directory of efetch article XML files")
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--paragraphs", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = load_corpus(
+        args.corpus_dir,
+        args.size,
+        args.seed,
+        args.depth,
+        args.fanout,
+        args.paragraphs,
+    )
+    if not corpus:
+        raise SystemExit("empty corpus")
+    # time the parsing, not the on-disk sections cache
+    XMLToDictConverter.sections_cache = ConvertedSectionsCache(max_bytes=0)
+
+    converted = []
+    for i, xml in enumerate(corpus):
+        try:
+            expected = legacy_convert(xml)
+        except ValueError:
+            continue
+        assert XMLToDictConverter.convert(xml) == expected, i
+        converted.append(xml)
+
+    legacy = _time(legacy_convert, converted, args.repeat)
+    single_pass = _time(XMLToDictConverter.convert, converted, args.repeat)
+    n = len(converted)
+    print(f"articles: {n}, outputs identical")
+    print(f"legacy      {legacy * 1e3:8.1f} ms  ({legacy / n * 1e3:7.2f} ms/article)")
+    print(
+        f"single pass {single_pass * 1e3:8.1f} ms  "
+        f"({single_pass / n * 1e3:7.2f} ms/article)"
+    )
+    print(f"speedup     {legacy / single_pass:8.2f}x")
+
+    def via_str(xml):
+        return XMLToDictConverter.convert(xml.decode("utf-8", errors="replace"))
+
+    # alternate the two paths so drift affects both alike; the difference is
+    # small next to parsing
+    text_samples, bytes_samples = [], []
+    for _ in range(args.repeat):
+        text_samples.append(_time(via_str, converted, 1))
+        bytes_samples.append(_time(XMLToDictConverter.convert, converted, 1))
+    text, raw = min(text_samples), min(bytes_samples)
+    mb = sum(len(xml) for xml in converted) / 2**20
+    print(f"str round trip {text * 1e3:8.1f} ms  ({mb:.1f} MB of XML)")
+    print(
+        f"bytes          {raw * 1e3:8.1f} ms  "
+        f"saves {(text - raw) * 1e3:.1f} ms ({(text - raw) / text * 100:.1f}%)"
+    )
+
+
+if __name__ == "__main__":
+    main()
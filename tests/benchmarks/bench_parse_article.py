@@ -0,0 +1,250 @@
+"""Benchmark ``PMCEndpoint._parse_article`` against the previous implementation.
+
+The previous parser ran one ``.//front//article-meta//...`` descendant search
+per field; the current one walks each ``<front>`` once. Both are run over the
+same corpus of JATS fronts and their outputs are compared before timing.
+
+Usage:
+    python -m tests.benchmarks.bench_parse_article
+    python -m tests.benchmarks.bench_parse_article --corpus-dir path/to/efetch_xml
+"""
+
+import argparse
+import random
+import re
+import statistics
+import time
+from pathlib import Path
+from xml.etree import ElementTree as StdET
+
+from src.medlit_agent.pmc_service.pmc_endpoint import PMCEndpoint, _fromstring
+
+
+def legacy_parse_article(root, pmcid):
+    """The descendant-search implementation this benchmark compares against."""
+
+    def find_text(path):
+        el = root.find(path)
+        return el.text.strip() if el is not None and el.text else ""
+
+    def has_letter(text):
+        return bool(re.search(r"[A-Za-z]", text or ""))
+
+    def clean_year(text):
+        text = (text or "").strip()
+        if re.fullmatch(r"(18|19|20)\d{2}", text):
+            return text
+        return ""
+
+    def first_alpha_initial(given_names):
+        m = re.search(r"[A-Za-z]", given_names or "")
+        return m.group(0).upper() if m else ""
+
+    title = find_text(".//front//article-meta//title-group//article-title")
+
+    authors = []
+    for contrib in root.findall(
+        ".//front//article-meta//contrib[@contrib-type='author']"
+    ):
+        collab = (contrib.findtext(".//collab") or "").strip()
+        if collab:
+            authors.append(collab)
+            continue
+        surname = (contrib.findtext(".//surname") or "").strip()
+        given = (contrib.findtext(".//given-names") or "").strip()
+        if not surname or not has_letter(surname):
+            continue
+        if clean_year(surname):
+            continue
+        initial = first_alpha_initial(given)
+        authors.append(f"{surname}, {initial}." if initial else surname)
+
+    year = ""
+    for pd in root.findall(".//front//article-meta//pub-date"):
+        if pd.attrib.get("pub-type") in ("epub", "ppub", "epublish"):
+            y = clean_year(pd.findtext("year", ""))
+            if y:
+                year = y
+                break
+    if not year:
+        for pd in root.findall(".//front//article-meta//pub-date"):
+            y = clean_year(pd.findtext("year", ""))
+            if y:
+                year = y
+                break
+
+    journal = find_text(".//front//journal-meta//journal-title")
+    journal = re.sub(r"\s*\|\s*", " ", journal)
+    volume = find_text(".//front//article-meta//volume")
+    issue = find_text(".//front//article-meta//issue")
+    fpage = find_text(".//front//article-meta//fpage")
+    lpage = find_text(".//front//article-meta//lpage")
+    pages = f"{fpage}–{lpage}" if fpage and lpage else ""
+
+    doi = ""
+    for aid in root.findall(".//front//article-meta//article-id"):
+        if aid.attrib.get("pub-id-type") == "doi" and aid.text:
+            doi = aid.text.replace("https://doi.org/", "").strip()
+            break
+
+    raw_abstract = ""
+    abstract_node = root.find(".//front//article-meta//abstract")
+    if abstract_node is not None:
+        paragraphs = []
+        for p in abstract_node.findall(".//p"):
+            para_text = " ".join(t.strip() for t in p.itertext() if t.strip())
+            if para_text:
+                paragraphs.append(para_text)
+        if paragraphs:
+            raw_abstract = "\n\n".join(paragraphs)
+        else:
+            raw_abstract = " ".join(
+                t.strip() for t in abstract_node.itertext() if t.strip()
+            )
+
+    text = re.sub(r"\n\s*\n+", "\n\n", raw_abstract)
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"SO\s*2", "SO₂", text)
+    for h in [
+        "Objective",
+        "Impact Statement",
+        "Introduction",
+        "Methods",
+        "Results",
+        "Conclusion",
+    ]:
+        text = re.sub(rf"\b{h}:\s*", f"\n\n{h}: ", text, flags=re.IGNORECASE)
+    abstract = text.strip()
+
+    apa_citation = PMCEndpoint._format_apa(
+        authors, year, title, journal, volume, issue, pages, doi
+    )
+    return {
+        "pmcid": pmcid,
+        "title": title,
+        "apa_citation": apa_citation,
+        "abstract": abstract,
+    }
+
+
+_WORDS = (
+    "patients cohort randomized trial outcome mortality inflammation receptor "
+    "expression therapy dose response baseline follow-up analysis clinical "
+    "significant association risk factor treatment placebo biomarker"
+).split()
+
+
+def _sentence(rng, n=18):
+    return " ".join(rng.choice(_WORDS) for _ in range(n)).capitalize() + "."
+
+
+def synthetic_front(rng, index):
+    """A JATS article whose front is sized like a typical PMC research paper."""
+    n_authors = rng.randint(4, 40)
+    contribs = "".join(
+        f'<contrib contrib-type="author"><contrib-id contrib-id-type="orcid">'
+        f"0000-0002-{i:04d}-0000</contrib-id><name><surname>Author{i}</surname>"
+        f"<given-names>G{i} M</given-names></name>"
+        f'<xref ref-type="aff" rid="aff{i % 6}">{i % 6}</xref></contrib>'
+        for i in range(n_authors)
+    )
+    affs = "".join(
+        f'<aff id="aff{i}"><label>{i}</label><institution>Department {i}, '
+        f"University Hospital</institution>, <country>Country</country></aff>"
+        for i in range(6)
+    )
+    abstract = "".join(
+        f"<sec><title>{h}</title><p>{h}: "
+        + " ".join(_sentence(rng) for _ in range(rng.randint(2, 5)))
+        + "</p></sec>"
+        for h in ("Objective", "Methods", "Results", "Conclusion")
+    )
+    keywords = "".join(f"<kwd>{rng.choice(_WORDS)}</kwd>" for _ in range(8))
+    return (
+        '<article article-type="research-article"><front>'
+        '<journal-meta><journal-id journal-id-type="nlm-ta">J Bench</journal-id>'
+        "<journal-title-group><journal-title>Journal of | Benchmarks"
+        "</journal-title></journal-title-group><issn>1234-5678</issn>"
+        "<publisher><publisher-name>Publisher</publisher-name></publisher>"
+        "</journal-meta><article-meta>"
+        f'<article-id pub-id-type="pmcid">PMC{index}</article-id>'
+        f'<article-id pub-id-type="pmid">{30000000 + index}</article-id>'
+        f'<article-id pub-id-type="doi">10.1000/bench.{index}</article-id>'
+        "<article-categories><subj-group><subject>Research</subject>"
+        "</subj-group></article-categories>"
+        f"<title-group><article-title>{_sentence(rng, 12)}</article-title>"
+        "</title-group>"
+        f"<contrib-group>{contribs}</contrib-group>{affs}"
+        "<author-notes><corresp>Correspondence: author@example.org</corresp>"
+        "</author-notes>"
+        '<pub-date pub-type="collection"><year>2021</year></pub-date>'
+        f'<pub-date pub-type="epub"><day>3</day><month>4</month>'
+        f"<year>{rng.randint(1990, 2024)}</year></pub-date>"
+        f"<volume>{rng.randint(1, 80)}</volume><issue>{rng.randint(1, 12)}</issue>"
+        f"<fpage>{index}</fpage><lpage>{index + 12}</lpage>"
+        '<history><date date-type="received"><year>2020</year></date>'
+        '<date date-type="accepted"><year>2021</year></date></history>'
+        "<permissions><copyright-statement>© The Authors</copyright-statement>"
+        "<license><license-p>" + _sentence(rng, 40) + "</license-p></license>"
+        "</permissions>"
+        f"<abstract>{abstract}</abstract>"
+        f"<kwd-group>{keywords}</kwd-group>"
+        "<funding-group><award-group><funding-source>Agency</funding-source>"
+        "</award-group></funding-group>"
+        "</article-meta></front><body><sec><p>"
+        + _sentence(rng, 60)
+        + "</p></sec></body></article>"
+    )
+
+
+def load_corpus(corpus_dir, size, seed):
+    if corpus_dir:
+        return [p.read_bytes() for p in sorted(Path(corpus_dir).glob("*.xml"))]
+    rng = random.Random(seed)
+    return [synthetic_front(rng, i).encode("utf-8") for i in range(size)]
+
+
+def _time(fn, roots, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i, root in enumerate(roots):
+            fn(root, f"PMC{i}")
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus-dir", help="directory of efetch article XML files")
+    parser.add_argument("--size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus_dir, args.size, args.seed)
+    if not corpus:
+        raise SystemExit("empty corpus")
+
+    std_roots = [StdET.fromstring(xml) for xml in corpus]
+    lxml_roots = [_fromstring(xml) for xml in corpus]
+
+    for i, (std_root, lxml_root) in enumerate(zip(std_roots, lxml_roots)):
+        expected = legacy_parse_article(std_root, f"PMC{i}")
+        assert PMCEndpoint._parse_article(lxml_root, f"PMC{i}") == expected, i
+        assert PMCEndpoint._parse_article(std_root, f"PMC{i}") == expected, i
+
+    legacy = _time(legacy_parse_article, std_roots, args.repeat)
+    single_pass = _time(PMCEndpoint._parse_article, lxml_roots, args.repeat)
+    n = len(corpus)
+    print(f"articles: {n}, outputs identical")
+    print(f"legacy      {legacy * 1e3:8.1f} ms  ({legacy / n * 1e6:6.1f} us/article)")
+    print(
+        f"single pass {single_pass * 1e3:8.1f} ms  "
+        f"({single_pass / n * 1e6:6.1f} us/article)"
+    )
+    print(f"speedup     {legacy / single_pass:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -329,7 +329,7 @@ async def _generate_fulltext_response(
     service = ChromaDB(collection_name=collection_name, persist_directory=persist_dir)
 
     try:
-        xml_content = PMCEndpoint.fetch_pmcid_xml(pmcid)
+        xml_content = PMCEndpoint.fetch_pmcid_xml_bytes(pmcid)
         sections = XMLToDictConverter.convert(xml_content)
         service.add(pmcid=pmcid, texts=sections)
 
@@ -0,0 +1,201 @@
+"""Load and latency benchmark of ``PMCEndpoint`` against the local simulator.
+
+Starts ``EUtilsSimulator`` in-process, points ``PMCEndpoint`` at it and runs
+each scenario with cold caches (fresh cache directories) and then warm
+caches. It reports p50/p95 latency per call plus the request, 429 and error
+counts the simulator saw. Nothing leaves the machine and NCBI's quota is
+untouched, so the numbers can be compared across changes.
+
+Usage:
+    python -m tests.load.bench_pmc_endpoint
+    python -m tests.load.bench_pmc_endpoint --latency lognormal:0.15:0.7 \\
+        --rate-limit 10 --error-rate 0.02 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from tests.load.eutils_simulator import EUtilsSimulator, SimulatedCorpus
+
+_QUERY_WORDS = (
+    "patients cohort randomized trial outcome mortality inflammation receptor "
+    "expression therapy dose response biomarker placebo risk"
+).split()
+
+
+def _queries(count, seed):
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(_QUERY_WORDS, 3)) for _ in range(count)]
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _report(name, samples, wall, simulator, before):
+    counts = simulator.stats - before
+    requests = sum(v for k, v in counts.items() if k.startswith("requests."))
+    errors = sum(
+        v
+        for k, v in counts.items()
+        if k.startswith("responses.") and k not in ("responses.200", "responses.429")
+    )
+    print(
+        f"{name:<34} n={len(samples):<4} p50={statistics.median(samples) * 1000:8.1f}ms"
+        f" p95={_percentile(samples, 0.95) * 1000:8.1f}ms wall={wall:6.2f}s"
+        f" requests={requests:<5} 429={counts['responses.429']:<4} errors={errors}"
+    )
+
+
+def _reset_caches(endpoint, root):
+    """Give the endpoint empty caches in a fresh directory under ``root``."""
+    from src.medlit_agent.pmc_service.search_cache import SearchResultCache
+    from src.medlit_agent.pmc_service.xml_cache import ArticleXMLCache
+
+    cache_dir = Path(tempfile.mkdtemp(dir=root))
+    endpoint.xml_cache = ArticleXMLCache(cache_dir=cache_dir / "xml")
+    endpoint.search_cache = SearchResultCache(cache_dir=cache_dir / "search")
+    endpoint.article_store.clear()
+
+
+def _run_sync(name, call, queries, simulator):
+    before = simulator.stats.copy()
+    samples = []
+    start = time.perf_counter()
+    for query in queries:
+        began = time.perf_counter()
+        try:
+            call(query)
+        except Exception:
+            pass  # failures show up in the simulator's error count
+        samples.append(time.perf_counter() - began)
+    _report(name, samples, time.perf_counter() - start, simulator, before)
+
+
+def _run_async(name, call, queries, concurrency, simulator):
+    before = simulator.stats.copy()
+    samples = []
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(query):
+            async with semaphore:
+                began = time.perf_counter()
+                try:
+                    await call(query)
+                except Exception:
+                    pass
+                samples.append(time.perf_counter() - began)
+
+        await asyncio.gather(*(one(query) for query in queries))
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    _report(name, samples, time.perf_counter() - start, simulator, before)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus-dir", help="directory of efetch article XML files")
+    parser.add_argument("--size", type=int, default=500, help="synthetic articles")
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--retmax", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", default="lognormal:0.08:0.5")
+    parser.add_argument("--rate-limit", type=float, help="simulated NCBI quota (rps)")
+    parser.add_argument("--client-rps", type=float, default=1000.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # the synthetic corpus imports PMCEndpoint, which reads its configuration
+    # at import time, so the server is bound and the environment set first
+    simulator = EUtilsSimulator(
+        SimulatedCorpus({}),
+        latency=args.latency,
+        rate_limit=args.rate_limit,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    root = tempfile.mkdtemp(prefix="medlit-load-")
+
+    os.environ.update(simulator.env())
+    os.environ.update(
+        {
+            "NCBI_RATE_LIMIT_RPS": str(args.client_rps),
+            "NCBI_RATE_LIMIT_DB": os.path.join(root, "rate_limit.sqlite3"),
+            "PMC_XML_CACHE_DIR": os.path.join(root, "xml"),
+            "PMC_SEARCH_CACHE_DIR": os.path.join(root, "search"),
+            "PMC_UNAVAILABLE_CACHE_DIR": os.path.join(root, "unavailable"),
+            "PMC_LOCAL_INDEX_DIR": os.path.join(root, "index"),
+            "EMAIL": os.getenv("EMAIL") or "load-test@example.org",
+        }
+    )
+    from src.medlit_agent.pmc_service.pmc_endpoint import PMCEndpoint
+
+    corpus = simulator.corpus = (
+        SimulatedCorpus.from_dir(args.corpus_dir)
+        if args.corpus_dir
+        else SimulatedCorpus.synthetic(args.size, args.seed)
+    )
+    simulator.start()
+
+    queries = _queries(args.queries, args.seed)
+    retmax = args.retmax
+    print(
+        f"corpus={len(corpus)} queries={len(queries)} retmax={retmax}"
+        f" latency={simulator.latency.spec} rate_limit={args.rate_limit}"
+        f" error_rate={args.error_rate}"
+    )
+    try:
+        scenarios = [
+            (
+                "search (per-article efetch)",
+                lambda q: PMCEndpoint.fetch_pmc_records(q, retmax),
+            ),
+            (
+                "search (batched efetch)",
+                lambda q: PMCEndpoint.fetch_pmc_records(q, retmax, batched=True),
+            ),
+        ]
+        for name, call in scenarios:
+            for state in ("cold", "warm"):
+                if state == "cold":
+                    _reset_caches(PMCEndpoint, root)
+                _run_sync(f"{name} {state}", call, queries, simulator)
+
+        for state in ("cold", "warm"):
+            if state == "cold":
+                _reset_caches(PMCEndpoint, root)
+            _run_async(
+                f"async search x{args.concurrency} {state}",
+                lambda q: PMCEndpoint.afetch_pmc_records(q, retmax),
+                queries,
+                args.concurrency,
+                simulator,
+            )
+
+        pmcids = [f"PMC{uid}" for uid in corpus.search(" ".join(_QUERY_WORDS), 50)]
+        for state in ("cold", "warm"):
+            if state == "cold":
+                _reset_caches(PMCEndpoint, root)
+            _run_sync(
+                f"full-text xml {state}",
+                PMCEndpoint.fetch_pmcid_xml_bytes,
+                pmcids,
+                simulator,
+            )
+    finally:
+        simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,498 @@
+"""Local stand-in for the NCBI services ``PMCEndpoint`` talks to.
+
+Serves esearch, efetch and esummary under ``/entrez/eutils/`` and the PMC OA
+web service under ``/pmc/utils/oa/oa.fcgi``. The articles come from a
+directory of recorded efetch XML or from the synthetic JATS generator used by
+the parser benchmark. Per-request latency is drawn from a configurable
+distribution. Requests above the configured rate get NCBI's 429 answer, and a
+share of requests can be failed on purpose. Searches sent with
+``usehistory=y`` are kept like on the history server, so esearch
+(``term=#<query_key>``) and efetch can page through them by WebEnv.
+
+Point the app at it with ``NCBI_EUTILS_BASE_URL`` and ``NCBI_OA_SERVICE_URL``
+(``EUtilsSimulator.env()`` returns both).
+
+Usage:
+    python -m tests.load.eutils_simulator --port 8765 --latency lognormal:0.12:0.6
+    python -m tests.load.eutils_simulator --corpus-dir path/to/efetch_xml \\
+        --rate-limit 10 --error-rate 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+from urllib.parse import parse_qs, urlsplit
+
+from lxml import etree as ET
+
+from src.medlit_agent.pmc_service.local_search import tokenize
+
+EUTILS_PATH = "/entrez/eutils/"
+OA_PATH = "/pmc/utils/oa/oa.fcgi"
+
+_ESEARCH_DOCTYPE = (
+    '<!DOCTYPE eSearchResult PUBLIC "-//NLM//DTD esearch 20060628//EN"'
+    ' "https://eutils.ncbi.nlm.nih.gov/eutils/dtd/20060628/esearch.dtd">'
+)
+_ARTICLE_RE = re.compile(rb"<article[\s>].*?</article>", re.DOTALL)
+_FIELD_TAG_RE = re.compile(r"\[[^\]]*\]")
+
+
+class LatencyModel:
+    """Per-request delay in seconds drawn from a named distribution.
+
+    Specs: ``0.05`` (fixed), ``uniform:LOW:HIGH``, ``exp:MEAN`` and
+    ``lognormal:MEDIAN:SIGMA``; the log-normal's long tail is closest to
+    what E-utilities latencies look like.
+    """
+
+    def __init__(self, sample: Callable[[random.Random], float], spec: str):
+        self._sample = sample
+        self.spec = spec
+
+    @classmethod
+    def from_spec(cls, spec: str | float | None) -> "LatencyModel":
+        spec = str(spec or 0)
+        name, _, args = spec.partition(":")
+        params = [float(arg) for arg in args.split(":") if arg]
+        if not args:
+            delay = float(name)
+            return cls(lambda rng: delay, spec)
+        if name == "uniform":
+            low, high = params
+            return cls(lambda rng: rng.uniform(low, high), spec)
+        if name == "exp":
+            (mean,) = params
+            return cls(lambda rng: rng.expovariate(1.0 / mean), spec)
+        if name == "lognormal":
+            median, sigma = params
+            mu = math.log(median)
+            return cls(lambda rng: rng.lognormvariate(mu, sigma), spec)
+        raise ValueError(f"Unknown latency distribution {spec!r}")
+
+    def sample(self, rng: random.Random) -> float:
+        return max(0.0, self._sample(rng))
+
+
+class SimulatedCorpus:
+    """Article XML keyed by numeric PMC UID, plus what esearch and esummary need."""
+
+    def __init__(self, articles: Dict[str, bytes]):
+        self._lock = threading.Lock()
+        self._articles: Dict[str, bytes] = {}
+        self._summaries: Dict[str, dict] = {}
+        self._terms: Dict[str, frozenset] = {}
+        for uid, xml in articles.items():
+            self.put(uid, xml)
+
+    @classmethod
+    def from_dir(cls, corpus_dir: str | Path) -> "SimulatedCorpus":
+        """Load ``*.xml`` efetch responses; articlesets are split per article."""
+        articles = {}
+        for path in sorted(Path(corpus_dir).glob("*.xml")):
+            for xml in _ARTICLE_RE.findall(path.read_bytes()) or []:
+                uid = _article_uid(ET.fromstring(xml)) or path.stem
+                articles[uid.removeprefix("PMC")] = xml
+        return cls(articles)
+
+    @classmethod
+    def synthetic(cls, size: int = 500, seed: int = 0) -> "SimulatedCorpus":
+        from tests.benchmarks.bench_parse_article import synthetic_front
+
+        rng = random.Random(seed)
+        return cls(
+            {
+                str(i): synthetic_front(rng, i).encode("utf-8")
+                for i in range(1, size + 1)
+            }
+        )
+
+    def put(self, uid: str, xml: bytes) -> None:
+        """Add or replace an article; replacing one changes its esummary."""
+        root = ET.fromstring(xml)
+        title = " ".join(root.findtext(".//article-title", default="").split())
+        abstract_el = root.find(".//abstract")
+        abstract = "" if abstract_el is None else " ".join(abstract_el.itertext())
+        summary = {
+            "uid": uid,
+            "title": title,
+            "pubdate": root.findtext(".//pub-date/year", default=""),
+            "volume": root.findtext(".//volume", default=""),
+            "issue": root.findtext(".//issue", default=""),
+            "pages": root.findtext(".//fpage", default=""),
+            "articleids": [{"idtype": "pmcid", "value": f"PMC{uid}"}],
+            "sortdate": f"{time.time():.6f}",
+        }
+        with self._lock:
+            self._articles[uid] = xml
+            self._summaries[uid] = summary
+            self._terms[uid] = frozenset(tokenize(f"{title} {abstract}"))
+
+    def __len__(self) -> int:
+        return len(self._articles)
+
+    def get(self, uid: str) -> bytes | None:
+        return self._articles.get(uid)
+
+    def summary(self, uid: str) -> dict | None:
+        return self._summaries.get(uid)
+
+    def search(self, term: str, retmax: int) -> List[str]:
+        """Rank UIDs by how many query terms their title and abstract share."""
+        terms = set(tokenize(_FIELD_TAG_RE.sub(" ", term)))
+        with self._lock:
+            scored = [
+                (len(terms & doc_terms), uid)
+                for uid, doc_terms in self._terms.items()
+                if terms & doc_terms
+            ]
+        scored.sort(
+            key=lambda item: (-item[0], int(item[1]) if item[1].isdigit() else 0)
+        )
+        return [uid for _, uid in scored[:retmax]]
+
+
+def _article_uid(root) -> str | None:
+    for article_id in root.iter("article-id"):
+        if article_id.get("pub-id-type") in ("pmc", "pmcid", "pmcaid"):
+            return (article_id.text or "").strip() or None
+    return None
+
+
+class EUtilsSimulator:
+    """Threaded HTTP server imitating esearch/efetch/esummary and oa.fcgi.
+
+    ``rate_limit`` is requests per second across all clients (a token bucket
+    with one second of burst); requests over it get HTTP 429 like NCBI's quota
+    answer. ``error_rate`` fails that share of the remaining requests with a
+    random status from ``error_statuses``. ``not_open_access`` lists UIDs the
+    OA service reports as outside the open access subset.
+    """
+
+    def __init__(
+        self,
+        corpus: SimulatedCorpus | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: str | float | LatencyModel | None = None,
+        rate_limit: float | None = None,
+        error_rate: float = 0.0,
+        error_statuses: Iterable[int] = (500, 502, 503),
+        not_open_access: Iterable[str] = (),
+        seed: int = 0,
+    ):
+        self.corpus = corpus if corpus is not None else SimulatedCorpus.synthetic()
+        self.latency = (
+            latency
+            if isinstance(latency, LatencyModel)
+            else LatencyModel.from_spec(latency)
+        )
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.not_open_access = {uid.removeprefix("PMC") for uid in not_open_access}
+        self.stats: Counter = Counter()
+        self._history: Dict[str, List[List[str]]] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = rate_limit or 0.0
+        self._refilled_at = time.monotonic()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.simulator = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def root_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        return self.root_url + EUTILS_PATH
+
+    @property
+    def oa_service_url(self) -> str:
+        return self.root_url + OA_PATH
+
+    def env(self) -> Dict[str, str]:
+        return {
+            "NCBI_EUTILS_BASE_URL": self.base_url,
+            "NCBI_OA_SERVICE_URL": self.oa_service_url,
+        }
+
+    def start(self) -> "EUtilsSimulator":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="eutils-simulator", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "EUtilsSimulator":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _admit(self) -> tuple[bool, float, int | None]:
+        """Rate-limit check, latency draw and error draw for one request."""
+        with self._lock:
+            allowed = True
+            if self.rate_limit:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.rate_limit,
+                    self._tokens + (now - self._refilled_at) * self.rate_limit,
+                )
+                self._refilled_at = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                else:
+                    allowed = False
+            delay = self.latency.sample(self._rng)
+            error = None
+            if self.error_rate and self._rng.random() < self.error_rate:
+                error = self._rng.choice(self.error_statuses)
+        return allowed, delay, error
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def remember(self, webenv: str | None, ids: List[str]) -> tuple[str, str]:
+        """Store a result set like the history server; returns WebEnv and key."""
+        with self._lock:
+            if webenv not in self._history:
+                webenv = f"MCID_SIM_{len(self._history) + 1}"
+                self._history[webenv] = []
+            self._history[webenv].append(list(ids))
+            return webenv, str(len(self._history[webenv]))
+
+    def recall(self, webenv: str, query_key: str) -> List[str] | None:
+        with self._lock:
+            sets = self._history.get(webenv, [])
+            index = int(query_key) - 1 if query_key.isdigit() else -1
+            return sets[index] if 0 <= index < len(sets) else None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # keep benchmark output readable
+        pass
+
+    def do_GET(self):
+        self._handle(parse_qs(urlsplit(self.path).query))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8")
+        params = parse_qs(urlsplit(self.path).query)
+        params.update(parse_qs(body))
+        self._handle(params)
+
+    def _handle(self, params: Dict[str, List[str]]):
+        sim: EUtilsSimulator = self.server.simulator
+        path = urlsplit(self.path).path
+        name = path.rsplit("/", 1)[-1].removesuffix(".fcgi")
+        sim.count(f"requests.{name}")
+
+        allowed, delay, error = sim._admit()
+        if not allowed:
+            sim.count("responses.429")
+            body = json.dumps(
+                {"error": "API rate limit exceeded", "limit": sim.rate_limit}
+            )
+            return self._send(
+                429, body.encode(), "application/json", {"Retry-After": "1"}
+            )
+        time.sleep(delay)
+        if error is not None:
+            sim.count(f"responses.{error}")
+            return self._send(error, b"Simulated failure", "text/plain")
+
+        param = {key: values[-1] for key, values in params.items()}
+        routes = {
+            EUTILS_PATH + "esearch.fcgi": self._esearch,
+            EUTILS_PATH + "efetch.fcgi": self._efetch,
+            EUTILS_PATH + "esummary.fcgi": self._esummary,
+            OA_PATH: self._oa,
+        }
+        route = routes.get(path)
+        if route is None:
+            sim.count("responses.404")
+            return self._send(404, b"Unknown endpoint", "text/plain")
+        sim.count("responses.200")
+        route(sim.corpus, param)
+
+    @staticmethod
+    def _uids(param: Dict[str, str]) -> List[str]:
+        ids = param.get("id", "")
+        return [
+            uid.strip().removeprefix("PMC") for uid in ids.split(",") if uid.strip()
+        ]
+
+    def _history_ids(self, param: Dict[str, str], query_key: str) -> List[str] | None:
+        sim: EUtilsSimulator = self.server.simulator
+        ids = sim.recall(param.get("WebEnv", ""), query_key)
+        if ids is None:
+            self._send(400, b"Unknown WebEnv or query_key", "text/plain")
+        return ids
+
+    def _esearch(self, corpus: SimulatedCorpus, param: Dict[str, str]):
+        sim: EUtilsSimulator = self.server.simulator
+        term = param.get("term", "").strip()
+        retstart = int(param.get("retstart", 0))
+        retmax = int(param.get("retmax", 20))
+        if term.startswith("#") and "WebEnv" in param:
+            # "#<query_key>" pages through a result stored on the history server
+            ids = self._history_ids(param, term[1:])
+            if ids is None:
+                return
+        else:
+            ids = corpus.search(term, len(corpus))
+        history = {}
+        if param.get("usehistory") == "y":
+            webenv, query_key = sim.remember(param.get("WebEnv"), ids)
+            history = {"webenv": webenv, "querykey": query_key}
+        page = ids[retstart : retstart + retmax]
+
+        if param.get("retmode") == "json":
+            result = {
+                "count": str(len(ids)),
+                "retmax": str(len(page)),
+                "retstart": str(retstart),
+                **history,
+                "idlist": page,
+            }
+            body = json.dumps({"esearchresult": result})
+            return self._send(200, body.encode(), "application/json")
+        id_list = "".join(f"<Id>{uid}</Id>" for uid in page)
+        history_xml = (
+            f"<QueryKey>{history['querykey']}</QueryKey>"
+            f"<WebEnv>{history['webenv']}</WebEnv>"
+            if history
+            else ""
+        )
+        body = (
+            f'<?xml version="1.0" encoding="UTF-8" ?>\n{_ESEARCH_DOCTYPE}\n'
+            f"<eSearchResult><Count>{len(ids)}</Count><RetMax>{len(page)}</RetMax>"
+            f"<RetStart>{retstart}</RetStart>{history_xml}<IdList>{id_list}</IdList>"
+            "<TranslationSet/><QueryTranslation/></eSearchResult>"
+        )
+        self._send(200, body.encode(), "text/xml")
+
+    def _efetch(self, corpus: SimulatedCorpus, param: Dict[str, str]):
+        uids = self._uids(param)
+        if "query_key" in param:
+            uids = self._history_ids(param, param["query_key"])
+            if uids is None:
+                return
+            retstart = int(param.get("retstart", 0))
+            uids = uids[retstart : retstart + int(param.get("retmax", 20))]
+        articles = [corpus.get(uid) for uid in uids]
+        body = (
+            b'<?xml version="1.0" ?>\n<pmc-articleset>'
+            + b"".join(xml for xml in articles if xml is not None)
+            + b"</pmc-articleset>"
+        )
+        self._send(200, body, "text/xml")
+
+    def _esummary(self, corpus: SimulatedCorpus, param: Dict[str, str]):
+        result = {"uids": []}
+        for uid in self._uids(param):
+            summary = corpus.summary(uid)
+            result["uids"].append(uid)
+            result[uid] = summary or {
+                "uid": uid,
+                "error": "cannot get document summary",
+            }
+        self._send(200, json.dumps({"result": result}).encode(), "application/json")
+
+    def _oa(self, corpus: SimulatedCorpus, param: Dict[str, str]):
+        sim: EUtilsSimulator = self.server.simulator
+        uid = param.get("id", "").removeprefix("PMC")
+        if corpus.get(uid) is None:
+            inner = f'<error code="idDoesNotExist">unknown id PMC{uid}</error>'
+        elif uid in sim.not_open_access:
+            inner = (
+                f'<error code="idIsNotOpenAccess">identifier PMC{uid}'
+                " is not Open Access</error>"
+            )
+        else:
+            inner = (
+                '<records returned-count="1" total-count="1">'
+                f'<record id="PMC{uid}" license="CC BY"/></records>'
+            )
+        body = f'<?xml version="1.0"?>\n<OA>{inner}</OA>'
+        self._send(200, body.encode(), "text/xml")
+
+    def _send(self, status, body: bytes, content_type: str, headers=None):
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body, compresslevel=1)
+            headers = {**(headers or {}), "Content-Encoding": "gzip"}
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--corpus-dir", help="directory of efetch article XML files")
+    parser.add_argument("--size", type=int, default=500, help="synthetic articles")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", default="0", help="e.g. lognormal:0.12:0.6")
+    parser.add_argument("--rate-limit", type=float, help="requests/s before 429s")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    corpus = (
+        SimulatedCorpus.from_dir(args.corpus_dir)
+        if args.corpus_dir
+        else SimulatedCorpus.synthetic(args.size, args.seed)
+    )
+    simulator = EUtilsSimulator(
+        corpus,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        rate_limit=args.rate_limit,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    print(f"serving {len(corpus)} articles")
+    for key, value in simulator.env().items():
+        print(f"export {key}={value}")
+    try:
+        simulator._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
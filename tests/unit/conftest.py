@@ -0,0 +1,30 @@
+import pytest
+
+
+class FakeClock:
+    """Settable stand-in for ``time.time``; ``sleep`` only records the delay."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
+@pytest.fixture
+def fake_clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def make_cache(tmp_path, fake_clock):
+    """Build an on-disk cache under ``tmp_path / subdir`` driven by ``fake_clock``."""
+
+    def make(cache_cls, subdir=".", **kwargs):
+        return cache_cls(cache_dir=tmp_path / subdir, clock=fake_clock, **kwargs)
+
+    return make
@@ -1,3 +1,4 @@
+import asyncio
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -5,6 +6,7 @@ import pytest
 from langchain_core.messages import AIMessage, HumanMessage
 
 from src.medlit_agent.agent.agent import OllamaAgent
+from src.medlit_agent.pmc_service.resilience import CircuitOpenError
 
 
 def _stream_chunks(text: str, size: int = 80):
@@ -134,7 +136,8 @@ class TestOllamaAgent:
         mock_tool = MagicMock()
         mock_tool.name = "search_pubmed_central"
         mock_tool.description = "Search for articles"
-        mock_tool.invoke.return_value = [
+        mock_tool.ainvoke = AsyncMock()
+        mock_tool.ainvoke.return_value = [
             {
                 "pmcid": "PMC123456",
                 "citation": "Test citation",
@@ -173,7 +176,7 @@ class TestOllamaAgent:
         async for chunk in agent.astream("search for diabetes"):
             chunks.append(chunk)
 
-        mock_tool.invoke.assert_called_once()
+        mock_tool.ainvoke.assert_called_once()
 
         assert len(agent.documents) == 1
         assert agent.documents[0]["pmcid"] == "PMC123456"
@@ -240,7 +243,8 @@ class TestOllamaAgent:
         mock_tool = MagicMock()
         mock_tool.name = "retrieve_full_text"
         mock_tool.description = "Retrieve full text"
-        mock_tool.invoke.side_effect = ValueError(
+        mock_tool.ainvoke = AsyncMock()
+        mock_tool.ainvoke.side_effect = ValueError(
             "No <body> element found in XML; cannot extract full text."
         )
 
@@ -267,6 +271,226 @@ class TestOllamaAgent:
         assert "PMC1831666" in full_output
         assert "Something went wrong" not in full_output
 
+    @pytest.mark.asyncio
+    @patch("src.medlit_agent.agent.agent.ChatOllama")
+    async def test_astream_stuck_tool_times_out_with_message(self, mock_ollama):
+
+        mock_llm = MagicMock()
+        mock_ollama.return_value = mock_llm
+
+        async def never_returns(_args):
+            await asyncio.sleep(10)
+
+        mock_tool = MagicMock()
+        mock_tool.name = "search_pubmed_central"
+        mock_tool.description = "Search PMC"
+        mock_tool.ainvoke = never_returns
+
+        agent = OllamaAgent(model="gpt-oss:20b", tools=[mock_tool], tool_timeout=0.05)
+        agent.llm_with_tools = mock_llm
+        mock_response = MagicMock()
+        mock_response.tool_calls = [
+            {"name": "search_pubmed_central", "args": {"query": "aspirin"}}
+        ]
+        mock_llm.ainvoke = AsyncMock(return_value=mock_response)
+
+        full_output = "".join(
+            [chunk async for chunk in agent.astream("aspirin research")]
+        )
+
+        assert "PubMed Central is not responding" in full_output
+
+    @pytest.mark.asyncio
+    @patch("src.medlit_agent.agent.agent.ChatOllama")
+    async def test_astream_slow_full_text_ingest_is_not_timed_out(self, mock_ollama):
+
+        mock_llm = MagicMock()
+        mock_ollama.return_value = mock_llm
+
+        async def slow_ingest(_args):
+            await asyncio.sleep(0.1)
+            return []
+
+        mock_tool = MagicMock()
+        mock_tool.name = "retrieve_full_text"
+        mock_tool.description = "Retrieve full text"
+        mock_tool.ainvoke = slow_ingest
+
+        agent = OllamaAgent(model="gpt-oss:20b", tools=[mock_tool], tool_timeout=0.01)
+        agent.llm_with_tools = mock_llm
+        mock_response = MagicMock()
+        mock_response.tool_calls = [
+            {"name": "retrieve_full_text", "args": {"pmcid": "PMC1"}}
+        ]
+        mock_llm.ainvoke = AsyncMock(return_value=mock_response)
+
+        full_output = "".join(
+            [chunk async for chunk in agent.astream("tell me about PMC1")]
+        )
+
+        assert "PubMed Central is not responding" not in full_output
+
+    @pytest.mark.asyncio
+    @patch("src.medlit_agent.agent.agent.ChatOllama")
+    async def test_astream_open_circuit_reports_unavailable(self, mock_ollama):
+
+        mock_llm = MagicMock()
+        mock_ollama.return_value = mock_llm
+
+        mock_tool = MagicMock()
+        mock_tool.name = "search_pubmed_central"
+        mock_tool.description = "Search PMC"
+        mock_tool.ainvoke = AsyncMock(side_effect=CircuitOpenError("NCBI down"))
+
+        agent = OllamaAgent(model="gpt-oss:20b", tools=[mock_tool])
+        agent.llm_with_tools = mock_llm
+        mock_response = MagicMock()
+        mock_response.tool_calls = [
+            {"name": "search_pubmed_central", "args": {"query": "aspirin"}}
+        ]
+        mock_llm.ainvoke = AsyncMock(return_value=mock_response)
+
+        full_output = "".join(
+            [chunk async for chunk in agent.astream("aspirin research")]
+        )
+
+        assert "PubMed Central is not responding" in full_output
+        assert "Something went wrong" not in full_output
+
+    @pytest.mark.asyncio
+    @patch("src.medlit_agent.agent.agent.ChatOllama")
+    async def test_arun_tool_schedules_prefetch_after_search(self, mock_ollama):
+
+        mock_tool = MagicMock()
+        mock_tool.name = "search_pubmed_central"
+        mock_tool.ainvoke = AsyncMock(
+            return_value=[{"pmcid": "PMC1"}, {"pmcid": "PMC2"}]
+        )
+        prefetcher = MagicMock()
+
+        agent = OllamaAgent(
+            model="gpt-oss:20b", tools=[mock_tool], prefetcher=prefetcher
+        )
+        await agent._arun_tool("search_pubmed_central", {"query": "q"})
+
+        prefetcher.schedule.assert_called_once()
+        assert list(prefetcher.schedule.call_args.args[0]) == ["PMC1", "PMC2"]
+
+    @pytest.mark.asyncio
+    @patch("src.medlit_agent.agent.agent.ChatOllama")
+    async def test_arun_tool_waits_for_prefetch_before_full_text(self, mock_ollama):
+
+        calls = []
+        mock_tool = MagicMock()
+        mock_tool.name = "retrieve_full_text"
+        mock_tool.ainvoke = AsyncMock(
+            side_effect=lambda args: calls.append("tool") or [{"title": "t"}]
+        )
+        prefetcher = MagicMock()
+        prefetcher.wait_for = AsyncMock(side_effect=lambda _: calls.append("wait"))
+
+        agent = OllamaAgent(
+            model="gpt-oss:20b", tools=[mock_tool], prefetcher=prefetcher
+        )
+        await agent._arun_tool("retrieve_full_text", {"pmcid": "PMC9"})
+
+        prefetcher.wait_for.assert_awaited_once_with("PMC9")
+        assert calls == ["wait", "tool"]
+        prefetcher.schedule.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("src.medlit_agent.agent.agent.ChatOllama")
+    async def test_astream_shows_citations_as_search_results_arrive(self, mock_ollama):
+
+        mock_llm = MagicMock()
+        mock_ollama.return_value = mock_llm
+
+        mock_tool = MagicMock()
+        mock_tool.name = "search_pubmed_central"
+        mock_tool.ainvoke = AsyncMock()
+        arrivals = []
+
+        async def search_stream(query, max_results, alternative_queries):
+            # the second-ranked article finishes downloading first
+            for rank, pmcid in [(1, "PMC2"), (0, "PMC1"), (2, "PMC3")]:
+                arrivals.append(pmcid)
+                yield rank, {
+                    "pmcid": pmcid,
+                    "citation": f"Citation {pmcid}",
+                    "abstract": "",
+                }
+
+        agent = OllamaAgent(
+            model="gpt-oss:20b",
+            tools=[mock_tool],
+            search_stream=search_stream,
+            synthesis_after=2,
+        )
+        agent.llm_with_tools = mock_llm
+        agent.llm = mock_llm
+        mock_response = MagicMock()
+        mock_response.tool_calls = [
+            {"name": "search_pubmed_central", "args": {"query": "aspirin"}}
+        ]
+        mock_llm.ainvoke = AsyncMock(return_value=mock_response)
+        mock_llm.astream = MagicMock(
+            return_value=_stream_chunks('{"what_the_research_found": "x"}')
+        )
+
+        full_output = "".join(
+            [chunk async for chunk in agent.astream("aspirin research")]
+        )
+
+        mock_tool.ainvoke.assert_not_called()
+        assert full_output.index("📖 Citation PMC2") < full_output.index(
+            "📖 Citation PMC1"
+        )
+        assert "Found 2 articles" in full_output
+        # the synthesis starts after two hits; the third is shown once it is out
+        synthesis_messages = mock_llm.astream.call_args.args[0]
+        assert "Citation PMC3" not in str(synthesis_messages)
+        assert (
+            full_output.index("What the research found")
+            < full_output.index("More articles on this topic")
+            < full_output.index("📖 Citation PMC3")
+            < full_output.index("Any other follow-up questions")
+        )
+        assert arrivals == ["PMC2", "PMC1", "PMC3"]
+        assert [doc["pmcid"] for doc in agent.documents] == ["PMC1", "PMC2", "PMC3"]
+
+    @pytest.mark.asyncio
+    @patch("src.medlit_agent.agent.agent.ChatOllama")
+    async def test_stuck_search_stream_times_out_with_message(self, mock_ollama):
+
+        mock_llm = MagicMock()
+        mock_ollama.return_value = mock_llm
+
+        mock_tool = MagicMock()
+        mock_tool.name = "search_pubmed_central"
+
+        async def search_stream(query, max_results, alternative_queries):
+            await asyncio.sleep(10)
+            yield 0, {}
+
+        agent = OllamaAgent(
+            model="gpt-oss:20b",
+            tools=[mock_tool],
+            tool_timeout=0.01,
+            search_stream=search_stream,
+        )
+        agent.llm_with_tools = mock_llm
+        mock_response = MagicMock()
+        mock_response.tool_calls = [
+            {"name": "search_pubmed_central", "args": {"query": "aspirin"}}
+        ]
+        mock_llm.ainvoke = AsyncMock(return_value=mock_response)
+
+        full_output = "".join(
+            [chunk async for chunk in agent.astream("aspirin research")]
+        )
+
+        assert "PubMed Central is not responding" in full_output
+
     @pytest.mark.asyncio
     @patch("src.medlit_agent.agent.agent.ChatOllama")
     async def test_ainvoke_method(self, mock_ollama):
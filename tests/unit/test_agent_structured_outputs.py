@@ -23,7 +23,8 @@ async def test_structured_synthesis_output_is_rendered(mock_ollama):
     mock_tool = MagicMock()
     mock_tool.name = "search_pubmed_central"
     mock_tool.description = "Search for articles"
-    mock_tool.invoke.return_value = [
+    mock_tool.ainvoke = AsyncMock()
+    mock_tool.ainvoke.return_value = [
         {
             "pmcid": "PMC123456",
             "citation": "Author. (2025). Title.",
@@ -121,7 +122,8 @@ async def test_full_text_tool_output_omits_sources_section(mock_ollama):
     mock_tool = MagicMock()
     mock_tool.name = "retrieve_full_text"
     mock_tool.description = "Retrieve full article sections"
-    mock_tool.invoke.return_value = [
+    mock_tool.ainvoke = AsyncMock()
+    mock_tool.ainvoke.return_value = [
         {
             "title": "Results",
             "body": "Detailed findings about treatment effects.",
@@ -173,7 +175,8 @@ async def test_structured_synthesis_streams_in_multiple_chunks(mock_ollama):
     mock_tool = MagicMock()
     mock_tool.name = "search_pubmed_central"
     mock_tool.description = "Search for articles"
-    mock_tool.invoke.return_value = [
+    mock_tool.ainvoke = AsyncMock()
+    mock_tool.ainvoke.return_value = [
         {
             "pmcid": "PMC123456",
             "citation": "Author. (2025). Title.",
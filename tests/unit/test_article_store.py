@@ -0,0 +1,41 @@
+from src.medlit_agent.pmc_service.article_store import ArticleStore
+
+
+def test_put_and_get():
+    store = ArticleStore(max_bytes=100)
+
+    store.put("PMC1", b"<article/>")
+
+    assert store.get("PMC1") == b"<article/>"
+    assert store.get("PMC2") is None
+    assert "PMC1" in store
+
+
+def test_least_recently_used_items_are_evicted_over_budget():
+    store = ArticleStore(max_bytes=20)
+    store.put("PMC1", b"x" * 8)
+    store.put("PMC2", b"y" * 8)
+    store.get("PMC1")
+
+    store.put("PMC3", b"z" * 8)
+
+    assert "PMC2" not in store
+    assert store.get("PMC1") == b"x" * 8
+    assert store.get("PMC3") == b"z" * 8
+
+
+def test_replacing_an_item_updates_size():
+    store = ArticleStore(max_bytes=10)
+    store.put("PMC1", b"x" * 8)
+    store.put("PMC1", b"y" * 4)
+    store.put("PMC2", b"z" * 6)
+
+    assert len(store) == 2
+
+
+def test_items_larger_than_budget_are_ignored():
+    store = ArticleStore(max_bytes=4)
+
+    store.put("PMC1", b"too large")
+
+    assert len(store) == 0
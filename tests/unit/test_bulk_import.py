@@ -0,0 +1,163 @@
+import io
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.medlit_agent.pmc_service.bulk_import import (
+    BulkImporter,
+    iter_archive_members,
+    parse_member,
+)
+from src.medlit_agent.pmc_service.embedded_articles import EmbeddedArticleList
+from src.medlit_agent.pmc_service.local_search import LocalSearchIndex
+from src.medlit_agent.pmc_service.pmc_endpoint import PMCEndpoint
+
+
+def _article(pmcid, title, body=True):
+    body_xml = (
+        f"<body><sec><title>Results</title><p>{title} results text.</p></sec></body>"
+        if body
+        else ""
+    )
+    return (
+        "<article><front><article-meta>"
+        f'<article-id pub-id-type="pmc">{pmcid}</article-id>'
+        f"<title-group><article-title>{title}</article-title></title-group>"
+        '<pub-date pub-type="epub"><year>2023</year></pub-date>'
+        f"<abstract><p>{title} abstract.</p></abstract>"
+        f"</article-meta></front>{body_xml}</article>"
+    ).encode()
+
+
+def _write_archive(path, members):
+    with tarfile.open(path, "w:gz") as archive:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return path
+
+
+class FakeDB:
+    def __init__(self, fail_on_call=None):
+        self.calls = []
+        self.fail_on_call = fail_on_call
+
+    def add_many(self, articles):
+        articles = list(articles)
+        self.calls.append(articles)
+        if len(self.calls) == self.fail_on_call:
+            raise RuntimeError("chroma down")
+
+
+@pytest.fixture(autouse=True)
+def isolated_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        PMCEndpoint, "local_index", LocalSearchIndex(index_dir=tmp_path / "index")
+    )
+    monkeypatch.setattr(
+        PMCEndpoint,
+        "embedded_articles",
+        EmbeddedArticleList(cache_dir=tmp_path / "embedded"),
+    )
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return _write_archive(
+        tmp_path / "oa_comm_xml.PMC000xxxxxx.baseline.tar.gz",
+        [
+            ("PMC000xxxxxx/PMC1.xml", _article("PMC1", "Aspirin dosing")),
+            ("PMC000xxxxxx/PMC2.nxml", _article("2", "Statin therapy")),
+            ("PMC000xxxxxx/PMC3.xml", _article("PMC3", "Letter", body=False)),
+            ("PMC000xxxxxx/PMC4.xml", b"<article><front>"),
+            ("PMC000xxxxxx/readme.txt", b"not xml"),
+        ],
+    )
+
+
+def _importer(tmp_path, db, batch_size=2):
+    return BulkImporter(
+        db=db, workers=2, batch_size=batch_size, state_dir=tmp_path / "state"
+    )
+
+
+def test_iter_archive_members_streams_xml_files(archive):
+    names = [name for name, _ in iter_archive_members(archive)]
+
+    assert names == [
+        "PMC000xxxxxx/PMC1.xml",
+        "PMC000xxxxxx/PMC2.nxml",
+        "PMC000xxxxxx/PMC3.xml",
+        "PMC000xxxxxx/PMC4.xml",
+    ]
+
+
+def test_parse_member_returns_citation_and_sections():
+    result = parse_member("PMC1.xml", _article("PMC1", "Aspirin dosing"))
+
+    assert result["pmcid"] == "PMC1"
+    assert "Aspirin dosing" in result["record"]["apa_citation"]
+    assert result["sections"] == [
+        {"title": "Results", "body": "Aspirin dosing results text."}
+    ]
+    assert parse_member("PMC3.xml", _article("PMC3", "Letter", False))["sections"] == []
+    assert parse_member("PMC4.xml", b"<article><front>") is None
+
+
+def test_import_writes_batches_to_chroma_and_index(tmp_path, archive):
+    db = FakeDB()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        progress = _importer(tmp_path, db).import_archive(archive, pool)
+
+    assert (progress.imported, progress.failed, progress.skipped) == (3, 1, 0)
+    assert [[pmcid for pmcid, _ in call] for call in db.calls] == [
+        ["PMC1", "PMC2"],
+        [],
+    ]
+    assert PMCEndpoint.embedded_articles.pmcids() == ["PMC1", "PMC2"]
+    hits = PMCEndpoint.local_index.search("statin results", limit=1)
+    assert hits[0]["pmcid"] == "PMC2"
+    assert PMCEndpoint.local_index.search("letter", limit=1)[0]["pmcid"] == "PMC3"
+
+
+def test_import_resumes_after_a_failed_batch(tmp_path, archive):
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        with pytest.raises(RuntimeError):
+            _importer(tmp_path, FakeDB(fail_on_call=2), 1).import_archive(archive, pool)
+
+        db = FakeDB()
+        importer = _importer(tmp_path, db, 1)
+        progress = importer.import_archive(archive, pool)
+
+        assert progress.skipped == 1
+        assert [call[0][0] for call in db.calls if call] == ["PMC2"]
+        assert importer.is_finished(archive)
+
+        again = importer.import_archive(archive, pool)
+    assert (again.imported, again.skipped) == (0, 0)
+
+
+def test_reimports_a_redownloaded_archive_with_the_same_name(tmp_path, archive):
+    importer = _importer(tmp_path, FakeDB(), batch_size=10)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        importer.import_archive(archive, pool)
+        _write_archive(
+            archive, [("PMC000xxxxxx/PMC5.xml", _article("PMC5", "Metformin"))]
+        )
+
+        assert not importer.is_finished(archive)
+        progress = importer.import_archive(archive, pool)
+
+    assert (progress.imported, progress.skipped) == (1, 0)
+    assert importer.is_finished(archive)
+
+
+def test_import_archives_uses_a_process_pool(tmp_path, archive):
+    db = FakeDB()
+
+    (progress,) = _importer(tmp_path, db, batch_size=10).import_archives([archive])
+
+    assert progress.imported == 3
+    assert sorted(pmcid for pmcid, _ in db.calls[0]) == ["PMC1", "PMC2"]
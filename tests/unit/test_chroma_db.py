@@ -46,7 +46,7 @@ def test_add_chunks_and_stores_embeddings():
             db.add("PMC42", [{"title": "Results", "body": "Long section text"}])
 
     mock_embedder.get_embeddings.assert_called_once_with(["chunk a", "chunk b"])
-    kwargs = db.collection.add.call_args.kwargs
+    kwargs = db.collection.upsert.call_args.kwargs
     assert kwargs["ids"] == ["PMC42_0", "PMC42_1"]
     assert kwargs["embeddings"] == [[0.1], [0.2]]
     assert kwargs["metadatas"] == [
@@ -55,6 +55,50 @@ def test_add_chunks_and_stores_embeddings():
     ]
 
 
+def test_add_many_embeds_once_and_slices_writes():
+    db = ChromaDB.__new__(ChromaDB)
+    db.collection = MagicMock()
+
+    with (
+        patch(
+            "src.medlit_agent.pmc_service.chroma_db.SBertEmbeddingsService"
+        ) as mock_embed_cls,
+        patch("src.medlit_agent.pmc_service.chroma_db._MAX_WRITE_BATCH", 2),
+    ):
+        mock_embedder = mock_embed_cls.return_value
+        mock_embedder.get_embeddings.return_value = [[0.1], [0.2], [0.3]]
+
+        db.add_many(
+            [
+                (
+                    "PMC1",
+                    [{"title": "A", "body": "one"}, {"title": "B", "body": "two"}],
+                ),
+                ("PMC2", []),
+                ("PMC3", [{"title": "C", "body": "three"}]),
+            ]
+        )
+
+    mock_embedder.get_embeddings.assert_called_once_with(["one", "two", "three"])
+    writes = [call.kwargs for call in db.collection.upsert.call_args_list]
+    assert [write["ids"] for write in writes] == [["PMC1_0", "PMC1_1"], ["PMC3_0"]]
+    assert writes[1]["embeddings"] == [[0.3]]
+    assert writes[1]["metadatas"] == [{"title": "C", "text": "three", "pmcid": "PMC3"}]
+
+
+def test_add_many_without_text_skips_embedding():
+    db = ChromaDB.__new__(ChromaDB)
+    db.collection = MagicMock()
+
+    with patch(
+        "src.medlit_agent.pmc_service.chroma_db.SBertEmbeddingsService"
+    ) as mock_embed_cls:
+        db.add_many([("PMC1", [])])
+
+    mock_embed_cls.assert_not_called()
+    db.collection.upsert.assert_not_called()
+
+
 def test_query_document_exists_and_get_sections():
     db = ChromaDB.__new__(ChromaDB)
     db.collection = MagicMock()
@@ -85,3 +129,51 @@ def test_query_document_exists_and_get_sections():
         {"title": "Methods", "body": "method text"},
         {"title": "Untitled Section", "body": "untitled body"},
     ]
+
+
+def test_delete_and_list_pmcids():
+    db = ChromaDB.__new__(ChromaDB)
+    db.collection = MagicMock()
+    db.collection.get.return_value = {
+        "metadatas": [{"pmcid": "PMC2"}, {"pmcid": "PMC1"}, {"pmcid": "PMC2"}]
+    }
+
+    assert db.pmcids() == ["PMC1", "PMC2"]
+
+    db.delete("PMC2")
+    db.collection.delete.assert_called_once_with(where={"pmcid": "PMC2"})
+
+
+def _canonical(pmcid):
+    digits = pmcid.upper().removeprefix("PMC")
+    return f"PMC{digits}"
+
+
+def test_canonicalize_pmcids_relabels_raw_ids_once():
+    db = ChromaDB.__new__(ChromaDB)
+    db.collection = MagicMock()
+    db.collection.metadata = None
+    db.collection.get.return_value = {
+        "ids": ["123_0", "123_1", "PMC9_0", "pmc9_0"],
+        "metadatas": [
+            {"pmcid": "123", "text": "a"},
+            {"pmcid": "123", "text": "b"},
+            {"pmcid": "PMC9", "text": "c"},
+            {"pmcid": "pmc9", "text": "d"},
+        ],
+    }
+
+    assert db.canonicalize_pmcids(_canonical) == 3
+
+    db.collection.update.assert_called_once_with(
+        ids=["123_0", "123_1"],
+        metadatas=[{"pmcid": "PMC123", "text": "a"}, {"pmcid": "PMC123", "text": "b"}],
+    )
+    # already stored under its canonical ID: the raw copy is a duplicate
+    db.collection.delete.assert_called_once_with(ids=["pmc9_0"])
+    db.collection.modify.assert_called_once_with(metadata={"canonical_pmcids": True})
+
+    db.collection.metadata = {"canonical_pmcids": True}
+    db.collection.get.reset_mock()
+    assert db.canonicalize_pmcids(_canonical) == 0
+    db.collection.get.assert_not_called()
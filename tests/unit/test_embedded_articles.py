@@ -0,0 +1,25 @@
+from unittest.mock import MagicMock
+
+from src.medlit_agent.pmc_service.embedded_articles import EmbeddedArticleList
+
+
+def test_added_articles_are_listed_once(make_cache):
+    articles = make_cache(EmbeddedArticleList)
+    articles.add("PMC2")
+    articles.add_many(["PMC1", "PMC2"])
+
+    assert articles.pmcids() == ["PMC1", "PMC2"]
+    assert articles.contains("PMC1")
+    assert not articles.contains("PMC3")
+
+
+def test_seed_lists_the_collection_only_once(make_cache):
+    articles = make_cache(EmbeddedArticleList)
+    list_pmcids = MagicMock(return_value=["PMC1", "PMC2"])
+
+    assert articles.seed(list_pmcids) == 2
+    # a fresh instance on the same file sees that seeding already happened
+    assert make_cache(EmbeddedArticleList).seed(list_pmcids) == 0
+
+    list_pmcids.assert_called_once_with()
+    assert articles.pmcids() == ["PMC1", "PMC2"]
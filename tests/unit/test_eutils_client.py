@@ -0,0 +1,229 @@
+import asyncio
+import random
+import urllib.error
+
+import httpx
+import pytest
+from Bio import Entrez
+
+from src.medlit_agent.pmc_service.eutils_client import (
+    AsyncEUtilsClient,
+    RebasedEntrez,
+    set_entrez_socket_timeout,
+)
+from tests.load.eutils_simulator import EUtilsSimulator, LatencyModel, SimulatedCorpus
+
+
+def _client_with_transport(handler, **kwargs):
+    client = AsyncEUtilsClient(
+        email="test@example.com", api_key="key", tool="unit", **kwargs
+    )
+    client._client = httpx.AsyncClient(
+        base_url=client.base_url, transport=httpx.MockTransport(handler)
+    )
+    client._client_loop = asyncio.get_running_loop()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_esearch_returns_entrez_style_record():
+    seen = {}
+
+    def handler(request):
+        seen["path"] = request.url.path
+        seen["params"] = dict(request.url.params)
+        return httpx.Response(
+            200,
+            json={"esearchresult": {"count": "2", "idlist": ["111", "222"]}},
+        )
+
+    client = _client_with_transport(handler)
+    record = await client.esearch(term="aspirin", retmax=2)
+
+    assert record == {"Count": "2", "IdList": ["111", "222"]}
+    assert seen["path"].endswith("/esearch.fcgi")
+    assert seen["params"]["term"] == "aspirin"
+    assert seen["params"]["retmax"] == "2"
+    assert seen["params"]["sort"] == "relevance"
+    assert seen["params"]["api_key"] == "key"
+    assert seen["params"]["email"] == "test@example.com"
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_efetch_returns_bytes_and_joins_ids():
+    seen = {}
+
+    def handler(request):
+        seen["params"] = dict(request.url.params)
+        return httpx.Response(200, content=b"<pmc-articleset/>")
+
+    client = _client_with_transport(handler)
+    data = await client.efetch(["1", "2"])
+
+    assert data == b"<pmc-articleset/>"
+    assert seen["params"]["id"] == "1,2"
+    assert seen["params"]["rettype"] == "full"
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_large_id_lists_are_posted():
+    seen = {}
+
+    def handler(request):
+        seen["method"] = request.method
+        return httpx.Response(200, json={"result": {"uids": []}})
+
+    client = _client_with_transport(handler)
+    await client.esummary([str(i) for i in range(500)])
+
+    assert seen["method"] == "POST"
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_esummary_keys_results_by_uid():
+    def handler(request):
+        return httpx.Response(
+            200,
+            json={"result": {"uids": ["5"], "5": {"uid": "5", "title": "T"}}},
+        )
+
+    client = _client_with_transport(handler)
+    summaries = await client.esummary(["5"])
+
+    assert summaries == {"5": {"uid": "5", "title": "T"}}
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_http_errors_are_raised():
+    client = _client_with_transport(lambda request: httpx.Response(500))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.efetch("1")
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_pool_is_reused_within_a_loop():
+    client = AsyncEUtilsClient()
+
+    first = client._get_client()
+    second = client._get_client()
+
+    assert first is second
+    assert first.headers["Accept-Encoding"] == "gzip"
+    await client.aclose()
+
+
+def _simulated_article(uid, title):
+    return (
+        f'<article><front><article-meta><article-id pub-id-type="pmc">PMC{uid}'
+        f"</article-id><title-group><article-title>{title}</article-title>"
+        "</title-group><pub-date><year>2020</year></pub-date>"
+        "</article-meta></front><body><p>Body</p></body></article>"
+    ).encode("utf-8")
+
+
+@pytest.fixture
+def simulator():
+    corpus = SimulatedCorpus(
+        {
+            "101": _simulated_article("101", "Aspirin after myocardial infarction"),
+            "102": _simulated_article("102", "Aspirin dosing in children"),
+            "103": _simulated_article("103", "Statins and cholesterol"),
+        }
+    )
+    with EUtilsSimulator(corpus, not_open_access=["PMC103"]) as sim:
+        yield sim
+
+
+def test_rebased_entrez_sends_requests_to_base_url(simulator):
+    endpoint = RebasedEntrez(simulator.base_url)
+
+    handle = endpoint.esearch(db="pmc", term="aspirin infarction", retmax=5)
+    try:
+        record = endpoint.read(handle)
+    finally:
+        handle.close()
+    assert record["IdList"] == ["101", "102"]
+
+    handle = endpoint.efetch(db="pmc", id="101,PMC102", rettype="full")
+    try:
+        xml = handle.read()
+    finally:
+        handle.close()
+    assert b"PMC101" in xml and b"PMC102" in xml
+    assert simulator.stats["requests.esearch"] == 1
+    assert simulator.stats["requests.efetch"] == 1
+
+
+def test_rebased_entrez_forwards_attributes_to_bio_entrez():
+    endpoint = RebasedEntrez("http://localhost:1/eutils")
+
+    assert endpoint.base_url == "http://localhost:1/eutils/"
+    assert endpoint.read is Entrez.read
+    original = Entrez.max_tries
+    try:
+        endpoint.max_tries = 7
+        assert Entrez.max_tries == 7
+    finally:
+        Entrez.max_tries = original
+
+
+def test_entrez_socket_timeout_bounds_stalled_requests():
+    corpus = SimulatedCorpus({"101": _simulated_article("101", "Aspirin")})
+    original = Entrez.urlopen
+    try:
+        with EUtilsSimulator(corpus, latency=2.0) as sim:
+            endpoint = RebasedEntrez(sim.base_url)
+            set_entrez_socket_timeout(0.2)
+            with pytest.raises((TimeoutError, urllib.error.URLError)):
+                endpoint.esearch(db="pmc", term="aspirin")
+    finally:
+        Entrez.urlopen = original
+
+
+@pytest.mark.asyncio
+async def test_async_client_against_simulator(simulator):
+    client = AsyncEUtilsClient(
+        base_url=simulator.base_url, oa_service_url=simulator.oa_service_url
+    )
+
+    record = await client.esearch(term="aspirin children", retmax=1)
+    assert record["IdList"] == ["102"]
+    assert b"PMC102" in await client.efetch(["102"])
+    summaries = await client.esummary(["101", "999"])
+    assert summaries["101"]["title"] == "Aspirin after myocardial infarction"
+    assert "error" in summaries["999"]
+    assert b"idIsNotOpenAccess" in await client.oa_record("PMC103")
+    assert b"<record" in await client.oa_record("PMC101")
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_simulator_rate_limit_answers_429():
+    corpus = SimulatedCorpus({"101": _simulated_article("101", "Aspirin")})
+    with EUtilsSimulator(corpus, rate_limit=1) as sim:
+        client = AsyncEUtilsClient(base_url=sim.base_url)
+        await client.esearch(term="aspirin")
+        with pytest.raises(httpx.HTTPStatusError) as excinfo:
+            await client.esearch(term="aspirin")
+        await client.aclose()
+
+    assert excinfo.value.response.status_code == 429
+    assert sim.stats["responses.429"] == 1
+
+
+def test_latency_model_specs():
+    rng = random.Random(0)
+
+    assert LatencyModel.from_spec("0.25").sample(rng) == 0.25
+    assert LatencyModel.from_spec(None).sample(rng) == 0.0
+    assert 0.1 <= LatencyModel.from_spec("uniform:0.1:0.2").sample(rng) <= 0.2
+    assert LatencyModel.from_spec("lognormal:0.1:0.5").sample(rng) > 0
+    assert LatencyModel.from_spec("exp:0.1").sample(rng) >= 0
+    with pytest.raises(ValueError):
+        LatencyModel.from_spec("pareto:1:2")
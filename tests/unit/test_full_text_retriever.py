@@ -1,6 +1,44 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from src.medlit_agent.pmc_service.full_text_retriever import FullTextRetriever
+import pytest
+
+from src.medlit_agent.pmc_service.article_store import ArticleStore
+from src.medlit_agent.pmc_service.embedded_articles import EmbeddedArticleList
+from src.medlit_agent.pmc_service.full_text_retriever import (
+    FullTextRetriever,
+    PMCEndpoint,
+)
+from src.medlit_agent.pmc_service.local_search import LocalSearchIndex
+from src.medlit_agent.pmc_service.unavailable_cache import FullTextUnavailableCache
+from src.medlit_agent.pmc_service.xml_to_dict import FullTextUnavailableError
+
+
+@pytest.fixture(autouse=True)
+def empty_article_store(monkeypatch):
+    store = ArticleStore()
+    monkeypatch.setattr(PMCEndpoint, "article_store", store)
+    return store
+
+
+@pytest.fixture(autouse=True)
+def isolated_local_index(tmp_path, monkeypatch):
+    index = LocalSearchIndex(index_dir=tmp_path / "index")
+    monkeypatch.setattr(PMCEndpoint, "local_index", index)
+    return index
+
+
+@pytest.fixture(autouse=True)
+def isolated_embedded_articles(tmp_path, monkeypatch):
+    articles = EmbeddedArticleList(cache_dir=tmp_path / "embedded")
+    monkeypatch.setattr(PMCEndpoint, "embedded_articles", articles)
+    return articles
+
+
+@pytest.fixture(autouse=True)
+def isolated_unavailable_cache(tmp_path, monkeypatch):
+    cache = FullTextUnavailableCache(cache_dir=tmp_path / "unavailable")
+    monkeypatch.setattr(PMCEndpoint, "unavailable_cache", cache)
+    return cache
 
 
 @patch("src.medlit_agent.pmc_service.full_text_retriever.ChromaDB")
@@ -15,7 +53,7 @@ def test_retrieve_full_text_uses_chroma_cache_first(mock_chroma_db):
     retriever = FullTextRetriever()
 
     with patch(
-        "src.medlit_agent.pmc_service.full_text_retriever.PMCEndpoint.fetch_pmcid_xml"
+        "src.medlit_agent.pmc_service.full_text_retriever.PMCEndpoint.fetch_pmcid_xml_bytes"
     ) as mock_fetch_xml:
         result = retriever.retrieve_full_text("PMC123")
 
@@ -26,7 +64,9 @@ def test_retrieve_full_text_uses_chroma_cache_first(mock_chroma_db):
 
 
 @patch("src.medlit_agent.pmc_service.full_text_retriever.ChromaDB")
-@patch("src.medlit_agent.pmc_service.full_text_retriever.PMCEndpoint.fetch_pmcid_xml")
+@patch(
+    "src.medlit_agent.pmc_service.full_text_retriever.PMCEndpoint.fetch_pmcid_xml_bytes"
+)
 def test_retrieve_full_text_fetches_stores_then_reads_cache(
     mock_fetch_xml, mock_chroma_db
 ):
@@ -37,7 +77,7 @@ def test_retrieve_full_text_fetches_stores_then_reads_cache(
         {"title": "Discussion", "body": "chunk 2"},
     ]
     mock_chroma_db.return_value = mock_db
-    mock_fetch_xml.return_value = "<xml/>"
+    mock_fetch_xml.return_value = b"<xml/>"
 
     retriever = FullTextRetriever()
     retriever.converter.convert = MagicMock(
@@ -63,6 +103,18 @@ def test_retrieve_full_text_fetches_stores_then_reads_cache(
         ],
     )
     mock_db.get_sections_by_pmcid.assert_called_once_with("PMC999", limit=5)
+    assert PMCEndpoint.embedded_articles.pmcids() == ["PMC999"]
+
+
+@patch("src.medlit_agent.pmc_service.full_text_retriever.ChromaDB")
+def test_existing_collection_seeds_the_embedded_article_list(mock_chroma_db):
+    mock_chroma_db.return_value.pmcids.return_value = ["PMC1", "PMC2"]
+
+    FullTextRetriever()
+    FullTextRetriever()
+
+    mock_chroma_db.return_value.pmcids.assert_called_once_with()
+    assert PMCEndpoint.embedded_articles.pmcids() == ["PMC1", "PMC2"]
 
 
 @patch("src.medlit_agent.pmc_service.full_text_retriever.ChromaDB")
@@ -76,3 +128,143 @@ def test_retrieve_full_text_respects_requested_top_n(mock_chroma_db):
     retriever.retrieve_full_text("PMC555", n_results=3)
 
     mock_db.get_sections_by_pmcid.assert_called_once_with("PMC555", limit=3)
+
+
+@pytest.mark.asyncio
+@patch("src.medlit_agent.pmc_service.full_text_retriever.ChromaDB")
+@patch(
+    "src.medlit_agent.pmc_service.full_text_retriever.PMCEndpoint.afetch_pmcid_xml_bytes",
+    new_callable=AsyncMock,
+)
+async def test_aretrieve_full_text_fetches_with_async_endpoint(
+    mock_afetch_xml, mock_chroma_db
+):
+    mock_db = MagicMock()
+    mock_db.document_exists.return_value = False
+    mock_db.get_sections_by_pmcid.return_value = [{"title": "Results", "body": "x"}]
+    mock_chroma_db.return_value = mock_db
+    mock_afetch_xml.return_value = b"<xml/>"
+
+    retriever = FullTextRetriever()
+    retriever.converter = MagicMock()
+    retriever.converter.convert.return_value = [{"title": "Results", "body": "x"}]
+
+    result = await retriever.aretrieve_full_text("PMC999", n_results=3)
+
+    assert result == [{"title": "Results", "body": "x"}]
+    mock_afetch_xml.assert_awaited_once_with("PMC999")
+    mock_db.add.assert_called_once_with("PMC999", [{"title": "Results", "body": "x"}])
+    mock_db.get_sections_by_pmcid.assert_called_once_with("PMC999", limit=3)
+
+
+@patch("src.medlit_agent.pmc_service.full_text_retriever.ChromaDB")
+@patch(
+    "src.medlit_agent.pmc_service.full_text_retriever.PMCEndpoint.fetch_pmcid_xml_bytes"
+)
+def test_retrieve_full_text_reuses_search_time_xml(
+    mock_fetch_xml, mock_chroma_db, empty_article_store
+):
+    mock_db = MagicMock()
+    mock_db.document_exists.return_value = False
+    mock_db.get_sections_by_pmcid.return_value = [{"title": "Results", "body": "x"}]
+    mock_chroma_db.return_value = mock_db
+    empty_article_store.put("PMC777", b"<article>search xml</article>")
+
+    retriever = FullTextRetriever()
+    retriever.converter.convert = MagicMock(
+        return_value=[{"title": "Results", "body": "x"}]
+    )
+
+    # esearch hands out bare numeric IDs; they resolve to the same article
+    retriever.retrieve_full_text("777")
+
+    mock_fetch_xml.assert_not_called()
+    retriever.converter.convert.assert_called_once_with(
+        b"<article>search xml</article>"
+    )
+    mock_db.document_exists.assert_called_once_with("PMC777")
+
+
+@pytest.mark.asyncio
+@patch("src.medlit_agent.pmc_service.full_text_retriever.ChromaDB")
+async def test_aingest_skips_articles_already_stored(mock_chroma_db):
+    mock_db = MagicMock()
+    mock_db.document_exists.return_value = True
+    mock_chroma_db.return_value = mock_db
+
+    retriever = FullTextRetriever()
+
+    with patch(
+        "src.medlit_agent.pmc_service.full_text_retriever.PMCEndpoint.afetch_pmcid_xml_bytes",
+        new_callable=AsyncMock,
+    ) as mock_fetch:
+        assert await retriever.aingest("123") is False
+
+    mock_db.document_exists.assert_called_once_with("PMC123")
+    mock_fetch.assert_not_awaited()
+    mock_db.add.assert_not_called()
+
+
+@patch("src.medlit_agent.pmc_service.full_text_retriever.ChromaDB")
+@patch(
+    "src.medlit_agent.pmc_service.full_text_retriever.PMCEndpoint.fetch_pmcid_xml_bytes"
+)
+def test_articles_without_body_are_remembered(
+    mock_fetch_xml, mock_chroma_db, isolated_unavailable_cache
+):
+    mock_db = MagicMock()
+    mock_db.document_exists.return_value = False
+    mock_chroma_db.return_value = mock_db
+    mock_fetch_xml.return_value = b"<article><front/></article>"
+
+    retriever = FullTextRetriever()
+    for _ in range(2):
+        with pytest.raises(FullTextUnavailableError, match="cannot extract full text"):
+            retriever.retrieve_full_text("PMC404")
+
+    mock_fetch_xml.assert_called_once_with("PMC404")
+    assert "No <body>" in isolated_unavailable_cache.get("PMC404")
+    mock_db.add.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("src.medlit_agent.pmc_service.full_text_retriever.ChromaDB")
+async def test_aingest_fails_fast_for_known_unavailable_article(
+    mock_chroma_db, isolated_unavailable_cache
+):
+    mock_db = MagicMock()
+    mock_db.document_exists.return_value = False
+    mock_chroma_db.return_value = mock_db
+    isolated_unavailable_cache.put("PMC404", "No body; cannot extract full text.")
+
+    retriever = FullTextRetriever()
+    with patch(
+        "src.medlit_agent.pmc_service.full_text_retriever.PMCEndpoint.afetch_pmcid_xml_bytes",
+        new_callable=AsyncMock,
+    ) as mock_fetch:
+        with pytest.raises(FullTextUnavailableError):
+            await retriever.aingest("404")
+
+    mock_fetch.assert_not_awaited()
+
+
+@patch("src.medlit_agent.pmc_service.full_text_retriever.ChromaDB")
+@patch(
+    "src.medlit_agent.pmc_service.full_text_retriever.PMCEndpoint.fetch_pmcid_xml_bytes"
+)
+def test_large_articles_use_the_streaming_converter(mock_fetch_xml, mock_chroma_db):
+    mock_db = MagicMock()
+    mock_db.document_exists.return_value = False
+    mock_chroma_db.return_value = mock_db
+    small = b"<article><body><sec><title>A</title><p>x</p></sec></body></article>"
+    large = small.replace(b"<p>x</p>", b"<p>" + b"y" * 200 + b"</p>")
+    mock_fetch_xml.side_effect = [small, large]
+
+    retriever = FullTextRetriever(stream_min_bytes=100)
+    retriever.converter = MagicMock(wraps=retriever.converter)
+    retriever.ingest("PMC1")
+    retriever.ingest("PMC2")
+
+    retriever.converter.convert.assert_called_once_with(small)
+    retriever.converter.convert_stream.assert_called_once_with(large)
+    assert mock_db.add.call_args.args == ("PMC2", [{"title": "A", "body": "y" * 200}])
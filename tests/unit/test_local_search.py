@@ -0,0 +1,96 @@
+import pytest
+
+from src.medlit_agent.pmc_service.local_search import LocalSearchIndex, tokenize
+
+
+@pytest.fixture
+def index(tmp_path):
+    return LocalSearchIndex(index_dir=tmp_path)
+
+
+def _record(pmcid, title, abstract="", citation=None):
+    return {
+        "pmcid": pmcid,
+        "title": title,
+        "apa_citation": citation or f"Citation for {title}",
+        "abstract": abstract,
+    }
+
+
+def test_tokenize_drops_stop_words_and_case():
+    assert tokenize("The Effects of Aspirin on COVID-19") == [
+        "effects",
+        "aspirin",
+        "covid",
+        "19",
+    ]
+
+
+def test_search_ranks_matching_articles(index):
+    index.add_records(
+        [
+            _record("PMC1", "Aspirin and heart disease", "Aspirin lowers risk."),
+            _record("PMC2", "Diabetes management", "Insulin therapy outcomes."),
+            _record("PMC3", "Statins in practice", "Compared with aspirin."),
+        ]
+    )
+
+    hits = index.search("aspirin")
+
+    assert [hit["pmcid"] for hit in hits] == ["PMC1", "PMC3"]
+    assert hits[0]["apa_citation"] == "Citation for Aspirin and heart disease"
+    assert hits[0]["matched_terms"] == 1.0
+
+
+def test_title_match_outranks_abstract_match(index):
+    index.add_records(
+        [
+            _record("PMC1", "Cardiology review", "Discusses metformin briefly."),
+            _record("PMC2", "Metformin outcomes", "A cardiology review."),
+        ]
+    )
+
+    assert [hit["pmcid"] for hit in index.search("metformin")] == ["PMC2", "PMC1"]
+
+
+def test_matched_terms_is_share_of_query_terms(index):
+    index.add_record(_record("PMC1", "Aspirin trial"))
+
+    (hit,) = index.search("aspirin migraine")
+
+    assert hit["matched_terms"] == 0.5
+
+
+def test_updates_are_incremental_and_persisted(tmp_path):
+    index = LocalSearchIndex(index_dir=tmp_path)
+    index.add_record(_record("PMC1", "Aspirin trial"))
+    index.add_sections("PMC1", [{"title": "Methods", "body": "We enrolled smokers."}])
+
+    index.add_record(_record("PMC1", "Ibuprofen trial"))
+    reopened = LocalSearchIndex(index_dir=tmp_path)
+
+    assert reopened.search("aspirin") == []
+    assert [hit["pmcid"] for hit in reopened.search("ibuprofen smokers")] == ["PMC1"]
+    assert len(reopened) == 1
+
+
+def test_body_only_articles_are_not_returned(index):
+    index.add_sections("PMC9", [{"title": "Results", "body": "aspirin"}])
+
+    assert index.search("aspirin") == []
+
+
+def test_delete_removes_article(index):
+    index.add_record(_record("PMC1", "Aspirin trial"))
+
+    index.delete("PMC1")
+
+    assert index.search("aspirin") == []
+    assert len(index) == 0
+
+
+def test_search_respects_limit_and_empty_query(index):
+    index.add_records(_record(f"PMC{i}", f"Aspirin study {i}") for i in range(5))
+
+    assert len(index.search("aspirin", limit=2)) == 2
+    assert index.search("the of and") == []
@@ -0,0 +1,164 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.medlit_agent.pmc_service import metrics
+from src.medlit_agent.pmc_service.metrics import Counter, Histogram, MetricsRegistry
+from src.medlit_agent.pmc_service.pmc_endpoint import PMCEndpoint
+from src.medlit_agent.pmc_service.rate_limiter import NCBIRateLimiter
+from src.medlit_agent.pmc_service.resilience import ResilientCaller
+from src.medlit_agent.pmc_service.xml_cache import ArticleXMLCache
+from src.medlit_agent.pmc_service.xml_to_dict import XMLToDictConverter
+
+
+@pytest.fixture(autouse=True)
+def isolated_pmc_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        PMCEndpoint,
+        "rate_limiter",
+        NCBIRateLimiter(rate=1000.0, db_path=tmp_path / "rate_limit.sqlite3"),
+    )
+    monkeypatch.setattr(
+        PMCEndpoint, "xml_cache", ArticleXMLCache(cache_dir=tmp_path / "xml_cache")
+    )
+    monkeypatch.setattr(
+        PMCEndpoint, "resilience", ResilientCaller(hedge=False, backoff_base=0.0)
+    )
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ("op",), buckets=(0.1, 1))
+    histogram.observe(0.05, op="a")
+    histogram.observe(0.5, op="a")
+    histogram.observe(5, op="a")
+
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{op="a",le="0.1"} 1',
+        'latency_seconds_bucket{op="a",le="1"} 2',
+        'latency_seconds_bucket{op="a",le="+Inf"} 3',
+        'latency_seconds_sum{op="a"} 5.55',
+        'latency_seconds_count{op="a"} 3',
+    ]
+    assert histogram.count(op="a") == 3
+
+
+def test_counter_and_registry_render():
+    registry = MetricsRegistry()
+    counter = registry.counter("hits_total", "Hits.", ("cache",))
+    counter.inc(cache='x"y')
+    counter.inc(2, cache='x"y')
+
+    assert registry.counter("hits_total", "Hits.", ("cache",)) is counter
+    assert registry.render() == (
+        "# HELP hits_total Hits.\n"
+        "# TYPE hits_total counter\n"
+        'hits_total{cache="x\\"y"} 3\n'
+    )
+
+
+def test_wrong_labels_are_rejected():
+    with pytest.raises(ValueError):
+        Counter("c_total", "C.", ("cache",)).inc(other="x")
+
+
+@pytest.mark.asyncio
+async def test_trace_follows_worker_threads():
+    with metrics.trace() as trace:
+        await asyncio.to_thread(metrics.observe_cache, "xml", True)
+        PMCEndpoint.resilience.call(
+            "esearch", lambda: metrics.observe_request("esearch", 0.2, 10)
+        )
+    metrics.observe_cache("xml", False)  # outside the trace
+
+    assert trace.summary() == {
+        "cache": {"count": 1, "seconds": 0.0, "hit": 1},
+        "request": {"count": 1, "seconds": 0.2, "bytes": 10},
+    }
+
+
+def test_retries_are_counted():
+    before = metrics.RETRIES.value(operation="unit-retry")
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("reset")
+        return "ok"
+
+    with metrics.trace() as trace:
+        assert PMCEndpoint.resilience.call("unit-retry", flaky) == "ok"
+
+    assert metrics.RETRIES.value(operation="unit-retry") == before + 1
+    assert trace.summary()["retry"]["count"] == 1
+
+
+@patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+def test_fetch_pmcid_xml_records_cache_request_and_wait(mock_efetch):
+    handle = MagicMock()
+    handle.read.return_value = b"<pmc-articleset><article/></pmc-articleset>"
+    mock_efetch.return_value = handle
+    before = metrics.REQUEST_SECONDS.count(operation="efetch", outcome="ok")
+
+    with metrics.trace() as cold:
+        PMCEndpoint.fetch_pmcid_xml("PMC1")
+    with metrics.trace() as warm:
+        PMCEndpoint.fetch_pmcid_xml("PMC1")
+
+    summary = cold.summary()
+    assert summary["cache"]["miss"] == 1
+    assert summary["request"]["bytes"] == len(handle.read.return_value)
+    assert summary["rate_limit"]["count"] == 1
+    assert warm.summary() == {"cache": {"count": 1, "seconds": 0.0, "hit": 1}}
+    assert metrics.REQUEST_SECONDS.count(operation="efetch", outcome="ok") == (
+        before + 1
+    )
+    assert 'ncbi_cache_lookups_total{cache="xml",result="hit"}' in metrics.render()
+
+
+@patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+def test_failed_request_is_recorded_as_error(mock_efetch):
+    mock_efetch.side_effect = ValueError("bad request")
+
+    with metrics.trace() as trace:
+        with pytest.raises(ValueError):
+            PMCEndpoint.fetch_pmcid_xml("PMC2")
+
+    (request,) = [span for span in trace.spans if span[0] == "request"]
+    assert request[2] == {"operation": "efetch", "outcome": "error"}
+
+
+def test_converter_parse_time_is_recorded():
+    xml = "<article><body><sec><title>Intro</title><p>Text</p></sec></body></article>"
+
+    with metrics.trace() as trace:
+        XMLToDictConverter.convert(xml)
+
+    (parse,) = [span for span in trace.spans if span[0] == "parse"]
+    assert parse[2] == {"parser": "full_text"}
+
+
+def test_metrics_route_is_served_ahead_of_a_catch_all_route():
+    from fastapi import FastAPI
+    from fastapi.responses import HTMLResponse
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+
+    # like Chainlit's single-page app route, registered before ours
+    @app.get("/{full_path:path}")
+    async def spa(full_path: str):
+        return HTMLResponse("<html></html>")
+
+    metrics.add_route(app)
+    metrics.observe_retry("esearch")
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    assert 'ncbi_retries_total{operation="esearch"}' in response.text
+    assert TestClient(app).get("/chat").text == "<html></html>"
@@ -1,10 +1,57 @@
+import asyncio
 import os
-from unittest.mock import MagicMock, patch
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+from urllib.error import URLError
 from xml.etree import ElementTree as ET
 
 import pytest
-
-from src.medlit_agent.pmc_service.pmc_endpoint import PMCEndpoint
+from Bio import Entrez
+
+from src.medlit_agent.pmc_service.article_store import ArticleStore
+from src.medlit_agent.pmc_service.eutils_client import RebasedEntrez
+from src.medlit_agent.pmc_service.local_search import LocalSearchIndex
+from src.medlit_agent.pmc_service.pmc_endpoint import PMCEndpoint, _fromstring
+from src.medlit_agent.pmc_service.rate_limiter import NCBIRateLimiter
+from src.medlit_agent.pmc_service.resilience import ResilientCaller
+from src.medlit_agent.pmc_service.search_cache import SearchResultCache
+from src.medlit_agent.pmc_service.unavailable_cache import FullTextUnavailableCache
+from src.medlit_agent.pmc_service.xml_cache import ArticleXMLCache
+from src.medlit_agent.pmc_service.xml_to_dict import (
+    FullTextUnavailableError,
+    XMLToDictConverter,
+)
+from tests.load.eutils_simulator import EUtilsSimulator, SimulatedCorpus
+
+
+@pytest.fixture(autouse=True)
+def isolated_pmc_state(tmp_path, monkeypatch):
+    """keep unit tests off the host-wide NCBI budget file and caches"""
+    monkeypatch.setattr(
+        PMCEndpoint,
+        "rate_limiter",
+        NCBIRateLimiter(rate=1000.0, db_path=tmp_path / "rate_limit.sqlite3"),
+    )
+    monkeypatch.setattr(
+        PMCEndpoint, "xml_cache", ArticleXMLCache(cache_dir=tmp_path / "xml_cache")
+    )
+    monkeypatch.setattr(
+        PMCEndpoint,
+        "search_cache",
+        SearchResultCache(cache_dir=tmp_path / "search_cache"),
+    )
+    monkeypatch.setattr(PMCEndpoint, "article_store", ArticleStore())
+    monkeypatch.setattr(
+        PMCEndpoint, "resilience", ResilientCaller(hedge=False, backoff_base=0.0)
+    )
+    monkeypatch.setattr(
+        PMCEndpoint, "local_index", LocalSearchIndex(index_dir=tmp_path / "index")
+    )
+    monkeypatch.setattr(
+        PMCEndpoint,
+        "unavailable_cache",
+        FullTextUnavailableCache(cache_dir=tmp_path / "unavailable"),
+    )
 
 
 @pytest.fixture
@@ -140,6 +187,17 @@ class TestFetchPMCIds:
         with pytest.raises(Exception, match="Network error"):
             PMCEndpoint._fetch_pmc_ids("test query")
 
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.esearch")
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.read")
+    def test_fetch_pmc_ids_retries_transient_error(
+        self, mock_read, mock_esearch, mock_env_vars
+    ):
+        mock_esearch.side_effect = [URLError("reset"), MagicMock()]
+        mock_read.return_value = {"IdList": ["1"]}
+
+        assert PMCEndpoint._fetch_pmc_ids("test query") == ["1"]
+        assert mock_esearch.call_count == 2
+
     @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.esearch")
     @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.read")
     def test_fetch_pmc_ids_custom_retmax(self, mock_read, mock_esearch, mock_env_vars):
@@ -154,6 +212,21 @@ class TestFetchPMCIds:
         call_kwargs = mock_esearch.call_args[1]
         assert call_kwargs["retmax"] == 5
 
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.esearch")
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.read")
+    def test_fetch_pmc_ids_reuses_cache_for_rephrased_query(
+        self, mock_read, mock_esearch, mock_env_vars
+    ):
+        mock_esearch.return_value = MagicMock()
+        mock_read.return_value = {"IdList": ["1", "2", "3"]}
+
+        first = PMCEndpoint._fetch_pmc_ids("Smoking and Parkinson's?", retmax=3)
+        second = PMCEndpoint._fetch_pmc_ids("smoking and  parkinson", retmax=2)
+
+        assert first == ["1", "2", "3"]
+        assert second == ["1", "2"]
+        mock_esearch.assert_called_once()
+
 
 class TestParseArticle:
 
@@ -379,6 +452,63 @@ class TestParseArticle:
 
         assert result["abstract"] == ""
 
+    def test_parse_article_same_result_for_lxml_and_etree(self, sample_article_xml):
+        expected = PMCEndpoint._parse_article(ET.fromstring(sample_article_xml), "1")
+
+        result = PMCEndpoint._parse_article(_fromstring(sample_article_xml), "1")
+
+        assert result == expected
+
+    def test_parse_article_only_reads_article_meta(self):
+        xml = """<article>
+            <front>
+                <journal-meta>
+                    <journal-title-group>
+                        <journal-title>Real Journal</journal-title>
+                    </journal-title-group>
+                </journal-meta>
+                <article-meta>
+                    <title-group><article-title>Real Title</article-title></title-group>
+                    <contrib-group>
+                        <contrib contrib-type="editor">
+                            <name><surname>Editor</surname></name>
+                        </contrib>
+                        <contrib contrib-type="author">
+                            <name><surname>Real</surname><given-names>A</given-names></name>
+                        </contrib>
+                    </contrib-group>
+                    <pub-date pub-type="epub"><year>2020</year></pub-date>
+                    <volume>7</volume>
+                    <article-id pub-id-type="doi"></article-id>
+                    <article-id pub-id-type="doi">10.1/real</article-id>
+                </article-meta>
+                <notes><article-title>Not The Title</article-title><volume>99</volume></notes>
+            </front>
+            <back>
+                <ref-list>
+                    <ref><contrib contrib-type="author"><surname>Cited</surname></contrib></ref>
+                </ref-list>
+            </back>
+        </article>"""
+
+        result = PMCEndpoint._parse_article(_fromstring(xml), "1")
+
+        citation = result["apa_citation"]
+        assert citation.startswith("Real, A. (2020). Real Title. Real Journal, 7")
+        assert citation.endswith("https://doi.org/10.1/real")
+        assert "Editor" not in citation and "Cited" not in citation
+
+    def test_parse_article_does_not_expand_entities(self):
+        xml = """<?xml version="1.0"?>
+        <!DOCTYPE article [<!ENTITY secret SYSTEM "file:///etc/passwd">]>
+        <article><front><article-meta>
+            <title-group><article-title>Title &secret;</article-title></title-group>
+        </article-meta></front></article>"""
+
+        result = PMCEndpoint._parse_article(_fromstring(xml), "1")
+
+        assert "root:" not in result["apa_citation"]
+
 
 class TestCleanAbstract:
 
@@ -422,6 +552,14 @@ class TestCleanAbstract:
         for h in headers:
             assert f"{h}:" in cleaned
 
+    def test_clean_abstract_canonicalizes_header_case(self):
+        cleaned = PMCEndpoint._clean_abstract("intro. METHODS: x. impact statement: y")
+
+        assert cleaned == "intro. \n\nMethods: x. \n\nImpact Statement: y"
+
+    def test_clean_abstract_ignores_header_inside_word(self):
+        assert PMCEndpoint._clean_abstract("Preresults: x") == "Preresults: x"
+
     def test_clean_abstract_empty_string(self):
         assert PMCEndpoint._clean_abstract("") == ""
 
@@ -590,6 +728,549 @@ class TestFetchPMCRecords:
             PMCEndpoint.fetch_pmc_records("test")
 
 
+class TestLocalSearch:
+
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    @patch.object(PMCEndpoint, "_fetch_pmc_ids")
+    def test_fetched_records_are_indexed_locally(
+        self, mock_fetch_ids, mock_efetch, mock_env_vars
+    ):
+        mock_fetch_ids.return_value = ["111"]
+        handle = MagicMock()
+        handle.read.return_value = _articleset(
+            _minimal_article("111", "Aspirin Outcomes")
+        )
+        mock_efetch.return_value = handle
+
+        PMCEndpoint.fetch_pmc_records("aspirin", retmax=1, batched=True)
+
+        (hit,) = PMCEndpoint.local_index.search("aspirin outcomes")
+        assert hit["pmcid"] == "PMC111"
+        assert hit["title"] == "Aspirin Outcomes"
+
+    def test_remote_mode_never_answers_locally(self):
+        PMCEndpoint.local_index.add_record(
+            {"pmcid": "PMC1", "title": "Aspirin", "apa_citation": "C", "abstract": ""}
+        )
+
+        assert PMCEndpoint.search_local("aspirin", mode="remote") is None
+
+    def test_local_mode_answers_even_with_few_hits(self):
+        assert PMCEndpoint.search_local("aspirin", retmax=3, mode="local") == []
+
+    def test_hybrid_mode_falls_back_below_recall_threshold(self, monkeypatch):
+        monkeypatch.setattr(PMCEndpoint, "local_min_recall", 0.5)
+        PMCEndpoint.local_index.add_records(
+            {"pmcid": f"PMC{i}", "title": title, "apa_citation": "C", "abstract": ""}
+            for i, title in enumerate(["Aspirin dosing", "Aspirin", "Dosing"])
+        )
+
+        assert (
+            PMCEndpoint.search_local("aspirin dosing", retmax=4, mode="hybrid") is None
+        )
+        hits = PMCEndpoint.search_local("aspirin dosing", retmax=2, mode="hybrid")
+        assert hits[0]["pmcid"] == "PMC0"
+
+    def test_unknown_mode_is_rejected(self):
+        with pytest.raises(ValueError, match="Unknown search mode"):
+            PMCEndpoint.search_local("aspirin", mode="offline")
+
+
+class TestQueryFanOut:
+
+    @patch.object(PMCEndpoint, "_fetch_pmc_records_batched")
+    @patch.object(PMCEndpoint, "_fetch_pmc_ids")
+    def test_alternative_queries_are_fused_before_one_batched_fetch(
+        self, mock_fetch_ids, mock_batched
+    ):
+        rankings = {
+            "aspirin heart attack": ["1", "2", "3"],
+            "aspirin myocardial infarction": ["3", "4"],
+        }
+        mock_fetch_ids.side_effect = lambda query, retmax: rankings[query]
+        mock_batched.return_value = []
+
+        PMCEndpoint.fetch_pmc_records(
+            "aspirin heart attack",
+            retmax=3,
+            alternative_queries=["aspirin myocardial infarction"],
+        )
+
+        assert mock_fetch_ids.call_count == 2
+        mock_batched.assert_called_once_with(["3", "1", "2"])
+
+    def test_search_queries_drops_duplicate_phrasings(self, monkeypatch):
+        monkeypatch.setattr(PMCEndpoint, "query_variants", 1)
+
+        assert PMCEndpoint.search_queries(
+            "heart attack", ["Heart attack", "cardiac arrest"]
+        ) == ["heart attack", "myocardial infarction", "cardiac arrest"]
+
+    @pytest.mark.asyncio
+    @patch.object(PMCEndpoint, "_afetch_record")
+    async def test_async_fan_out_runs_esearch_calls_concurrently(self, mock_record):
+        in_flight = []
+
+        async def esearch(db, term, retmax, sort):
+            in_flight.append(term)
+            await asyncio.sleep(0.01)
+            return {"IdList": ["9"] if term == "a" else ["8", "9"]}
+
+        async def record(pmcid):
+            return {"pmcid": pmcid, "apa_citation": "", "abstract": ""}
+
+        client = MagicMock()
+        client.esearch = AsyncMock(side_effect=esearch)
+        mock_record.side_effect = record
+
+        with patch.object(PMCEndpoint, "async_client", client):
+            records = await PMCEndpoint.afetch_pmc_records(
+                "a", retmax=2, alternative_queries=["b"]
+            )
+
+        assert sorted(in_flight) == ["a", "b"]
+        assert [r["pmcid"] for r in records] == ["9", "8"]
+
+
+def _articleset(*articles):
+    return "<pmc-articleset>" + "".join(articles) + "</pmc-articleset>"
+
+
+def _minimal_article(pmcid, title):
+    return f"""
+    <article>
+        <front>
+            <article-meta>
+                <article-id pub-id-type="pmc">PMC{pmcid}</article-id>
+                <title-group><article-title>{title}</article-title></title-group>
+                <pub-date pub-type="epub"><year>2024</year></pub-date>
+                <abstract><p>{title} abstract.</p></abstract>
+            </article-meta>
+        </front>
+    </article>"""
+
+
+class TestFetchPMCRecordsBatched:
+
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    @patch.object(PMCEndpoint, "_fetch_pmc_ids")
+    def test_batched_uses_single_efetch_and_keeps_relevance_order(
+        self, mock_fetch_ids, mock_efetch, mock_env_vars
+    ):
+        mock_fetch_ids.return_value = ["111", "222", "333"]
+        handle = MagicMock()
+        # efetch returns the set in a different order than esearch ranked it
+        handle.read.return_value = _articleset(
+            _minimal_article("333", "Third"),
+            _minimal_article("111", "First"),
+            _minimal_article("222", "Second"),
+        )
+        mock_efetch.return_value = handle
+
+        records = PMCEndpoint.fetch_pmc_records("query", retmax=3, batched=True)
+
+        assert [r["pmcid"] for r in records] == ["111", "222", "333"]
+        assert "First" in records[0]["apa_citation"]
+        assert records[2]["abstract"] == "Third abstract."
+        mock_efetch.assert_called_once_with(
+            db="pmc", id="111,222,333", rettype="full", retmode="xml"
+        )
+
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    @patch.object(PMCEndpoint, "_fetch_pmc_ids")
+    def test_batched_skips_malformed_article(
+        self, mock_fetch_ids, mock_efetch, mock_env_vars
+    ):
+        mock_fetch_ids.return_value = ["111", "222"]
+        handle = MagicMock()
+        handle.read.return_value = _articleset(
+            "<article><front><article-meta><title-group>"
+            "<article-title>Broken</title-group></article-meta></front></article>",
+            _minimal_article("222", "Second"),
+        )
+        mock_efetch.return_value = handle
+
+        records = PMCEndpoint.fetch_pmc_records("query", retmax=2, batched=True)
+
+        assert [r["pmcid"] for r in records] == ["222"]
+
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    @patch.object(PMCEndpoint, "_parse_article")
+    @patch.object(PMCEndpoint, "_fetch_pmc_ids")
+    def test_batched_continues_when_one_article_fails_to_parse(
+        self, mock_fetch_ids, mock_parse, mock_efetch, mock_env_vars
+    ):
+        mock_fetch_ids.return_value = ["111", "222"]
+        handle = MagicMock()
+        handle.read.return_value = _articleset(
+            _minimal_article("111", "First"), _minimal_article("222", "Second")
+        )
+        mock_efetch.return_value = handle
+        mock_parse.side_effect = [
+            Exception("Parse error"),
+            {"pmcid": "222", "apa_citation": "Citation 2", "abstract": ""},
+        ]
+
+        records = PMCEndpoint.fetch_pmc_records("query", retmax=2, batched=True)
+
+        assert records == [
+            {"pmcid": "222", "apa_citation": "Citation 2", "abstract": ""}
+        ]
+
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    @patch.object(PMCEndpoint, "_fetch_pmc_ids")
+    def test_batched_only_fetches_uncached_articles(
+        self, mock_fetch_ids, mock_efetch, mock_env_vars
+    ):
+        PMCEndpoint.xml_cache.put(
+            "PMC111", _articleset(_minimal_article("111", "First"))
+        )
+        mock_fetch_ids.return_value = ["111", "222"]
+        handle = MagicMock()
+        handle.read.return_value = _articleset(_minimal_article("222", "Second"))
+        mock_efetch.return_value = handle
+
+        records = PMCEndpoint.fetch_pmc_records("query", retmax=2, batched=True)
+
+        assert [r["pmcid"] for r in records] == ["111", "222"]
+        mock_efetch.assert_called_once_with(
+            db="pmc", id="222", rettype="full", retmode="xml"
+        )
+        # the article split out of the batch is cached on its own
+        cached = PMCEndpoint.xml_cache.get("PMC222")
+        assert PMCEndpoint._split_articleset(cached)[0].find(
+            ".//article-title"
+        ).text == ("Second")
+
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    @patch.object(PMCEndpoint, "_fetch_pmc_ids")
+    def test_search_results_leave_xml_in_article_store(
+        self, mock_fetch_ids, mock_efetch, mock_env_vars
+    ):
+        mock_fetch_ids.return_value = ["111", "222"]
+        handle = MagicMock()
+        handle.read.return_value = _articleset(
+            _minimal_article("111", "First"), _minimal_article("222", "Second")
+        )
+        mock_efetch.return_value = handle
+
+        PMCEndpoint.fetch_pmc_records("query", retmax=2, batched=True)
+
+        stored = PMCEndpoint.article_store.get("PMC222")
+        assert stored is not None
+        assert b"Second" in stored
+        assert "PMC111" in PMCEndpoint.article_store
+
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    @patch.object(PMCEndpoint, "_fetch_pmc_ids")
+    def test_batched_no_results_skips_efetch(
+        self, mock_fetch_ids, mock_efetch, mock_env_vars
+    ):
+        mock_fetch_ids.return_value = []
+
+        assert PMCEndpoint.fetch_pmc_records("query", batched=True) == []
+        mock_efetch.assert_not_called()
+
+
+def _chunked_handle(xml, chunk_size=64):
+    data = xml.encode("utf-8") if isinstance(xml, str) else xml
+    chunks = [data[i : i + chunk_size] for i in range(0, len(data), chunk_size)]
+    handle = MagicMock()
+    handle.read.side_effect = chunks + [b""]
+    return handle
+
+
+def _article_with_body(pmcid, title):
+    return _minimal_article(pmcid, title).replace(
+        "</front>",
+        "</front><body><sec><title>Intro</title><p>Body text.</p></sec></body>"
+        "<back><ref-list><ref><mixed-citation>Ref</mixed-citation></ref></ref-list>"
+        "</back>",
+    )
+
+
+class TestFrontOnlyRecords:
+
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    @patch.object(PMCEndpoint, "_fetch_pmc_ids")
+    def test_front_only_matches_full_parse(
+        self, mock_fetch_ids, mock_efetch, mock_env_vars, sample_article_xml
+    ):
+        xml = sample_article_xml.replace(
+            "</front>", "</front><body><p>Long body.</p></body>"
+        )
+        mock_fetch_ids.return_value = ["12345678"]
+        mock_efetch.return_value = _chunked_handle(xml)
+
+        records = PMCEndpoint.fetch_pmc_records("query", retmax=1, front_only=True)
+
+        expected = PMCEndpoint._parse_article(ET.fromstring(xml), "12345678")
+        assert records == [expected]
+
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    @patch.object(PMCEndpoint, "_fetch_pmc_ids")
+    def test_front_only_stops_reading_after_front(
+        self, mock_fetch_ids, mock_efetch, mock_env_vars
+    ):
+        front = _minimal_article("111", "First").split("</front>")[0] + "</front>"
+        handle = MagicMock()
+        # anything after </front> would fail to parse if it were read
+        handle.read.side_effect = [front.encode(), b"<body><<<not xml", b""]
+        mock_efetch.return_value = handle
+        mock_fetch_ids.return_value = ["111"]
+
+        records = PMCEndpoint.fetch_pmc_records("query", retmax=1, front_only=True)
+
+        assert records[0]["abstract"] == "First abstract."
+        assert handle.read.call_count == 1
+        handle.close.assert_called_once()
+
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    @patch.object(PMCEndpoint, "_fetch_pmc_ids")
+    def test_front_only_batched_streams_every_article(
+        self, mock_fetch_ids, mock_efetch, mock_env_vars
+    ):
+        mock_fetch_ids.return_value = ["111", "222"]
+        mock_efetch.return_value = _chunked_handle(
+            _articleset(
+                _article_with_body("222", "Second"), _article_with_body("111", "First")
+            )
+        )
+
+        records = PMCEndpoint.fetch_pmc_records(
+            "query", retmax=2, batched=True, front_only=True
+        )
+
+        assert [r["pmcid"] for r in records] == ["111", "222"]
+        assert "First" in records[0]["apa_citation"]
+        mock_efetch.assert_called_once_with(
+            db="pmc", id="111,222", rettype="full", retmode="xml"
+        )
+
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    @patch.object(PMCEndpoint, "_fetch_pmc_ids")
+    def test_front_only_batched_recovers_from_malformed_article(
+        self, mock_fetch_ids, mock_efetch, mock_env_vars
+    ):
+        mock_fetch_ids.return_value = ["111", "222"]
+        mock_efetch.return_value = _chunked_handle(
+            _articleset(
+                "<article><front><article-meta><title-group>"
+                "<article-title>Broken</title-group></article-meta></front></article>",
+                _article_with_body("222", "Second"),
+            )
+        )
+
+        records = PMCEndpoint.fetch_pmc_records(
+            "query", retmax=2, batched=True, front_only=True
+        )
+
+        assert [r["pmcid"] for r in records] == ["222"]
+
+    def test_iter_article_fronts_discards_body(self):
+        xml = _articleset(_article_with_body("111", "First"))
+
+        (article,) = list(PMCEndpoint._iter_article_fronts([xml]))
+
+        assert [child.tag for child in article] == ["front"]
+        assert article.find(".//article-title").text == "First"
+
+
+def _spy_threads(obj, name, threads):
+    """Patch ``obj.name`` to note the thread id of every call."""
+    method = getattr(obj, name)
+
+    def wrapper(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return method(*args, **kwargs)
+
+    return patch.object(obj, name, wrapper)
+
+
+class TestAsyncFetch:
+
+    @pytest.mark.asyncio
+    async def test_afetch_pmc_records_keeps_order(self, sample_article_xml):
+        client = MagicMock()
+        client.esearch = AsyncMock(return_value={"IdList": ["111", "222"]})
+        client.efetch = AsyncMock(
+            side_effect=[
+                _articleset(_minimal_article("111", "First")).encode(),
+                _articleset(_minimal_article("222", "Second")).encode(),
+            ]
+        )
+
+        with patch.object(PMCEndpoint, "async_client", client):
+            records = await PMCEndpoint.afetch_pmc_records("query", retmax=2)
+
+        assert [r["pmcid"] for r in records] == ["111", "222"]
+        assert "Second" in records[1]["apa_citation"]
+        client.esearch.assert_awaited_once_with(
+            db="pmc", term="query", retmax=2, sort="relevance"
+        )
+        assert client.efetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_afetch_pmc_ids_uses_the_search_cache_off_the_loop(self):
+        client = MagicMock()
+        client.esearch = AsyncMock(return_value={"IdList": ["111"]})
+        threads = []
+
+        with (
+            patch.object(PMCEndpoint, "async_client", client),
+            _spy_threads(PMCEndpoint.search_cache, "get", threads),
+            _spy_threads(PMCEndpoint.search_cache, "put", threads),
+        ):
+            assert await PMCEndpoint._afetch_pmc_ids("aspirin", 1) == ["111"]
+            assert await PMCEndpoint._afetch_pmc_ids("aspirin", 1) == ["111"]
+
+        assert len(threads) == 3
+        assert threading.get_ident() not in threads
+        client.esearch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_afetch_pmc_records_no_results(self):
+        client = MagicMock()
+        client.esearch = AsyncMock(return_value={"IdList": []})
+        client.efetch = AsyncMock()
+
+        with patch.object(PMCEndpoint, "async_client", client):
+            assert await PMCEndpoint.afetch_pmc_records("nothing") == []
+
+        client.efetch.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_afetch_pmcid_xml_decodes_bytes(self):
+        client = MagicMock()
+        client.efetch = AsyncMock(return_value=b"<article>Full XML</article>")
+
+        with patch.object(PMCEndpoint, "async_client", client):
+            result = await PMCEndpoint.afetch_pmcid_xml("PMC123")
+
+        assert result == "<article>Full XML</article>"
+        client.efetch.assert_awaited_once_with(
+            db="pmc", ids="PMC123", rettype="full", retmode="xml"
+        )
+
+    @pytest.mark.asyncio
+    async def test_afetch_pmcid_xml_bytes_returns_the_response_body(self):
+        body = b"<article>Full XML</article>"
+        client = MagicMock()
+        client.efetch = AsyncMock(return_value=body)
+
+        with patch.object(PMCEndpoint, "async_client", client):
+            assert await PMCEndpoint.afetch_pmcid_xml_bytes("PMC123") is body
+
+    @pytest.mark.asyncio
+    async def test_afetch_pmcid_xml_bytes_uses_the_xml_cache_off_the_loop(self):
+        client = MagicMock()
+        client.efetch = AsyncMock(return_value=b"<article>Full XML</article>")
+        threads = []
+
+        with (
+            patch.object(PMCEndpoint, "async_client", client),
+            _spy_threads(PMCEndpoint.xml_cache, "get", threads),
+            _spy_threads(PMCEndpoint.xml_cache, "put", threads),
+        ):
+            await PMCEndpoint.afetch_pmcid_xml_bytes("PMC123")  # miss, then put
+            await PMCEndpoint.afetch_pmcid_xml_bytes("PMC123")  # hit
+
+        assert len(threads) == 3
+        assert threading.get_ident() not in threads
+        client.efetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_afetch_pmc_records_indexes_off_the_loop(self):
+        client = MagicMock()
+        client.esearch = AsyncMock(return_value={"IdList": ["111"]})
+        client.efetch = AsyncMock(
+            return_value=_articleset(_minimal_article("111", "First")).encode()
+        )
+        threads = []
+
+        with (
+            patch.object(PMCEndpoint, "async_client", client),
+            _spy_threads(PMCEndpoint, "index_records", threads),
+        ):
+            await PMCEndpoint.afetch_pmc_records("query", retmax=1)
+            async for _ in PMCEndpoint.astream_pmc_records("query", retmax=1):
+                pass
+
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
+
+    @pytest.mark.asyncio
+    async def test_astream_pmc_records_yields_in_completion_order(self):
+        delays = {"1": 0.5, "2": 0.0}
+
+        async def efetch(db, ids, rettype, retmode):
+            await asyncio.sleep(delays[ids])
+            return _articleset(_minimal_article(ids, f"Title {ids}")).encode()
+
+        client = MagicMock()
+        client.esearch = AsyncMock(return_value={"IdList": ["1", "2"]})
+        client.efetch = AsyncMock(side_effect=efetch)
+
+        with patch.object(PMCEndpoint, "async_client", client):
+            results = [
+                (rank, record["pmcid"])
+                async for rank, record in PMCEndpoint.astream_pmc_records("q", 2)
+            ]
+
+        assert results == [(1, "2"), (0, "1")]
+        assert len(PMCEndpoint.local_index) == 2
+
+    @pytest.mark.asyncio
+    async def test_closing_astream_pmc_records_stops_early(self):
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def efetch(db, ids, rettype, retmode):
+            if ids == "2":
+                started.set()
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return _articleset(_minimal_article(ids, f"Title {ids}")).encode()
+
+        client = MagicMock()
+        client.esearch = AsyncMock(return_value={"IdList": ["1", "2"]})
+        client.efetch = AsyncMock(side_effect=efetch)
+
+        with patch.object(PMCEndpoint, "async_client", client):
+            stream = PMCEndpoint.astream_pmc_records("q", 2)
+            rank, record = await anext(stream)
+            await asyncio.wait_for(started.wait(), timeout=1)
+            await stream.aclose()
+            # nobody else waits for the second article, so its download stops
+            await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+        assert (rank, record["pmcid"]) == (0, "1")
+        assert len(PMCEndpoint.local_index) == 1
+        assert PMCEndpoint.xml_cache.get("PMC2") is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_afetch_pmcid_xml_shares_one_efetch(self):
+        async def slow_efetch(**kwargs):
+            await asyncio.sleep(0.01)
+            return b"<article>Full XML</article>"
+
+        client = MagicMock()
+        client.efetch = AsyncMock(side_effect=slow_efetch)
+
+        with patch.object(PMCEndpoint, "async_client", client):
+            results = await asyncio.gather(
+                PMCEndpoint.afetch_pmcid_xml("PMC123"),
+                PMCEndpoint.afetch_pmcid_xml("123"),
+                PMCEndpoint.afetch_pmcid_xml("PMC123"),
+            )
+
+        assert results == ["<article>Full XML</article>"] * 3
+        client.efetch.assert_awaited_once()
+
+
 class TestFetchPmcidXml:
 
     @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
@@ -606,6 +1287,40 @@ class TestFetchPmcidXml:
             db="pmc", id="PMC123", rettype="full", retmode="xml"
         )
 
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    def test_fetch_pmcid_xml_is_served_from_cache(self, mock_efetch, mock_env_vars):
+        full_handle = MagicMock()
+        full_handle.read.return_value = b"<article>Full XML</article>"
+        mock_efetch.return_value = full_handle
+
+        first = PMCEndpoint.fetch_pmcid_xml("PMC123")
+        # digits-only IDs from esearch share the same cache entry
+        second = PMCEndpoint.fetch_pmcid_xml("123")
+
+        assert first == second == "<article>Full XML</article>"
+        mock_efetch.assert_called_once()
+        assert PMCEndpoint.xml_cache.stats()["hits"] == 1
+
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    def test_fetch_pmcid_xml_bytes_keeps_the_declared_encoding(
+        self, mock_efetch, mock_env_vars
+    ):
+        xml = (
+            '<?xml version="1.0" encoding="ISO-8859-1"?>'
+            "<article><body><sec><title>Résumé</title><p>Über</p></sec></body>"
+            "</article>"
+        ).encode("latin-1")
+        handle = MagicMock()
+        handle.read.return_value = xml
+        mock_efetch.return_value = handle
+
+        data = PMCEndpoint.fetch_pmcid_xml_bytes("PMC123")
+
+        assert data == xml
+        assert PMCEndpoint.fetch_pmcid_xml_bytes("123") == xml  # from the cache
+        assert XMLToDictConverter.convert(data) == [{"title": "Résumé", "body": "Über"}]
+        mock_efetch.assert_called_once()
+
     @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
     def test_fetch_pmcid_xml_raises_when_full_fetch_fails(
         self, mock_efetch, mock_env_vars
@@ -622,3 +1337,126 @@ class TestFetchPmcidXml:
             "rettype": "full",
             "retmode": "xml",
         }
+
+
+_NOT_OA = b"""<?xml version="1.0"?>
+<OA><responseDate>2026-01-01 00:00:00</responseDate>
+<request id="PMC404">https://www.ncbi.nlm.nih.gov/pmc/utils/oa/oa.fcgi?id=PMC404</request>
+<error code="idIsNotOpenAccess">identifier 'PMC404' is not Open Access</error>
+</OA>"""
+
+_IS_OA = b"""<?xml version="1.0"?>
+<OA><records returned-count="1" total-count="1">
+<record id="PMC123" citation="..." license="CC BY"><link format="tgz" href="x"/></record>
+</records></OA>"""
+
+
+class TestOpenAccessPrecheck:
+
+    @pytest.fixture(autouse=True)
+    def enable_precheck(self, monkeypatch):
+        monkeypatch.setattr(PMCEndpoint, "oa_precheck", True)
+
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.urlopen")
+    def test_non_oa_article_is_rejected_without_download(
+        self, mock_urlopen, mock_efetch
+    ):
+        mock_urlopen.return_value.__enter__.return_value.read.return_value = _NOT_OA
+
+        with pytest.raises(FullTextUnavailableError, match="cannot extract full text"):
+            PMCEndpoint.fetch_pmcid_xml("404")
+
+        mock_efetch.assert_not_called()
+        assert "PMC404" in mock_urlopen.call_args.args[0]
+        with pytest.raises(FullTextUnavailableError):
+            PMCEndpoint.raise_if_unavailable("PMC404")
+
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.Entrez.efetch")
+    @patch("src.medlit_agent.pmc_service.pmc_endpoint.urlopen")
+    def test_oa_article_and_failed_checks_fall_through_to_efetch(
+        self, mock_urlopen, mock_efetch
+    ):
+        mock_efetch.return_value.read.return_value = "<article/>"
+        mock_urlopen.return_value.__enter__.return_value.read.return_value = _IS_OA
+        assert PMCEndpoint.fetch_pmcid_xml("PMC123") == "<article/>"
+
+        mock_urlopen.side_effect = URLError("down")
+        assert PMCEndpoint.fetch_pmcid_xml("PMC124") == "<article/>"
+        assert mock_efetch.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_async_precheck_rejects_non_oa_article(self):
+        client = MagicMock()
+        client.oa_record = AsyncMock(return_value=_NOT_OA)
+        client.efetch = AsyncMock()
+
+        with patch.object(PMCEndpoint, "async_client", client):
+            with pytest.raises(FullTextUnavailableError):
+                await PMCEndpoint.afetch_pmcid_xml("PMC404")
+
+        client.oa_record.assert_awaited_once_with("PMC404")
+        client.efetch.assert_not_awaited()
+
+
+class TestHistoryPaging:
+
+    @pytest.fixture
+    def simulator(self, monkeypatch):
+        corpus = SimulatedCorpus(
+            {
+                str(i): _minimal_article(str(i), f"Aspirin trial {i}").encode()
+                for i in range(1, 8)
+            }
+        )
+        # Entrez spaces requests 0.1s apart with an API key instead of 0.33s
+        monkeypatch.setattr(Entrez, "api_key", "test")
+        monkeypatch.setattr(Entrez, "email", "test@example.com")
+        with EUtilsSimulator(corpus) as sim:
+            monkeypatch.setattr(PMCEndpoint, "endpoint", RebasedEntrez(sim.base_url))
+            yield sim
+
+    def test_iter_pmc_ids_pages_through_the_stored_result(self, simulator):
+        ids = list(PMCEndpoint.iter_pmc_ids("aspirin", page_size=3))
+
+        assert ids == [str(i) for i in range(1, 8)]
+        # one esearch stores the result, then three pages of three IDs at most
+        assert simulator.stats["requests.esearch"] == 4
+
+    def test_iter_pmc_ids_keeps_relevance_order_on_every_page(self, simulator):
+        with patch.object(
+            PMCEndpoint, "_read_esearch", wraps=PMCEndpoint._read_esearch
+        ) as read_esearch:
+            list(PMCEndpoint.iter_pmc_ids("aspirin", page_size=3))
+
+        assert read_esearch.call_count == 4
+        sorts = [c.kwargs["sort"] for c in read_esearch.call_args_list]
+        assert sorts == ["relevance"] * 4
+
+    def test_iter_pmc_ids_stops_at_max_results(self, simulator):
+        ids = PMCEndpoint.iter_pmc_ids("aspirin", max_results=4, page_size=3)
+
+        assert list(ids) == ["1", "2", "3", "4"]
+
+    def test_iter_pmc_records_fetches_pages_and_indexes_them(self, simulator):
+        records = list(PMCEndpoint.iter_pmc_records("aspirin", page_size=5))
+
+        assert [r["pmcid"] for r in records] == [str(i) for i in range(1, 8)]
+        assert "Aspirin trial 1" in records[0]["apa_citation"]
+        assert simulator.stats["requests.efetch"] == 2
+        hits = PMCEndpoint.local_index.search("aspirin trial 7", limit=1)
+        assert hits[0]["pmcid"] == "PMC7"
+        # a bulk run leaves the interactive XML cache alone
+        assert PMCEndpoint.xml_cache.get("PMC7") is None
+
+    def test_iter_pmc_records_can_warm_the_xml_cache(self, simulator):
+        list(PMCEndpoint.iter_pmc_records("aspirin", page_size=5, cache_xml=True))
+
+        assert PMCEndpoint.xml_cache.get("PMC7") is not None
+
+    def test_iter_pmc_records_is_lazy(self, simulator):
+        records = PMCEndpoint.iter_pmc_records("aspirin", page_size=2)
+
+        assert next(records)["pmcid"] == "1"
+        assert simulator.stats["requests.efetch"] == 1
+        records.close()
@@ -0,0 +1,167 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.medlit_agent.pmc_service.prefetcher import FullTextPrefetcher, PMCEndpoint
+from src.medlit_agent.pmc_service.resilience import CircuitBreaker, ResilientCaller
+from src.medlit_agent.pmc_service.single_flight import SingleFlight
+
+
+class FakeRetriever:
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.started = []
+        self.finished = []
+        self.active = 0
+        self.max_active = 0
+
+    async def aingest(self, pmcid):
+        self.started.append(pmcid)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error is not None:
+                raise self.error
+            self.finished.append(pmcid)
+            return True
+        finally:
+            self.active -= 1
+
+
+class SingleFlightRetriever(FakeRetriever):
+    """Coalesces ingests like ``FullTextRetriever.aingest``."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.flight = SingleFlight()
+
+    async def aingest(self, pmcid):
+        return await self.flight.ado(
+            ("ingest", pmcid), lambda: FakeRetriever.aingest(self, pmcid)
+        )
+
+
+@pytest.fixture(autouse=True)
+def healthy_ncbi(monkeypatch):
+    monkeypatch.setattr(PMCEndpoint, "resilience", ResilientCaller())
+
+
+@pytest.mark.asyncio
+async def test_prefetches_top_k_canonical_ids():
+    retriever = FakeRetriever()
+    prefetcher = FullTextPrefetcher(retriever=retriever, top_k=2)
+
+    tasks = prefetcher.schedule(["111", "PMC222", "333"])
+    await asyncio.gather(*tasks)
+
+    assert retriever.finished == ["PMC111", "PMC222"]
+    assert not prefetcher.is_pending("PMC111")
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    retriever = FakeRetriever(delay=0.01)
+    prefetcher = FullTextPrefetcher(retriever=retriever, top_k=5, max_concurrency=2)
+
+    await asyncio.gather(*prefetcher.schedule(["1", "2", "3", "4", "5"]))
+
+    assert len(retriever.finished) == 5
+    assert retriever.max_active == 2
+
+
+@pytest.mark.asyncio
+async def test_new_search_cancels_superseded_prefetches():
+    retriever = FakeRetriever(delay=10)
+    prefetcher = FullTextPrefetcher(retriever=retriever, top_k=2, max_concurrency=2)
+
+    first = prefetcher.schedule(["1", "2"])
+    await asyncio.sleep(0)
+    second = prefetcher.schedule(["2", "3"])
+    await asyncio.gather(first[0], return_exceptions=True)
+
+    assert first[0].cancelled()
+    assert second[0] is first[1]
+    assert prefetcher.is_pending("PMC3")
+    prefetcher.cancel()
+    assert not prefetcher.is_pending("PMC2")
+
+
+@pytest.mark.asyncio
+async def test_cancelled_prefetch_stops_its_ingest():
+    retriever = SingleFlightRetriever(delay=10)
+    prefetcher = FullTextPrefetcher(retriever=retriever, top_k=1, max_concurrency=1)
+
+    tasks = prefetcher.schedule(["1"])
+    await asyncio.sleep(0.01)
+    assert retriever.active == 1
+
+    prefetcher.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    # the slot is free again and nothing keeps downloading behind it
+    assert retriever.active == 0
+    assert retriever.flight.in_flight(("ingest", "PMC1")) == 0
+
+
+@pytest.mark.asyncio
+async def test_wait_for_returns_after_inflight_prefetch():
+    retriever = FakeRetriever(delay=0.01)
+    prefetcher = FullTextPrefetcher(retriever=retriever, top_k=1)
+
+    prefetcher.schedule(["PMC7"])
+    await prefetcher.wait_for("7")
+
+    assert retriever.finished == ["PMC7"]
+    await prefetcher.wait_for("PMC404")  # nothing in flight
+
+
+@pytest.mark.asyncio
+async def test_wait_for_tolerates_cancelled_prefetch():
+    prefetcher = FullTextPrefetcher(retriever=FakeRetriever(delay=10), top_k=1)
+    prefetcher.schedule(["PMC7"])
+    task = prefetcher._tasks["PMC7"]
+
+    waiter = asyncio.create_task(prefetcher.wait_for("PMC7"))
+    await asyncio.sleep(0)
+    task.cancel()
+
+    await asyncio.wait_for(waiter, timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_prefetch_errors_are_swallowed():
+    retriever = FakeRetriever(error=RuntimeError("efetch failed"))
+    prefetcher = FullTextPrefetcher(retriever=retriever, top_k=1)
+
+    results = await asyncio.gather(*prefetcher.schedule(["PMC1"]))
+
+    assert results == [False]
+
+
+@pytest.mark.asyncio
+async def test_skips_prefetch_while_circuit_is_open(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    monkeypatch.setattr(PMCEndpoint, "resilience", ResilientCaller(breaker=breaker))
+    retriever = FakeRetriever()
+    prefetcher = FullTextPrefetcher(retriever=retriever, top_k=1)
+
+    await asyncio.gather(*prefetcher.schedule(["PMC1"]))
+
+    assert retriever.started == []
+
+
+def test_prefetching_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("PMC_PREFETCH_TOP_K", raising=False)
+
+    assert FullTextPrefetcher(retriever=MagicMock()).top_k == 0
+
+
+def test_top_k_from_env(monkeypatch):
+    monkeypatch.setenv("PMC_PREFETCH_TOP_K", "3")
+
+    assert FullTextPrefetcher(retriever=MagicMock()).top_k == 3
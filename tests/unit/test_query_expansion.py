@@ -0,0 +1,45 @@
+from src.medlit_agent.pmc_service.query_expansion import (
+    expand_query,
+    reciprocal_rank_fusion,
+)
+
+
+def test_expand_query_adds_synonym_and_mesh_variants():
+    assert expand_query("heart attack aspirin") == [
+        "heart attack aspirin",
+        "myocardial infarction aspirin",
+        '"myocardial infarction"[MeSH Terms] AND "aspirin"[MeSH Terms]',
+    ]
+
+
+def test_expand_query_keeps_unrecognised_terms_in_mesh_variant():
+    assert expand_query("does aspirin prevent migraine")[-1] == (
+        '"aspirin"[MeSH Terms] AND prevent AND migraine'
+    )
+
+
+def test_expand_query_does_not_rewrite_clinical_terms():
+    assert expand_query("diabetes mellitus") == [
+        "diabetes mellitus",
+        '"diabetes mellitus"[MeSH Terms]',
+    ]
+
+
+def test_expand_query_respects_max_variants_and_entrez_syntax():
+    assert expand_query("heart attack", max_variants=1) == [
+        "heart attack",
+        "myocardial infarction",
+    ]
+    assert expand_query("heart attack", max_variants=0) == ["heart attack"]
+    assert expand_query("cancer[Title]") == ["cancer[Title]"]
+    assert expand_query("quantum computing") == ["quantum computing"]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"], ["c", "b"]])
+
+    assert fused == ["b", "c", "a", "d"]
+
+
+def test_reciprocal_rank_fusion_breaks_ties_by_first_seen_and_limits():
+    assert reciprocal_rank_fusion([["a", "b"], ["b", "a"]], limit=1) == ["a"]
@@ -0,0 +1,100 @@
+import pytest
+
+from src.medlit_agent.pmc_service.rate_limiter import (
+    ANONYMOUS_RATE,
+    API_KEY_RATE,
+    NCBIRateLimiter,
+    RateLimitExceeded,
+)
+
+
+def _limiter(tmp_path, clock, **kwargs):
+    kwargs.setdefault("rate", 2.0)
+    kwargs.setdefault("burst", 1)
+    return NCBIRateLimiter(
+        db_path=tmp_path / "limits.sqlite3",
+        clock=clock,
+        sleep=clock.sleep,
+        **kwargs,
+    )
+
+
+def test_requests_queue_in_order_at_configured_rate(tmp_path, fake_clock):
+    limiter = _limiter(tmp_path, fake_clock)
+
+    waits = [limiter.acquire() for _ in range(3)]
+
+    assert waits == pytest.approx([0.0, 0.5, 1.0])
+    assert fake_clock.sleeps == pytest.approx([0.5, 1.0])
+
+
+def test_burst_allows_immediate_requests(tmp_path, fake_clock):
+    limiter = _limiter(tmp_path, fake_clock, rate=3.0, burst=3)
+
+    waits = [limiter.acquire() for _ in range(4)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] == pytest.approx(1 / 3)
+
+
+def test_default_burst_keeps_requests_within_one_second_quota(tmp_path, fake_clock):
+    limiter = NCBIRateLimiter(
+        rate=3.0,
+        db_path=tmp_path / "limits.sqlite3",
+        clock=fake_clock,
+        sleep=fake_clock.sleep,
+    )
+
+    waits = [limiter.acquire() for _ in range(4)]
+
+    # the fourth request may only start a full second after the first
+    assert waits == pytest.approx([0.0, 1 / 3, 2 / 3, 1.0])
+
+
+def test_budget_is_shared_between_limiter_instances(tmp_path, fake_clock):
+    first = _limiter(tmp_path, fake_clock)
+    second = _limiter(tmp_path, fake_clock)
+
+    assert first.acquire() == 0.0
+    assert second.acquire() == pytest.approx(0.5)
+
+
+def test_tokens_refill_over_time(tmp_path, fake_clock):
+    limiter = _limiter(tmp_path, fake_clock)
+
+    limiter.acquire()
+    fake_clock.now += 5
+    assert limiter.acquire() == 0.0
+
+
+def test_rejects_when_wait_exceeds_max_wait_and_counts_it(tmp_path, fake_clock):
+    limiter = _limiter(tmp_path, fake_clock, max_wait=0.6)
+
+    limiter.acquire()
+    limiter.acquire()
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire()
+
+    stats = limiter.stats()
+    assert stats["acquired"] == 2
+    assert stats["rejected"] == 1
+    assert stats["wait_seconds_total"] == pytest.approx(0.5)
+    assert stats["wait_seconds_max"] == pytest.approx(0.5)
+
+
+@pytest.mark.asyncio
+async def test_aacquire_reserves_from_the_same_bucket(tmp_path, fake_clock):
+    limiter = _limiter(tmp_path, fake_clock, rate=1000.0)
+
+    assert await limiter.aacquire() == 0.0
+    assert limiter.stats()["acquired"] == 1
+
+
+def test_for_api_key_picks_ncbi_quota(tmp_path, monkeypatch):
+    monkeypatch.delenv("NCBI_RATE_LIMIT_RPS", raising=False)
+
+    with_key = NCBIRateLimiter.for_api_key("key", db_path=tmp_path / "a.sqlite3")
+    without_key = NCBIRateLimiter.for_api_key(None, db_path=tmp_path / "b.sqlite3")
+
+    assert with_key.rate == API_KEY_RATE
+    assert without_key.rate == ANONYMOUS_RATE
@@ -0,0 +1,282 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+from urllib.error import HTTPError, URLError
+
+import httpx
+import pytest
+
+from src.medlit_agent.pmc_service.rate_limiter import RateLimitExceeded
+from src.medlit_agent.pmc_service.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    ResilientCaller,
+    is_retryable,
+)
+
+
+def _caller(**kwargs):
+    kwargs.setdefault("deadline", 5.0)
+    kwargs.setdefault("backoff_base", 0.0)
+    kwargs.setdefault("hedge", False)
+    return ResilientCaller(**kwargs)
+
+
+def _status_error(code):
+    request = httpx.Request("GET", "https://eutils.example/efetch.fcgi")
+    return httpx.HTTPStatusError(
+        "error", request=request, response=httpx.Response(code, request=request)
+    )
+
+
+@pytest.mark.parametrize(
+    "exc, expected",
+    [
+        (URLError("reset"), True),
+        (HTTPError("u", 503, "busy", None, None), True),
+        (HTTPError("u", 400, "bad", None, None), False),
+        (_status_error(429), True),
+        (_status_error(404), False),
+        (httpx.ConnectError("refused"), True),
+        (TimeoutError(), True),
+        (RateLimitExceeded("budget"), False),
+        (ValueError("bad xml"), False),
+    ],
+)
+def test_is_retryable(exc, expected):
+    assert is_retryable(exc) is expected
+
+
+def test_retries_transient_failures_until_success():
+    fn = MagicMock(side_effect=[URLError("reset"), URLError("reset"), "ok"])
+
+    assert _caller().call("efetch", fn) == "ok"
+    assert fn.call_count == 3
+
+
+def test_non_retryable_error_is_raised_immediately():
+    fn = MagicMock(side_effect=ValueError("bad request"))
+
+    with pytest.raises(ValueError):
+        _caller().call("efetch", fn)
+    assert fn.call_count == 1
+
+
+def test_gives_up_after_max_attempts():
+    fn = MagicMock(side_effect=URLError("down"))
+
+    with pytest.raises(URLError):
+        _caller(max_attempts=2).call("efetch", fn)
+    assert fn.call_count == 2
+
+
+def test_backoff_is_jittered_and_capped():
+    caller = _caller(backoff_base=1.0, backoff_cap=4.0)
+
+    delays = [caller.backoff(attempt) for attempt in range(6) for _ in range(50)]
+
+    assert all(0.0 <= d <= 4.0 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_deadline_bounds_a_stuck_call():
+    release = threading.Event()
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        _caller(deadline=0.2).call("efetch", lambda: release.wait(5))
+    release.set()
+
+    assert time.monotonic() - start < 1.0
+
+
+def test_slow_call_is_hedged_and_loser_discarded():
+    calls = []
+    release = threading.Event()
+    discarded = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+            return "slow"
+        return "fast"
+
+    caller = _caller(hedge=True, hedge_delay=0.05)
+    assert caller.call("efetch", fn, discard=discarded.append) == "fast"
+    release.set()
+
+    deadline = time.monotonic() + 2
+    while not discarded and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(calls) == 2
+    assert discarded == ["slow"]
+
+
+def test_rate_limit_wait_is_neither_hedged_nor_recorded_as_latency():
+    acquired = []
+    calls = []
+
+    def acquire():
+        acquired.append(1)
+        time.sleep(0.2)  # queued behind other callers
+
+    def fn():
+        calls.append(1)
+        time.sleep(0.01)
+        return "ok"
+
+    caller = _caller(hedge=True, hedge_delay=0.05)
+    assert caller.call("efetch", fn, acquire=acquire) == "ok"
+
+    assert (len(acquired), len(calls)) == (1, 1)
+    assert caller.latency._samples["efetch"][0] < 0.1
+
+
+def test_hedge_acquires_its_own_token():
+    acquired = []
+    calls = []
+    release = threading.Event()
+
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+        return len(calls)
+
+    caller = _caller(hedge=True, hedge_delay=0.05)
+    assert caller.call("efetch", fn, acquire=lambda: acquired.append(1)) == 2
+    release.set()
+
+    assert len(acquired) == 2
+
+
+def test_hedge_delay_follows_observed_p95():
+    caller = _caller(hedge_delay=2.0, min_hedge_delay=0.1)
+    assert caller.hedge_after("efetch") == 2.0
+
+    for ms in range(1, 101):
+        caller.latency.record("efetch", ms / 100)
+
+    assert caller.hedge_after("efetch") == pytest.approx(0.96)
+
+
+def test_latency_tracker_needs_min_samples():
+    tracker = LatencyTracker(min_samples=3)
+    tracker.record("esearch", 1.0)
+
+    assert tracker.percentile("esearch", 0.95) is None
+
+
+def test_breaker_opens_after_threshold_and_fails_fast(fake_clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=fake_clock)
+    caller = _caller(max_attempts=1, breaker=breaker)
+    fn = MagicMock(side_effect=URLError("down"))
+
+    for _ in range(2):
+        with pytest.raises(URLError):
+            caller.call("esearch", fn)
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        caller.call("esearch", fn)
+    assert fn.call_count == 2
+
+
+def test_breaker_half_open_probe_closes_on_success(fake_clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=fake_clock)
+    breaker.record_failure()
+
+    fake_clock.now += 31
+    assert breaker.state == "half-open"
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe at a time
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_breaker_failed_probe_reopens(fake_clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=fake_clock)
+    for _ in range(3):
+        breaker.record_failure()
+
+    fake_clock.now += 31
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+
+
+def test_non_retryable_answer_counts_as_healthy(fake_clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=fake_clock)
+    breaker.record_failure()
+    fake_clock.now += 31
+
+    with pytest.raises(ValueError):
+        _caller(breaker=breaker).call("efetch", MagicMock(side_effect=ValueError()))
+
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_acall_retries_then_succeeds():
+    fn = MagicMock(side_effect=[_status_error(503), "ok"])
+
+    async def call():
+        return fn()
+
+    assert await _caller().acall("esearch", call) == "ok"
+    assert fn.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_acall_hedges_and_cancels_loser():
+    started = []
+    cancelled = asyncio.Event()
+
+    async def call():
+        started.append(1)
+        if len(started) == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return len(started)
+
+    result = await _caller(hedge=True, hedge_delay=0.05).acall("efetch", call)
+
+    assert result == 2
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_acall_does_not_hedge_while_waiting_for_a_token():
+    calls = []
+
+    async def acquire():
+        await asyncio.sleep(0.2)
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    caller = _caller(hedge=True, hedge_delay=0.05)
+    assert await caller.acall("efetch", call, acquire=acquire) == "ok"
+
+    assert len(calls) == 1
+    assert caller.latency._samples["efetch"][0] < 0.1
+
+
+@pytest.mark.asyncio
+async def test_acall_deadline():
+    async def call():
+        await asyncio.sleep(5)
+
+    with pytest.raises(TimeoutError):
+        await _caller(deadline=0.1).acall("efetch", call)
@@ -0,0 +1,187 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.medlit_agent.pmc_service.embedded_articles import EmbeddedArticleList
+from src.medlit_agent.pmc_service.resilience import ResilientCaller
+from src.medlit_agent.pmc_service.revalidation import (
+    ArticleRevalidator,
+    PMCEndpoint,
+    revision_token,
+)
+from src.medlit_agent.pmc_service.xml_cache import ArticleXMLCache
+
+
+def _summary(uid, title="Title", version="1"):
+    return {
+        "uid": uid,
+        "title": title,
+        "pmcrefcount": version,  # not a revision field
+        "articleids": [{"idtype": "pmcid", "value": f"PMC{uid}"}],
+    }
+
+
+def _no_retriever(self):
+    raise AssertionError("FullTextRetriever should not be built")
+
+
+@pytest.fixture(autouse=True)
+def healthy_ncbi(monkeypatch):
+    monkeypatch.setattr(
+        PMCEndpoint, "resilience", ResilientCaller(hedge=False, backoff_base=0.0)
+    )
+
+
+@pytest.fixture(autouse=True)
+def cached_articles(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        PMCEndpoint, "xml_cache", ArticleXMLCache(cache_dir=tmp_path / "xml_cache")
+    )
+    articles = EmbeddedArticleList(cache_dir=tmp_path / "embedded")
+    monkeypatch.setattr(PMCEndpoint, "embedded_articles", articles)
+    return articles
+
+
+@pytest.fixture
+def retriever():
+    retriever = MagicMock()
+    retriever.aingest = AsyncMock(return_value=True)
+    return retriever
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = MagicMock()
+    client.esummary = AsyncMock()
+    monkeypatch.setattr(PMCEndpoint, "async_client", client)
+    return client
+
+
+@pytest.fixture
+def refresh(monkeypatch):
+    refresh = AsyncMock()
+    monkeypatch.setattr(PMCEndpoint, "arefresh_article", refresh)
+    return refresh
+
+
+def test_revision_token_ignores_bookkeeping_fields():
+    assert revision_token(_summary("1", version="3")) == revision_token(
+        _summary("1", version="4")
+    )
+    assert revision_token(_summary("1")) != revision_token(
+        _summary("1", title="Corrected title")
+    )
+
+
+@pytest.mark.asyncio
+async def test_only_changed_articles_are_refreshed(
+    tmp_path, retriever, client, refresh
+):
+    revalidator = ArticleRevalidator(retriever=retriever, state_dir=tmp_path)
+    client.esummary.return_value = {"1": _summary("1"), "2": _summary("2")}
+
+    first = await revalidator.arevalidate(["PMC1", "2"])
+    assert first["new"] == ["PMC1", "PMC2"]
+    refresh.assert_not_awaited()
+
+    client.esummary.return_value = {
+        "1": _summary("1"),
+        "2": _summary("2", title="Corrected title"),
+    }
+    second = await revalidator.arevalidate(["PMC1", "PMC2"])
+
+    assert second["unchanged"] == ["PMC1"]
+    assert second["changed"] == ["PMC2"]
+    refresh.assert_awaited_once_with("PMC2")
+    client.esummary.assert_awaited_with(ids=["1", "2"])
+
+    third = await revalidator.arevalidate(["PMC1", "PMC2"])
+    assert third["unchanged"] == ["PMC1", "PMC2"]
+
+
+@pytest.mark.asyncio
+async def test_esummary_calls_are_batched(tmp_path, retriever, client, refresh):
+    revalidator = ArticleRevalidator(
+        retriever=retriever, state_dir=tmp_path, batch_size=2
+    )
+    client.esummary.return_value = {}
+
+    report = await revalidator.arevalidate([f"PMC{i}" for i in range(5)])
+
+    assert [c.kwargs["ids"] for c in client.esummary.await_args_list] == [
+        ["0", "1"],
+        ["2", "3"],
+        ["4"],
+    ]
+    assert len(report["missing"]) == 5
+
+
+@pytest.mark.asyncio
+async def test_changed_full_text_is_reembedded(
+    tmp_path, cached_articles, retriever, client, refresh
+):
+    revalidator = ArticleRevalidator(retriever=retriever, state_dir=tmp_path)
+    revalidator._save_tokens({"PMC7": "old"})
+    cached_articles.add("PMC7")
+    client.esummary.return_value = {"7": _summary("7")}
+
+    report = await revalidator.arevalidate(["PMC7"])
+
+    assert report["changed"] == ["PMC7"]
+    retriever.db.delete.assert_called_once_with("PMC7")
+    retriever.aingest.assert_awaited_once_with("PMC7")
+
+
+@pytest.mark.asyncio
+async def test_changed_article_outside_chroma_is_not_reembedded(
+    tmp_path, client, refresh, monkeypatch
+):
+    monkeypatch.setattr(ArticleRevalidator, "retriever", property(_no_retriever))
+    revalidator = ArticleRevalidator(state_dir=tmp_path)
+    revalidator._save_tokens({"PMC7": "old"})
+    client.esummary.return_value = {"7": _summary("7")}
+
+    report = await revalidator.arevalidate(["PMC7"])
+
+    assert report["changed"] == ["PMC7"]
+    refresh.assert_awaited_once_with("PMC7")
+
+
+def test_cached_pmcids_reads_the_lists_without_chroma(
+    tmp_path, cached_articles, monkeypatch
+):
+    monkeypatch.setattr(ArticleRevalidator, "retriever", property(_no_retriever))
+    PMCEndpoint.xml_cache.put("PMC2", b"<article/>")
+    cached_articles.add_many(["PMC1", "PMC2"])
+
+    assert ArticleRevalidator(state_dir=tmp_path).cached_pmcids() == ["PMC1", "PMC2"]
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_is_retried_next_pass(
+    tmp_path, retriever, client, refresh
+):
+    revalidator = ArticleRevalidator(retriever=retriever, state_dir=tmp_path)
+    revalidator._save_tokens({"PMC7": "old"})
+    client.esummary.return_value = {"7": _summary("7")}
+    refresh.side_effect = [RuntimeError("efetch failed"), None]
+
+    assert (await revalidator.arevalidate(["PMC7"]))["failed"] == ["PMC7"]
+    assert (await revalidator.arevalidate(["PMC7"]))["changed"] == ["PMC7"]
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_stops_the_pass(tmp_path, retriever, client, monkeypatch):
+    caller = ResilientCaller(hedge=False)
+    caller.breaker = MagicMock(state="open")
+    monkeypatch.setattr(PMCEndpoint, "resilience", caller)
+
+    revalidator = ArticleRevalidator(retriever=retriever, state_dir=tmp_path)
+    report = await revalidator.arevalidate(["PMC1"])
+
+    client.esummary.assert_not_awaited()
+    assert not any(report.values())
+
+
+def test_start_is_disabled_by_default(tmp_path):
+    assert ArticleRevalidator(state_dir=tmp_path, interval_seconds=0).start() is None
@@ -0,0 +1,78 @@
+from src.medlit_agent.pmc_service.search_cache import (
+    SearchResultCache,
+    normalize_query,
+)
+
+
+def test_normalize_query_collapses_case_and_punctuation():
+    assert normalize_query("Does smoking prevent Parkinson's?") == (
+        "does smoking prevent parkinson"
+    )
+    assert normalize_query("  does SMOKING,   prevent parkinson ") == (
+        "does smoking prevent parkinson"
+    )
+
+
+def test_normalize_query_keeps_term_order_and_repeats():
+    assert normalize_query("heart failure") != normalize_query("failure heart")
+    assert normalize_query("cancer cancer screening") == "cancer cancer screening"
+
+
+def test_normalize_query_can_drop_stop_words():
+    assert normalize_query("the heart") == "the heart"
+    assert normalize_query("the heart", drop_stop_words=True) == "heart"
+    # a query made only of stop words keeps them rather than becoming empty
+    assert normalize_query("what is it", drop_stop_words=True) == "what is it"
+
+
+def test_normalize_query_never_drops_single_letters():
+    assert normalize_query("vitamin a and the eye", drop_stop_words=True) == (
+        "vitamin a eye"
+    )
+
+
+def test_normalize_query_leaves_entrez_syntax_order_alone():
+    assert normalize_query("cancer  NOT lung") == "cancer not lung"
+    assert normalize_query("lung NOT cancer") == "lung not cancer"
+    assert normalize_query('"heart attack"[Title]') == '"heart attack"[title]'
+
+
+def test_cached_entry_answers_smaller_retmax(make_cache):
+    cache = make_cache(SearchResultCache)
+    cache.put("aspirin", 5, ["1", "2", "3", "4", "5"])
+
+    assert cache.get("Aspirin?", 3) == ["1", "2", "3"]
+    assert cache.get("aspirin", 10) is None
+
+
+def test_exhausted_result_answers_any_retmax(make_cache):
+    cache = make_cache(SearchResultCache)
+    cache.put("rare disease", 5, ["1", "2"])
+
+    assert cache.get("rare disease", 20) == ["1", "2"]
+
+
+def test_smaller_result_does_not_replace_fresh_larger_entry(make_cache):
+    cache = make_cache(SearchResultCache)
+    cache.put("aspirin", 5, ["1", "2", "3", "4", "5"])
+    cache.put("aspirin", 2, ["9", "8"])
+
+    assert cache.get("aspirin", 5) == ["1", "2", "3", "4", "5"]
+
+
+def test_entries_expire_after_ttl(make_cache, fake_clock):
+    cache = make_cache(SearchResultCache, ttl_seconds=60)
+    cache.put("aspirin", 5, ["1"])
+
+    fake_clock.now += 61
+    assert cache.get("aspirin", 5) is None
+
+    cache.put("aspirin", 2, ["7", "8"])
+    assert cache.get("aspirin", 2) == ["7", "8"]
+
+
+def test_sort_order_is_part_of_the_key(make_cache):
+    cache = make_cache(SearchResultCache)
+    cache.put("aspirin", 2, ["1", "2"], sort="relevance")
+
+    assert cache.get("aspirin", 2, sort="pub_date") is None
@@ -0,0 +1,98 @@
+import functools
+from unittest.mock import patch
+
+import pytest
+
+from src.medlit_agent.pmc_service import metrics
+from src.medlit_agent.pmc_service.sections_cache import ConvertedSectionsCache
+from src.medlit_agent.pmc_service.xml_to_dict import XMLToDictConverter
+
+_XML = (
+    b"<article><body><sec><title>Results</title><p>It works.</p></sec></body></article>"
+)
+_SECTIONS = [{"title": "Results", "body": "It works."}]
+
+
+@pytest.fixture
+def make_sections_cache(make_cache):
+    return functools.partial(make_cache, ConvertedSectionsCache, max_bytes=1024 * 1024)
+
+
+@pytest.fixture
+def enabled_cache(make_sections_cache, monkeypatch):
+    cache = make_sections_cache("sections")
+    monkeypatch.setattr(XMLToDictConverter, "sections_cache", cache)
+    return cache
+
+
+def test_put_get_round_trip(make_sections_cache):
+    cache = make_sections_cache()
+    sections = [{"title": "Résumé", "body": "Ünïcode\n\ntext"}]
+
+    assert cache.get("k") is None
+    cache.put("k", sections)
+
+    assert cache.get("k") == sections
+    assert cache.stats()["entries"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_over_budget(
+    make_sections_cache, fake_clock
+):
+    probe = make_sections_cache("probe")
+    probe.put("a", _SECTIONS)
+    entry_size = probe.stats()["stored_bytes"]
+    cache = make_sections_cache("lru", max_bytes=entry_size * 2 + 1)
+
+    cache.put("a", _SECTIONS)
+    fake_clock.now += 1
+    cache.put("b", _SECTIONS)
+    fake_clock.now += 1
+    cache.get("a")  # b is now least recently used
+    fake_clock.now += 1
+    cache.put("c", _SECTIONS)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == cache.get("c") == _SECTIONS
+
+
+def test_zero_budget_disables_cache(make_sections_cache, tmp_path):
+    cache = make_sections_cache("disabled", max_bytes=0)
+
+    cache.put("k", _SECTIONS)
+
+    assert cache.get("k") is None
+    assert not (tmp_path / "disabled").exists()
+
+
+def test_convert_skips_parsing_for_known_xml(enabled_cache):
+    assert XMLToDictConverter.convert(_XML) == _SECTIONS
+
+    with patch.object(
+        XMLToDictConverter, "_parse_xml", side_effect=AssertionError("parsed")
+    ):
+        with metrics.trace() as trace:
+            assert XMLToDictConverter.convert(_XML) == _SECTIONS
+            assert XMLToDictConverter.convert(_XML.decode()) == _SECTIONS
+
+    assert trace.summary() == {"cache": {"count": 2, "seconds": 0.0, "hit": 2}}
+    assert enabled_cache.stats()["entries"] == 1
+
+
+def test_cache_key_covers_content_version_and_skip_sections(monkeypatch):
+    key = XMLToDictConverter.cache_key(_XML)
+
+    assert XMLToDictConverter.cache_key(_XML + b" ") != key
+    monkeypatch.setattr(XMLToDictConverter, "version", XMLToDictConverter.version + 1)
+    assert XMLToDictConverter.cache_key(_XML) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(XMLToDictConverter, "skip_sections", {"results"})
+    assert XMLToDictConverter.cache_key(_XML) != key
+
+
+def test_skipped_sections_config_is_not_served_stale(enabled_cache, monkeypatch):
+    assert XMLToDictConverter.convert(_XML) == _SECTIONS
+
+    monkeypatch.setattr(XMLToDictConverter, "skip_sections", {"results"})
+
+    assert XMLToDictConverter.convert(_XML) == [{"title": "Body", "body": "It works."}]
@@ -0,0 +1,199 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.medlit_agent.pmc_service.single_flight import SingleFlight
+
+
+def test_do_shares_one_call_between_threads():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return ["PMC1"]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(flight.do, "key", work)
+        started.wait(5)
+        followers = [pool.submit(flight.do, "key", work) for _ in range(3)]
+        time.sleep(0.05)  # let followers queue up behind the leader
+        release.set()
+        results = [leader.result(5)] + [f.result(5) for f in followers]
+
+    assert calls == [1]
+    assert all(result == ["PMC1"] for result in results)
+    assert flight.in_flight("key") == 0
+
+
+def test_do_shares_errors_and_forgets_key():
+    flight = SingleFlight()
+
+    def boom():
+        raise RuntimeError("efetch failed")
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", boom)
+
+    assert flight.do("key", lambda: "fresh") == "fresh"
+
+
+@pytest.mark.asyncio
+async def test_ado_coalesces_concurrent_coroutines():
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "xml"
+
+    results = await asyncio.gather(*(flight.ado("key", work) for _ in range(5)))
+
+    assert calls == 1
+    assert results == ["xml"] * 5
+    assert flight.in_flight("key") == 0
+
+
+@pytest.mark.asyncio
+async def test_ado_propagates_errors_to_every_caller():
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0)
+        raise ValueError("bad id")
+
+    results = await asyncio.gather(
+        flight.ado("key", boom), flight.ado("key", boom), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    first = asyncio.ensure_future(flight.ado("key", work))
+    second = asyncio.ensure_future(flight.ado("key", work))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_once_every_caller_is_cancelled():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def work():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    first = asyncio.ensure_future(flight.ado("key", work))
+    second = asyncio.ensure_future(flight.ado("key", work))
+    await started.wait()
+
+    first.cancel()
+    await asyncio.sleep(0)
+    assert not cancelled.is_set()
+
+    second.cancel()
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    await asyncio.sleep(0)
+    assert flight.in_flight("key") == 0
+
+
+@pytest.mark.asyncio
+async def test_caller_arriving_after_cancellation_starts_a_new_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0 if len(calls) > 1 else 10)
+        return len(calls)
+
+    first = asyncio.ensure_future(flight.ado("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    # the abandoned task may not have finished cancelling yet
+    assert await flight.ado("key", work) == 2
+
+
+@pytest.mark.asyncio
+async def test_blocking_caller_joins_async_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    calls = []
+
+    async def work():
+        calls.append("async")
+        await release.wait()
+        return "xml"
+
+    leader = asyncio.ensure_future(flight.ado("key", work))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(
+        asyncio.to_thread(flight.do, "key", lambda: calls.append("sync"))
+    )
+    await asyncio.sleep(0.05)
+    release.set()
+
+    assert await leader == "xml"
+    assert await follower == "xml"
+    assert calls == ["async"]
+
+
+@pytest.mark.asyncio
+async def test_async_caller_joins_blocking_call():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append("sync")
+        started.set()
+        release.wait(5)
+        return "xml"
+
+    async def other():
+        calls.append("async")
+
+    leader = asyncio.ensure_future(asyncio.to_thread(flight.do, "key", work))
+    await asyncio.to_thread(started.wait, 5)
+    follower = asyncio.ensure_future(flight.ado("key", other))
+    await asyncio.sleep(0.05)
+    release.set()
+
+    assert await leader == "xml"
+    assert await follower == "xml"
+    assert calls == ["sync"]
+    assert flight.in_flight("key") == 0
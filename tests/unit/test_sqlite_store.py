@@ -0,0 +1,64 @@
+import pytest
+
+from src.medlit_agent.pmc_service.sqlite_store import SQLiteStore
+
+
+class _Store(SQLiteStore):
+    schema = (
+        "CREATE TABLE IF NOT EXISTS items ("
+        " key TEXT PRIMARY KEY,"
+        " stored_size INTEGER NOT NULL,"
+        " accessed_at REAL NOT NULL)",
+    )
+
+
+def _keys(store):
+    with store._connection() as conn:
+        return [key for (key,) in conn.execute("SELECT key FROM items ORDER BY key")]
+
+
+def test_schema_is_created_under_a_new_directory(tmp_path):
+    store = _Store(tmp_path / "nested" / "store.sqlite3")
+
+    assert _keys(store) == []
+    assert store.db_path.exists()
+
+
+def test_transaction_rolls_back_when_the_body_raises(tmp_path):
+    store = _Store(tmp_path / "store.sqlite3")
+
+    with pytest.raises(RuntimeError):
+        with store._transaction() as conn:
+            conn.execute("INSERT INTO items VALUES ('a', 1, 0)")
+            raise RuntimeError("write failed")
+
+    assert _keys(store) == []
+
+
+def test_evict_lru_drops_oldest_rows_until_within_budget(tmp_path):
+    store = _Store(tmp_path / "store.sqlite3")
+
+    with store._transaction() as conn:
+        conn.executemany(
+            "INSERT INTO items VALUES (?, ?, ?)",
+            [("old", 10, 1.0), ("mid", 10, 2.0), ("new", 10, 3.0)],
+        )
+        evicted = store._evict_lru(conn, "items", "key", max_bytes=15)
+
+    assert evicted == 2
+    assert _keys(store) == ["new"]
+
+
+def test_wal_stores_use_write_ahead_logging(tmp_path):
+    class _WALStore(_Store):
+        wal = True
+
+    store = _WALStore(tmp_path / "store.sqlite3")
+
+    with store._connection() as conn:
+        (journal_mode,) = conn.execute("PRAGMA journal_mode").fetchone()
+        (synchronous,) = conn.execute("PRAGMA synchronous").fetchone()
+    assert journal_mode == "wal"
+    assert synchronous == 1  # NORMAL
+    with _Store(tmp_path / "plain.sqlite3")._connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("delete",)
@@ -1,8 +1,11 @@
-from unittest.mock import patch
+import threading
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from src.medlit_agent.pmc_service.resilience import CircuitOpenError
 from src.medlit_agent.tools.tools import (
+    astream_search_pubmed_central,
     retrieve_full_text,
     search_pubmed_central,
     tools,
@@ -37,7 +40,9 @@ class TestSearchPubmedCentral:
         )
         assert result[0]["abstract"] == "This is a test abstract."
         assert result[1]["pmcid"] == "67890"
-        mock_fetch.assert_called_once_with("test query", retmax=2)
+        mock_fetch.assert_called_once_with(
+            "test query", retmax=2, alternative_queries=None
+        )
 
     @patch("src.medlit_agent.tools.tools.PMCEndpoint.fetch_pmc_records")
     def test_search_pubmed_central_default_max_results(self, mock_fetch):
@@ -45,7 +50,7 @@ class TestSearchPubmedCentral:
 
         search_pubmed_central.invoke({"query": "test"})
 
-        mock_fetch.assert_called_once_with("test", retmax=5)
+        mock_fetch.assert_called_once_with("test", retmax=5, alternative_queries=None)
 
     @patch("src.medlit_agent.tools.tools.PMCEndpoint.fetch_pmc_records")
     def test_search_pubmed_central_empty_results(self, mock_fetch):
@@ -70,7 +75,7 @@ class TestSearchPubmedCentral:
         result = search_pubmed_central.invoke({"query": "test", "max_results": 5})
 
         assert len(result) == 5
-        mock_fetch.assert_called_once_with("test", retmax=5)
+        mock_fetch.assert_called_once_with("test", retmax=5, alternative_queries=None)
 
     @patch("src.medlit_agent.tools.tools.PMCEndpoint.fetch_pmc_records")
     def test_search_pubmed_central_error_handling(self, mock_fetch):
@@ -81,6 +86,14 @@ class TestSearchPubmedCentral:
         ):
             search_pubmed_central.invoke({"query": "test"})
 
+    @pytest.mark.parametrize("error", [TimeoutError("slow"), CircuitOpenError("open")])
+    @patch("src.medlit_agent.tools.tools.PMCEndpoint.fetch_pmc_records")
+    def test_search_pubmed_central_reraises_ncbi_unavailable(self, mock_fetch, error):
+        mock_fetch.side_effect = error
+
+        with pytest.raises(type(error)):
+            search_pubmed_central.invoke({"query": "test"})
+
     @patch("src.medlit_agent.tools.tools.PMCEndpoint.fetch_pmc_records")
     def test_search_pubmed_central_malformed_response(self, mock_fetch):
         mock_fetch.return_value = [
@@ -98,6 +111,34 @@ class TestSearchPubmedCentral:
         assert "citation" in result[0]
         assert "abstract" in result[0]
 
+    @patch("src.medlit_agent.tools.tools.PMCEndpoint.fetch_pmc_records")
+    @patch("src.medlit_agent.tools.tools.PMCEndpoint.search_local")
+    def test_search_pubmed_central_answers_from_local_index(
+        self, mock_search_local, mock_fetch
+    ):
+        mock_search_local.return_value = [
+            {
+                "pmcid": "PMC1",
+                "title": "Local",
+                "apa_citation": "Local citation",
+                "abstract": "Local abstract",
+                "score": 3.2,
+                "matched_terms": 1.0,
+            }
+        ]
+
+        result = search_pubmed_central.invoke({"query": "test", "max_results": 1})
+
+        assert result == [
+            {
+                "pmcid": "PMC1",
+                "citation": "Local citation",
+                "abstract": "Local abstract",
+            }
+        ]
+        mock_search_local.assert_called_once_with("test", retmax=1)
+        mock_fetch.assert_not_called()
+
     def test_search_pubmed_central_tool_metadata(self):
         assert search_pubmed_central.name == "search_pubmed_central"
         assert "PubMed Central" in search_pubmed_central.description
@@ -120,6 +161,109 @@ class TestSearchPubmedCentral:
         assert set(result[0].keys()) == {"pmcid", "citation", "abstract"}
 
 
+class TestAsyncTools:
+
+    @pytest.mark.asyncio
+    @patch(
+        "src.medlit_agent.tools.tools.PMCEndpoint.afetch_pmc_records",
+        new_callable=AsyncMock,
+    )
+    async def test_search_pubmed_central_ainvoke_awaits_async_endpoint(
+        self, mock_afetch
+    ):
+        mock_afetch.return_value = [
+            {"pmcid": "1", "apa_citation": "Citation", "abstract": "Abstract"}
+        ]
+
+        result = await search_pubmed_central.ainvoke(
+            {"query": "test", "max_results": 1}
+        )
+
+        assert result == [
+            {"pmcid": "1", "citation": "Citation", "abstract": "Abstract"}
+        ]
+        mock_afetch.assert_awaited_once_with("test", retmax=1, alternative_queries=None)
+
+    @pytest.mark.asyncio
+    @patch(
+        "src.medlit_agent.tools.tools.PMCEndpoint.afetch_pmc_records",
+        new_callable=AsyncMock,
+    )
+    async def test_search_pubmed_central_ainvoke_wraps_errors(self, mock_afetch):
+        mock_afetch.side_effect = Exception("API Error")
+
+        with pytest.raises(Exception, match="Error searching PubMed Central"):
+            await search_pubmed_central.ainvoke({"query": "test"})
+
+    @pytest.mark.asyncio
+    @patch(
+        "src.medlit_agent.tools.tools.PMCEndpoint.afetch_pmc_records",
+        new_callable=AsyncMock,
+    )
+    async def test_search_pubmed_central_ainvoke_reraises_circuit_open(
+        self, mock_afetch
+    ):
+        mock_afetch.side_effect = CircuitOpenError("open")
+
+        with pytest.raises(CircuitOpenError):
+            await search_pubmed_central.ainvoke({"query": "test"})
+
+    @pytest.mark.asyncio
+    @patch("src.medlit_agent.tools.tools.FullTextRetriever")
+    async def test_retrieve_full_text_ainvoke_uses_async_retriever(
+        self, mock_retriever_cls
+    ):
+        mock_retriever = mock_retriever_cls.return_value
+        mock_retriever.aretrieve_full_text = AsyncMock(
+            return_value=[{"title": "Methods", "body": "text"}]
+        )
+
+        result = await retrieve_full_text.ainvoke({"pmcid": "PMC1"})
+
+        assert result == [{"title": "Methods", "body": "text"}]
+        mock_retriever.aretrieve_full_text.assert_awaited_once_with("PMC1")
+
+    @pytest.mark.asyncio
+    @patch("src.medlit_agent.tools.tools.PMCEndpoint.astream_pmc_records")
+    async def test_astream_search_yields_ranked_documents(self, mock_stream):
+        async def records(query, retmax, alternative_queries):
+            yield 1, {"pmcid": "PMC2", "apa_citation": "B", "abstract": "b"}
+            yield 0, {"pmcid": "PMC1", "apa_citation": "A", "abstract": "a"}
+
+        mock_stream.side_effect = records
+
+        results = [item async for item in astream_search_pubmed_central("aspirin", 2)]
+
+        assert results == [
+            (1, {"pmcid": "PMC2", "citation": "B", "abstract": "b"}),
+            (0, {"pmcid": "PMC1", "citation": "A", "abstract": "a"}),
+        ]
+        mock_stream.assert_called_once_with(
+            "aspirin", retmax=2, alternative_queries=None
+        )
+
+    @pytest.mark.asyncio
+    @patch("src.medlit_agent.tools.tools.PMCEndpoint.search_local")
+    async def test_async_search_tools_query_local_index_off_the_loop(
+        self, mock_search_local
+    ):
+        threads = []
+
+        def search_local(query, retmax):
+            threads.append(threading.get_ident())
+            return [{"pmcid": "PMC1", "apa_citation": "A", "abstract": "a"}]
+
+        mock_search_local.side_effect = search_local
+
+        result = await search_pubmed_central.ainvoke({"query": "aspirin"})
+        streamed = [item async for item in astream_search_pubmed_central("aspirin")]
+
+        assert result == [{"pmcid": "PMC1", "citation": "A", "abstract": "a"}]
+        assert streamed == [(0, result[0])]
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
+
+
 class TestToolsExport:
     def test_tools_list_contains_search_pubmed_central(self):
         assert search_pubmed_central in tools
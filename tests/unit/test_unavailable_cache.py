@@ -0,0 +1,30 @@
+from src.medlit_agent.pmc_service.unavailable_cache import FullTextUnavailableCache
+
+
+def test_put_then_get_returns_reason(tmp_path):
+    cache = FullTextUnavailableCache(cache_dir=tmp_path)
+
+    cache.put("PMC1", "no body")
+
+    assert cache.get("PMC1") == "no body"
+    assert cache.get("PMC2") is None
+
+
+def test_entries_expire_after_ttl(make_cache, fake_clock):
+    cache = make_cache(FullTextUnavailableCache, ttl_seconds=60)
+    cache.put("PMC1", "no body")
+
+    fake_clock.now += 61
+
+    assert cache.get("PMC1") is None
+
+
+def test_delete_and_disabled_cache(tmp_path):
+    cache = FullTextUnavailableCache(cache_dir=tmp_path)
+    cache.put("PMC1", "no body")
+    cache.delete("PMC1")
+    assert cache.get("PMC1") is None
+
+    disabled = FullTextUnavailableCache(cache_dir=tmp_path / "off", ttl_seconds=0)
+    disabled.put("PMC1", "no body")
+    assert disabled.get("PMC1") is None
@@ -0,0 +1,116 @@
+import functools
+import gzip
+
+import pytest
+
+from src.medlit_agent.pmc_service.xml_cache import ArticleXMLCache
+
+
+@pytest.fixture
+def make_xml_cache(make_cache):
+    return functools.partial(
+        make_cache, ArticleXMLCache, max_bytes=1024 * 1024, ttl_seconds=3600
+    )
+
+
+def test_put_get_round_trip_is_compressed(make_xml_cache):
+    cache = make_xml_cache()
+    xml = "<article>" + "repeated text " * 500 + "</article>"
+
+    cache.put("PMC1", xml)
+
+    assert cache.get("PMC1") == xml.encode("utf-8")
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["raw_bytes"] == len(xml)
+    assert stats["stored_bytes"] < stats["raw_bytes"]
+
+
+def test_miss_and_hit_counters(make_xml_cache):
+    cache = make_xml_cache()
+
+    assert cache.get("PMC1") is None
+    cache.put("PMC1", b"<article/>")
+    cache.get("PMC1")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_entries_expire_after_ttl(make_xml_cache, fake_clock):
+    cache = make_xml_cache(ttl_seconds=60)
+    cache.put("PMC1", b"<article/>")
+
+    fake_clock.now += 61
+
+    assert cache.get("PMC1") is None
+    stats = cache.stats()
+    assert stats["expired"] == 1
+    assert stats["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted_over_budget(
+    make_xml_cache, fake_clock
+):
+    entry_size = len(gzip.compress(b"<article>PMC1</article>", compresslevel=6))
+    cache = make_xml_cache(max_bytes=entry_size * 2 + 1)
+
+    cache.put("PMC1", b"<article>PMC1</article>")
+    fake_clock.now += 1
+    cache.put("PMC2", b"<article>PMC2</article>")
+    fake_clock.now += 1
+    cache.get("PMC1")  # PMC2 is now least recently used
+    fake_clock.now += 1
+    cache.put("PMC3", b"<article>PMC3</article>")
+
+    assert cache.get("PMC2") is None
+    assert cache.get("PMC1") is not None
+    assert cache.get("PMC3") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_zero_budget_disables_cache(make_xml_cache, tmp_path):
+    cache = make_xml_cache("disabled", max_bytes=0)
+
+    cache.put("PMC1", b"<article/>")
+
+    assert cache.get("PMC1") is None
+    assert not (tmp_path / "disabled").exists()
+
+
+def test_delete_removes_entry(make_xml_cache):
+    cache = make_xml_cache()
+    cache.put("PMC1", b"<article/>")
+
+    cache.delete("PMC1")
+
+    assert cache.get("PMC1") is None
+
+
+def test_pmcids_lists_cached_articles(make_xml_cache):
+    cache = make_xml_cache()
+    cache.put("PMC2", "<article/>")
+    cache.put("PMC1", "<article/>")
+
+    assert cache.pmcids() == ["PMC1", "PMC2"]
+
+
+def test_hits_are_written_in_batches(make_xml_cache, fake_clock):
+    cache = make_xml_cache(flush_every=3)
+    other_process = make_xml_cache()
+    cache.put("PMC1", b"<article/>")
+    fake_clock.now += 5
+
+    cache.get("PMC1")
+    cache.get("PMC2")
+    assert other_process.stats()["hits"] == 0
+
+    cache.get("PMC1")
+
+    stats = other_process.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    with cache._connection() as conn:
+        assert conn.execute("SELECT accessed_at FROM articles").fetchone() == (
+            fake_clock.now,
+        )
@@ -1,9 +1,15 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
 from lxml import etree as ET
 
-from src.medlit_agent.pmc_service.xml_to_dict import XMLToDictConverter
+from src.medlit_agent.pmc_service.xml_to_dict import (
+    ConversionResult,
+    FullTextUnavailableError,
+    XMLToDictConverter,
+)
 
 
 def _find_project_root(start: Path) -> Path:
@@ -115,6 +121,51 @@ def test_convert_falls_back_to_body_paragraphs_without_sections():
     ]
 
 
+def test_convert_assigns_paragraphs_to_nearest_section_in_document_order():
+    xml = """
+    <article>
+      <body>
+        <sec>
+          <title>Methods</title>
+          <sec>
+            <title>Cohort</title>
+            <p>Cohort paragraph.</p>
+          </sec>
+          <p>Methods paragraph after a subsection.</p>
+          <boxed-text>
+            <p>Boxed methods paragraph.</p>
+            <sec><title>Box Section</title><p>Inside the box.</p></sec>
+          </boxed-text>
+          <p>Outer <list><list-item><p>inner item</p></list-item></list></p>
+        </sec>
+        <sec>
+          <title>Funding</title>
+          <p>Skipped funding paragraph.</p>
+          <sec><title>Grant Details</title><p>Kept grant paragraph.</p></sec>
+        </sec>
+        <sec>
+          <title>Empty</title>
+          <sec><title>Child</title><p>Only the child has text.</p></sec>
+        </sec>
+      </body>
+    </article>
+    """
+
+    sections = XMLToDictConverter.convert(xml)
+
+    assert sections == [
+        {
+            "title": "Methods",
+            "body": "Methods paragraph after a subsection.\n\n"
+            "Boxed methods paragraph.\n\nOuter inner item\n\ninner item",
+        },
+        {"title": "Cohort", "body": "Cohort paragraph."},
+        {"title": "Box Section", "body": "Inside the box."},
+        {"title": "Grant Details", "body": "Kept grant paragraph."},
+        {"title": "Child", "body": "Only the child has text."},
+    ]
+
+
 def test_find_project_root_prefers_marker_and_falls_back_to_start(tmp_path: Path):
     repo_root = tmp_path / "repo"
     nested = repo_root / "a" / "b"
@@ -126,3 +177,163 @@ def test_find_project_root_prefers_marker_and_falls_back_to_start(tmp_path: Path
     orphan = tmp_path / "orphan"
     orphan.mkdir()
     assert _find_project_root(orphan) == orphan
+
+
+_NESTED_XML = """
+<article xmlns="urn:test">
+  <front><abstract><p>Abstract is not full text.</p></abstract></front>
+  <body>
+    <sec>
+      <title>Methods</title>
+      <sec><title>Cohort</title><p>Cohort <bold>paragraph</bold>.</p></sec>
+      <p>Outer <list><list-item><p>inner item</p></list-item></list></p>
+    </sec>
+    <sec><title>References</title><p>Skipped.</p></sec>
+    <sec><p>Untitled section paragraph.</p></sec>
+    <sec><title>Results</title><p>Results paragraph.</p></sec>
+  </body>
+  <back><ref-list><ref><mixed-citation>Ref.</mixed-citation></ref></ref-list></back>
+</article>
+"""
+
+
+@pytest.mark.parametrize(
+    "xml",
+    [
+        _NESTED_XML,
+        "<article><body><p>One.</p><sec><p>Two.</p></sec></body></article>",
+        "<article><body><sec><title>Empty</title></sec></body></article>",
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [7, 64 * 1024])
+def test_iter_sections_matches_convert(xml, chunk_size):
+    streamed = list(XMLToDictConverter.iter_sections(xml, chunk_size=chunk_size))
+
+    assert streamed == XMLToDictConverter.convert(xml)
+
+
+def test_iter_sections_survives_many_small_chunk_sizes():
+    expected = XMLToDictConverter.convert(_NESTED_XML)
+
+    for _ in range(200):
+        for chunk_size in range(1, 32):
+            streamed = XMLToDictConverter.iter_sections(
+                _NESTED_XML, chunk_size=chunk_size
+            )
+            assert list(streamed) == expected
+
+
+def test_iter_sections_reads_paths_and_binary_files(tmp_path):
+    path = tmp_path / "article.xml"
+    path.write_text(_NESTED_XML, encoding="utf-8")
+    expected = XMLToDictConverter.convert(_NESTED_XML)
+
+    assert XMLToDictConverter.convert_stream(path) == expected
+    with open(path, "rb") as handle:
+        assert XMLToDictConverter.convert_stream(handle) == expected
+    assert XMLToDictConverter.convert_stream(io.BytesIO(path.read_bytes())) == (
+        expected
+    )
+
+
+def test_iter_sections_yields_each_top_level_section_once_it_closes():
+    read = []
+
+    def chunks():
+        for chunk in (
+            b"<article><body><sec><title>First</title><p>One.</p></sec>",
+            b"<sec><title>Second</title><p>Two.</p></sec>",
+            b"</body></article>",
+        ):
+            read.append(chunk)
+            yield chunk
+
+    sections = XMLToDictConverter.iter_sections(chunks())
+
+    assert next(sections) == {"title": "First", "body": "One."}
+    assert len(read) == 1
+    assert next(sections) == {"title": "Second", "body": "Two."}
+    assert list(sections) == []
+
+
+def test_iter_sections_prunes_supplementary_material():
+    xml = (
+        "<article><body><sec><title>Results</title><p>Kept.</p>"
+        "<supplementary-material><caption><p>Table S1.</p></caption>"
+        "</supplementary-material></sec></body></article>"
+    )
+
+    assert XMLToDictConverter.convert_stream(xml) == [
+        {"title": "Results", "body": "Kept."}
+    ]
+
+
+def test_iter_sections_handles_trees_too_deep_for_convert():
+    depth = 300
+    xml = (
+        "<article><body><sec><title>Deep</title><p>"
+        + "<italic>" * depth
+        + "text"
+        + "</italic>" * depth
+        + "</p></sec></body></article>"
+    )
+
+    with pytest.raises(ValueError, match="Invalid XML content"):
+        XMLToDictConverter.convert(xml)
+    assert XMLToDictConverter.convert_stream(xml) == [{"title": "Deep", "body": "text"}]
+
+
+def test_iter_sections_errors_match_convert():
+    with pytest.raises(ValueError, match="Invalid XML content"):
+        XMLToDictConverter.convert_stream("<article><body>")
+    with pytest.raises(FullTextUnavailableError, match="No <body> element found"):
+        XMLToDictConverter.convert_stream("<article><front/></article>")
+
+
+_MANY = [
+    b"<article><body><sec><title>A</title><p>First.</p></sec></body></article>",
+    b"<article><body",
+    "<article><front/></article>",
+    b"<article><body><p>Plain body.</p></body></article>",
+]
+
+
+def _check_many(results):
+    assert [r.index for r in results] == [0, 1, 2, 3]
+    assert results[0] == ConversionResult(0, [{"title": "A", "body": "First."}])
+    assert not results[1].ok and "Invalid XML content" in str(results[1].error)
+    assert isinstance(results[2].error, FullTextUnavailableError)
+    assert results[3].sections == [{"title": "Body", "body": "Plain body."}]
+
+
+def test_convert_many_in_process_keeps_failures_per_item():
+    _check_many(list(XMLToDictConverter.convert_many(_MANY, workers=1)))
+
+
+def test_convert_many_on_a_process_pool():
+    _check_many(list(XMLToDictConverter.convert_many(_MANY, workers=2)))
+
+
+def test_convert_many_as_completed_covers_every_document():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = XMLToDictConverter.convert_many(
+            _MANY, workers=2, ordered=False, executor=pool
+        )
+        _check_many(sorted(results, key=lambda r: r.index))
+
+
+def test_convert_many_bounds_documents_in_flight():
+    consumed = []
+
+    def documents():
+        for i in range(50):
+            consumed.append(i)
+            yield _MANY[0]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = XMLToDictConverter.convert_many(documents(), workers=2, executor=pool)
+        first = next(results)
+
+        assert first.index == 0
+        assert len(consumed) == 8
+        assert sum(1 for _ in results) == 49